@@ -0,0 +1,253 @@
+"""
+AI Summarizer
+Keyword, key-point and summary generation for scraped articles. Part of the
+core library shared by the Flask app and the CLI.
+"""
+
+import logging
+import time
+
+from metrics import registry as metrics
+from normalize import count_words
+from languages import DEFAULT_LANGUAGE, get_language, detect_language, detect_language_of_pieces
+from text_analysis import top_key_points
+from summary_engines import get_engine, TemplateEngine, DEFAULT_SUMMARY_ENGINE
+from longdoc import reduce_chunks, LONG_DOCUMENT_CHARS, DEFAULT_CHUNK_CHARS, KEY_POINTS
+from translation import translate_to_urdu
+
+
+class AISummarizer:
+    """Simulates AI summarization with static logic."""
+    
+    def __init__(self, engine=DEFAULT_SUMMARY_ENGINE, long_document_chars=LONG_DOCUMENT_CHARS,
+                 long_document_processes=None, chunk_chars=DEFAULT_CHUNK_CHARS, urdu_summary=False):
+        """
+        Args:
+            engine (str): Default summary engine ('template' or 'textrank')
+            long_document_chars (int): Content length from which generate_summary
+                switches to the chunked map-reduce path (None to disable)
+            long_document_processes (int): Process pool size for long documents
+                (defaults to the CPU count)
+            chunk_chars (int): Chunk size of the long-document path in characters
+            urdu_summary (bool): Add an Urdu summary ('summary_urdu') to results,
+                translated offline for non-Urdu articles (see translation)
+        """
+        self.engine = get_engine(engine).name
+        self.long_document_chars = long_document_chars
+        self.long_document_processes = long_document_processes
+        self.chunk_chars = chunk_chars
+        self.urdu_summary = urdu_summary
+        self.summary_templates = [
+            "This article discusses {topic} and provides insights into {key_points}.",
+            "The blog post explores {topic}, highlighting {key_points}.",
+            "In this piece, the author examines {topic} with focus on {key_points}.",
+            "This content covers {topic}, emphasizing {key_points}."
+        ]
+    
+    def generate_summary(self, title, content, target_length=150, engine=None, language=None):
+        """
+        Generate a summary using static logic to simulate AI.
+        
+        Args:
+            title (str): Article title
+            content (str): Article content
+            target_length (int): Target summary length in words
+            engine (str): Summary engine for this call (defaults to the instance's)
+            language (str): Language code of the content (detected when omitted)
+            
+        Returns:
+            dict: Contains summary and analysis
+        """
+        if self.long_document_chars and len(content) >= self.long_document_chars:
+            return self.generate_long_summary(title, (content,), target_length, engine, language)
+        
+        try:
+            started = time.perf_counter()
+            summary_engine = get_engine(engine or self.engine)
+            with metrics.timer('language'):
+                language = get_language(language or detect_language(content))
+            
+            # Count words once and reuse for the length statistics
+            original_length = count_words(content)
+            
+            # Extract key information
+            with metrics.timer('sentences'):
+                sentences = self._split_into_sentences(content, language)
+            with metrics.timer('keywords'):
+                keywords = self._extract_keywords(content, limit=10, language=language)
+            with metrics.timer('key_points'):
+                key_points = self._identify_key_points(sentences)
+            
+            # Compose the summary with the selected engine
+            with metrics.timer('compose'):
+                summary = summary_engine.compose(title, sentences, keywords, key_points, target_length,
+                                                 language)
+            summary_length = len(summary.split())
+            
+            metrics.observe('summarize', time.perf_counter() - started)
+            metrics.increment('words_summarized', original_length)
+            
+            result = {
+                'success': True,
+                'summary': summary,
+                'keywords': keywords,  # Top 10 keywords
+                'key_points': key_points[:3],  # Top 3 key points
+                'original_length': original_length,
+                'summary_length': summary_length,
+                'compression_ratio': round(summary_length / original_length * 100, 2),
+                'engine': summary_engine.name,
+                'language': language.code
+            }
+            return self._add_urdu_summary(result)
+            
+        except Exception as e:
+            logging.error(f"Summarization error: {str(e)}")
+            return {'success': False, 'error': f"Summarization failed: {str(e)}"}
+    
+    def summarize_analysis(self, title, analysis, target_length=150, engine=None):
+        """
+        Summarize a document tracked by an incremental.DocumentAnalysis.
+        
+        Keywords come from the analysis's running counts, so only the
+        sentences changed since the previous version were re-tokenized; the
+        result equals generate_summary's on the same content.
+        
+        Args:
+            title (str): Article title
+            analysis (DocumentAnalysis): The document's current analysis
+            target_length (int): Target summary length in words
+            engine (str): Summary engine for this call (defaults to the instance's)
+            
+        Returns:
+            dict: Same shape as generate_summary's result
+        """
+        language = analysis.language
+        if self.long_document_chars and len(analysis.content) >= self.long_document_chars:
+            return self.generate_long_summary(title, (analysis.content,), target_length, engine,
+                                              language.code)
+        
+        try:
+            started = time.perf_counter()
+            summary_engine = get_engine(engine or self.engine)
+            original_length = analysis.words
+            
+            sentences = analysis.sentences
+            with metrics.timer('keywords'):
+                keywords = analysis.top_keywords(10)
+            with metrics.timer('key_points'):
+                key_points = top_key_points(sentences, 5)
+            with metrics.timer('compose'):
+                summary = summary_engine.compose(title, sentences, keywords, key_points, target_length,
+                                                 language)
+            summary_length = len(summary.split())
+            
+            metrics.observe('summarize', time.perf_counter() - started)
+            
+            result = {
+                'success': True,
+                'summary': summary,
+                'keywords': keywords,
+                'key_points': key_points[:3],
+                'original_length': original_length,
+                'summary_length': summary_length,
+                'compression_ratio': round(summary_length / original_length * 100, 2),
+                'engine': summary_engine.name,
+                'language': language.code
+            }
+            return self._add_urdu_summary(result)
+            
+        except Exception as e:
+            logging.error(f"Incremental summarization error: {str(e)}")
+            return {'success': False, 'error': f"Summarization failed: {str(e)}"}
+    
+    def generate_long_summary(self, title, pieces, target_length=150, engine=None, language=None):
+        """
+        Summarize a very long text with bounded memory.
+        
+        The text is re-cut into fixed-size chunks as it is read from
+        ``pieces``, chunks are scored in a process pool and their keyword
+        counts and candidate sentences are merged (see longdoc). Keywords and
+        key points are the same as generate_summary's; extractive engines
+        rank the candidates pre-selected from each chunk.
+        
+        Args:
+            title (str): Article title
+            pieces: The text, or an iterable of text pieces (e.g. an open file)
+            target_length (int): Target summary length in words
+            engine (str): Summary engine for this call (defaults to the instance's)
+            language (str): Language code of the text (detected from its
+                first pieces when omitted)
+            
+        Returns:
+            dict: Same shape as generate_summary's result
+        """
+        try:
+            started = time.perf_counter()
+            summary_engine = get_engine(engine or self.engine)
+            if language is None:
+                language, pieces = detect_language_of_pieces(pieces)
+            
+            with metrics.timer('long_document'):
+                reduced = reduce_chunks(
+                    pieces,
+                    extract_length=target_length if summary_engine.extractive else None,
+                    processes=self.long_document_processes,
+                    chunk_chars=self.chunk_chars,
+                    language=language
+                )
+            original_length = reduced.words
+            keywords = reduced.top_keywords(10)
+            key_points = reduced.key_points(KEY_POINTS)
+            
+            with metrics.timer('compose'):
+                summary = summary_engine.compose(title, reduced.extract_sentences(), keywords,
+                                                 key_points, target_length, reduced.language)
+            summary_length = len(summary.split())
+            
+            metrics.observe('summarize', time.perf_counter() - started)
+            metrics.increment('words_summarized', original_length)
+            
+            result = {
+                'success': True,
+                'summary': summary,
+                'keywords': keywords,
+                'key_points': key_points[:3],
+                'original_length': original_length,
+                'summary_length': summary_length,
+                'compression_ratio': round(summary_length / original_length * 100, 2),
+                'engine': summary_engine.name,
+                'language': reduced.language.code
+            }
+            return self._add_urdu_summary(result)
+            
+        except Exception as e:
+            logging.error(f"Long document summarization error: {str(e)}")
+            return {'success': False, 'error': f"Summarization failed: {str(e)}"}
+    
+    def _add_urdu_summary(self, result):
+        """Add 'summary_urdu' when enabled: the summary itself for Urdu articles,
+        otherwise its offline translation."""
+        if self.urdu_summary:
+            if result['language'] == 'ur':
+                result['summary_urdu'] = result['summary']
+            else:
+                with metrics.timer('translate'):
+                    result['summary_urdu'] = translate_to_urdu(result['summary'])
+        return result
+    
+    def _split_into_sentences(self, text, language=None):
+        """Split text into sentences, kept as offsets into the text."""
+        return (language or get_language(DEFAULT_LANGUAGE)).sentences(text)
+    
+    def _extract_keywords(self, text, limit=None, language=None):
+        """Extract keywords using simple frequency analysis."""
+        return (language or get_language(DEFAULT_LANGUAGE)).top_keywords(text, limit)
+    
+    def _identify_key_points(self, sentences):
+        """Identify key points from sentences."""
+        # Simple scoring based on sentence length and position
+        return top_key_points(sentences, 5)
+    
+    def _create_summary(self, title, sentences, keywords, key_points, target_length):
+        """Create a summary using static rules."""
+        return TemplateEngine().compose(title, sentences, keywords, key_points, target_length)
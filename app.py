@@ -3,321 +3,548 @@ Blog Summarizer Application
 A simple web application that scrapes blog content from URLs and provides AI-powered summaries.
 """
 
-from flask import Flask, render_template, request, jsonify
-import requests
-from bs4 import BeautifulSoup
-import re
-from urllib.parse import urlparse
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 import logging
+import json
+import os
+import functools
+import time
+import atexit
+import hmac
+
+from metrics import registry as metrics, MultiprocessExporter
+from batch import BatchSummarizer, ndjson_line, DEFAULT_MAX_URLS
+from jobs import (JobQueue, MemoryJobStore, SQLiteJobStore, QueueFull, FINISHED,
+                  DEFAULT_WORKERS, DEFAULT_MAX_PENDING, DEFAULT_JOB_TTL)
+from streaming import DEFAULT_MAX_BYTES, DEFAULT_DEADLINE
+from extractor import DEFAULT_ENGINE
+from extraction_profiles import ExtractionProfiles, DEFAULT_REVALIDATE_EVERY
+from cache import create_summary_cache, DEFAULT_MAX_ENTRIES, DEFAULT_TTL
+from search_index import SearchIndex
+from summary_engines import ENGINES, DEFAULT_SUMMARY_ENGINE
+from longdoc import LONG_DOCUMENT_CHARS
+from dedupe import DuplicateIndex, DEFAULT_MAX_DISTANCE
+from politeness import DEFAULT_HOST_RATE, DEFAULT_HOST_BURST
+from compression import DEFAULT_MIN_SIZE, negotiate, compress, compress_stream
+from storage import (SummaryWriter, create_summary_store, DEFAULT_BATCH_SIZE,
+                     DEFAULT_FLUSH_INTERVAL, DEFAULT_POOL_SIZE)
+
+from watchlist import (WatchList, MemoryWatchStore, SQLiteWatchStore, DEFAULT_INTERVAL,
+                       DEFAULT_CHECK_WORKERS, MAX_FEED_BATCH)
+
+# Core library (also used directly by the CLI without Flask)
+from blog_scraper import BlogScraper, create_scraper
+from ai_summarizer import AISummarizer
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 
-class BlogScraper:
-    """Handles web scraping functionality for blog content."""
+# Set by gunicorn.conf.py: the app is imported once in the master and forked into workers
+PREFORK = os.environ.get('PREFORK_SERVER', '') == '1'
+
+# Processes sharing this directory report each other's metrics on /metrics
+metrics_dir = os.environ.get('METRICS_DIR')
+metrics_exporter = MultiprocessExporter(metrics_dir, metrics) if metrics_dir else None
+if metrics_exporter is not None and not PREFORK:
+    metrics_exporter.start()
+
+# Per-domain content selector profiles, learned from text/link density (off by default)
+extraction_profiles = None
+if os.environ.get('ADAPTIVE_EXTRACTION', '') == '1':
+    extraction_profiles = ExtractionProfiles(
+        os.environ.get('EXTRACTION_PROFILES_PATH'),
+        revalidate_every=int(os.environ.get('EXTRACTION_REVALIDATE_EVERY', DEFAULT_REVALIDATE_EVERY))
+    )
+    atexit.register(extraction_profiles.close)
+
+# Initialize components
+scraper = create_scraper(
+    os.environ.get('SCRAPER_BACKEND', 'sync'),
+    os.environ.get('EXTRACTION_ENGINE', DEFAULT_ENGINE),
+    streaming=os.environ.get('STREAMING_FETCH', '') == '1',
+    max_bytes=int(os.environ.get('FETCH_MAX_BYTES', DEFAULT_MAX_BYTES)),
+    deadline=float(os.environ.get('FETCH_DEADLINE', DEFAULT_DEADLINE)),
+    polite=os.environ.get('POLITE_FETCH', '') == '1',
+    host_rate=float(os.environ.get('HOST_RATE', DEFAULT_HOST_RATE)),
+    host_burst=int(os.environ.get('HOST_BURST', DEFAULT_HOST_BURST)),
+    profiles=extraction_profiles
+)
+summarizer = AISummarizer(
+    os.environ.get('SUMMARY_ENGINE', DEFAULT_SUMMARY_ENGINE),
+    long_document_chars=int(os.environ.get('LONG_DOCUMENT_CHARS', LONG_DOCUMENT_CHARS)),
+    long_document_processes=int(os.environ.get('LONG_DOCUMENT_PROCESSES', 0)) or None,
+    urdu_summary=os.environ.get('URDU_SUMMARY', '') == '1'
+)
+
+# Persistent blog_summaries table (PostgreSQL/Supabase or SQLite), off by default
+summary_store_url = os.environ.get('SUMMARY_STORE_URL')
+summary_writer = None
+if summary_store_url:
+    summary_writer = SummaryWriter(
+        create_summary_store(summary_store_url,
+                             pool_size=int(os.environ.get('SUMMARY_STORE_POOL_SIZE', DEFAULT_POOL_SIZE))),
+        batch_size=int(os.environ.get('SUMMARY_STORE_BATCH_SIZE', DEFAULT_BATCH_SIZE)),
+        flush_interval=float(os.environ.get('SUMMARY_STORE_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+    )
+    atexit.register(summary_writer.close)
+
+# Keyword index over summarized pages (memory-mapped segment when a path is set)
+search_index = SearchIndex(os.environ.get('SEARCH_INDEX_PATH'))
+atexit.register(search_index.close)
+
+summary_cache = create_summary_cache(
+    db_path=os.environ.get('CACHE_DB_PATH'),
+    max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+    ttl=int(os.environ.get('CACHE_TTL', DEFAULT_TTL)),
+    store=summary_writer,
+    index=search_index,
+    duplicates=DuplicateIndex(int(os.environ.get('DUPLICATE_MAX_DISTANCE', DEFAULT_MAX_DISTANCE)))
+)
+# Pre-fork workers already occupy every core, so they summarize in their own threads
+batch_summarizer = BatchSummarizer(scraper, summarizer, cache=summary_cache, use_processes=not PREFORK)
+
+def run_summary_job(payload):
+    """Job handler: summarize the payload's URL."""
+    return batch_summarizer.summarize_url(payload['url'], payload['target_length'], payload.get('engine'))
+
+job_db_path = os.environ.get('JOB_DB_PATH')
+# Finished jobs are kept for clients to fetch for this many seconds
+job_ttl = float(os.environ.get('JOB_TTL', DEFAULT_JOB_TTL))
+job_queue = JobQueue(
+    run_summary_job,
+    store=SQLiteJobStore(job_db_path, ttl=job_ttl) if job_db_path else MemoryJobStore(ttl=job_ttl),
+    workers=int(os.environ.get('JOB_WORKERS', DEFAULT_WORKERS)),
+    max_pending=int(os.environ.get('JOB_MAX_PENDING', DEFAULT_MAX_PENDING))
+)
+if not PREFORK:
+    job_queue.start()
+
+# Watched URLs are re-polled with conditional GETs and their changes published to a feed
+watch_db_path = os.environ.get('WATCH_DB_PATH')
+watch_list = WatchList(
+    scraper, summarizer,
+    store=SQLiteWatchStore(watch_db_path) if watch_db_path else MemoryWatchStore(),
+    workers=int(os.environ.get('WATCH_WORKERS', DEFAULT_CHECK_WORKERS)),
+    # Processes sharing the store elect one scheduler through this lock file
+    lock_path=f"{watch_db_path}.lock" if watch_db_path else None
+)
+atexit.register(watch_list.shutdown, wait=False)
+if not PREFORK:
+    watch_list.start()
+
+def before_fork():
+    """
+    Release process-bound resources in the pre-fork master before a worker is forked.
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    SQLite and PostgreSQL connections must not be shared across fork(); the
+    ones opened while the app was preloaded are closed here, and each worker
+    opens its own on first use.
+    """
+    disk = getattr(summary_cache.backend, 'disk', None)
+    if disk is not None:
+        disk.close()
+    if isinstance(job_queue.store, SQLiteJobStore):
+        job_queue.store.close()
+    if summary_writer is not None:
+        summary_writer.store.close()
+    watch_list.store.close()
+
+def after_fork():
+    """
+    Start the per-process background threads in a freshly forked worker.
     
-    def scrape_blog_content(self, url):
-        """
-        Scrape text content from a blog URL.
-        
-        Args:
-            url (str): The blog URL to scrape
-            
-        Returns:
-            dict: Contains title, content, and metadata
-        """
-        try:
-            # Validate URL
-            if not self._is_valid_url(url):
-                raise ValueError("Invalid URL format")
-            
-            # Fetch the webpage
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract title
-            title = self._extract_title(soup)
-            
-            # Extract main content
-            content = self._extract_content(soup)
-            
-            # Clean and process text
-            cleaned_content = self._clean_text(content)
-            
-            return {
-                'success': True,
-                'url': url,
-                'title': title,
-                'content': cleaned_content,
-                'word_count': len(cleaned_content.split()),
-                'char_count': len(cleaned_content)
-            }
-            
-        except requests.RequestException as e:
-            logging.error(f"Request error for URL {url}: {str(e)}")
-            return {'success': False, 'error': f"Failed to fetch URL: {str(e)}"}
-        except Exception as e:
-            logging.error(f"Scraping error for URL {url}: {str(e)}")
-            return {'success': False, 'error': f"Scraping failed: {str(e)}"}
+    Every worker takes over the jobs of exited workers sharing the job
+    store, when it starts and periodically (see JobQueue.recover).
+    """
+    if summary_writer is not None:
+        summary_writer.after_fork()
+    if metrics_exporter is not None:
+        metrics_exporter.start()
+    job_queue.start()
+    watch_list.start()
+
+MAX_JOB_WAIT = 30
+
+def job_view(job):
+    """Public representation of a job record."""
+    return {
+        'id': job['id'],
+        'status': job['status'],
+        'url': job['payload']['url'],
+        'result': job['result'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at']
+    }
+
+def requested_engine(data):
+    """
+    Summary engine named in a request body; None selects the default.
     
-    def _is_valid_url(self, url):
-        """Validate if the URL is properly formatted."""
-        try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
-        except:
-            return False
+    Raises:
+        ValueError: For an unknown engine
+    """
+    engine = data.get('engine')
+    if not engine or engine == summarizer.engine:
+        return None
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown summary engine: {engine} (choose from {', '.join(sorted(ENGINES))})")
+    return engine
+
+# Responses at least this large are compressed for clients that accept it
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', DEFAULT_MIN_SIZE))
+
+@app.after_request
+def compress_response(response):
+    """Compress responses per Accept-Encoding; NDJSON streams are compressed line by line."""
+    if (request.method == 'HEAD' or response.status_code in (204, 304) or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+    if response.is_streamed and response.mimetype != 'application/x-ndjson':
+        return response  # event streams must reach the client unbuffered
     
-    def _extract_title(self, soup):
-        """Extract page title from HTML."""
-        title_tag = soup.find('title')
-        if title_tag:
-            return title_tag.get_text().strip()
-        
-        # Try alternative title sources
-        h1_tag = soup.find('h1')
-        if h1_tag:
-            return h1_tag.get_text().strip()
-        
-        return "No title found"
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
     
-    def _extract_content(self, soup):
-        """Extract main content from HTML."""
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-            element.decompose()
+    if response.is_streamed:
+        def record(raw, sent):
+            metrics.increment('response_bytes', raw)
+            metrics.increment('response_bytes_saved', max(raw - sent, 0))
+        response.response = compress_stream(response.response, encoding, record)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        metrics.increment('response_bytes', len(data))
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        compressed = compress(data, encoding)
+        if len(compressed) >= len(data):
+            return response
+        metrics.increment('response_bytes_saved', len(data) - len(compressed))
+        response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.route('/')
+def index():
+    """Main page route."""
+    return render_template('index.html')
+
+@app.route('/api/summarize', methods=['POST'])
+def summarize_blog():
+    """API endpoint to summarize a blog URL."""
+    try:
+        data = request.get_json()
+        url = data.get('url', '').strip()
         
-        # Try to find main content containers
-        content_selectors = [
-            'article',
-            '.post-content',
-            '.entry-content',
-            '.content',
-            'main',
-            '.post-body',
-            '.article-content'
-        ]
+        if not url:
+            return jsonify({'success': False, 'error': 'URL is required'})
         
-        for selector in content_selectors:
-            content_element = soup.select_one(selector)
-            if content_element:
-                return content_element.get_text()
+        target_length = int(data.get('target_length', 150))
         
-        # Fallback: extract from body
-        body = soup.find('body')
-        if body:
-            return body.get_text()
+        try:
+            engine = requested_engine(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
         
-        return soup.get_text()
-    
-    def _clean_text(self, text):
-        """Clean and normalize extracted text."""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        # Serve from cache, or scrape and summarize on a miss
+        response = summary_cache.get_or_compute(
+            url, target_length, scraper.scrape_blog_content,
+            functools.partial(summarizer.generate_summary, engine=engine), variant=engine
+        )
         
-        # Remove special characters that might interfere
-        text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)]', '', text)
+        return jsonify(response)
         
-        return text.strip()
-
+    except Exception as e:
+        logging.error(f"API error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Internal server error'})
 
-class AISummarizer:
-    """Simulates AI summarization with static logic."""
-    
-    def __init__(self):
-        self.summary_templates = [
-            "This article discusses {topic} and provides insights into {key_points}.",
-            "The blog post explores {topic}, highlighting {key_points}.",
-            "In this piece, the author examines {topic} with focus on {key_points}.",
-            "This content covers {topic}, emphasizing {key_points}."
-        ]
-    
-    def generate_summary(self, title, content, target_length=150):
-        """
-        Generate a summary using static logic to simulate AI.
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """API endpoint to queue a summarization job; returns its id immediately."""
+    try:
+        data = request.get_json() or {}
+        url = data.get('url', '').strip()
+        
+        if not url:
+            return jsonify({'success': False, 'error': 'URL is required'}), 400
         
-        Args:
-            title (str): Article title
-            content (str): Article content
-            target_length (int): Target summary length in words
-            
-        Returns:
-            dict: Contains summary and analysis
-        """
         try:
-            # Extract key information
-            sentences = self._split_into_sentences(content)
-            keywords = self._extract_keywords(content)
-            key_points = self._identify_key_points(sentences)
-            
-            # Generate summary based on static rules
-            summary = self._create_summary(title, sentences, keywords, key_points, target_length)
-            
-            return {
-                'success': True,
-                'summary': summary,
-                'keywords': keywords[:10],  # Top 10 keywords
-                'key_points': key_points[:3],  # Top 3 key points
-                'original_length': len(content.split()),
-                'summary_length': len(summary.split()),
-                'compression_ratio': round(len(summary.split()) / len(content.split()) * 100, 2)
-            }
-            
-        except Exception as e:
-            logging.error(f"Summarization error: {str(e)}")
-            return {'success': False, 'error': f"Summarization failed: {str(e)}"}
-    
-    def _split_into_sentences(self, text):
-        """Split text into sentences."""
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if len(s.strip()) > 10]
-    
-    def _extract_keywords(self, text):
-        """Extract keywords using simple frequency analysis."""
-        # Common stop words to exclude
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 
-            'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
-            'this', 'that', 'these', 'those', 'it', 'they', 'them', 'their'
-        }
+            engine = requested_engine(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        # Extract words and count frequency
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        word_freq = {}
+        payload = {'url': url, 'target_length': int(data.get('target_length', 150)), 'engine': engine}
+        job = job_queue.submit(payload)
         
-        for word in words:
-            if word not in stop_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
+        return jsonify({
+            'success': True,
+            'job_id': job['id'],
+            'status': job['status'],
+            'status_url': f"/api/jobs/{job['id']}"
+        }), 202
         
-        # Sort by frequency
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words]
+    except QueueFull:
+        response = jsonify({'success': False, 'error': 'Server busy, retry later'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    except Exception as e:
+        logging.error(f"Job API error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """API endpoint for job status; ?wait=N long-polls up to N seconds for completion."""
+    try:
+        wait = min(float(request.args.get('wait', 0) or 0), MAX_JOB_WAIT)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'wait must be a number of seconds'}), 400
+    job = job_queue.wait(job_id, wait) if wait > 0 else job_queue.get(job_id)
     
-    def _identify_key_points(self, sentences):
-        """Identify key points from sentences."""
-        # Simple scoring based on sentence length and position
-        scored_sentences = []
-        
-        for i, sentence in enumerate(sentences):
-            score = 0
-            
-            # Position score (earlier sentences are more important)
-            if i < len(sentences) * 0.3:
-                score += 2
-            
-            # Length score (medium length sentences are preferred)
-            word_count = len(sentence.split())
-            if 10 <= word_count <= 30:
-                score += 1
-            
-            scored_sentences.append((sentence, score))
-        
-        # Sort by score and return top sentences
-        scored_sentences.sort(key=lambda x: x[1], reverse=True)
-        return [sentence for sentence, score in scored_sentences[:5]]
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
     
-    def _create_summary(self, title, sentences, keywords, key_points, target_length):
-        """Create a summary using static rules."""
-        summary_parts = []
-        
-        # Start with title context if available
-        if title and title != "No title found":
-            summary_parts.append(f"This article titled '{title}' discusses")
-        else:
-            summary_parts.append("This content covers")
-        
-        # Add main topics based on keywords
-        if keywords:
-            main_topics = ", ".join(keywords[:3])
-            summary_parts.append(f" {main_topics}")
+    return jsonify({'success': True, 'job': job_view(job)})
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-sent events stream of job status changes, ending when the job finishes."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    def generate(job):
+        yield f"event: status\ndata: {json.dumps(job_view(job))}\n\n"
+        while job['status'] not in FINISHED:
+            updated = job_queue.wait(job_id, 15, updated_after=job['updated_at'])
+            if updated['updated_at'] == job['updated_at']:
+                # Keep idle connections open through proxies
+                yield ": keep-alive\n\n"
+                continue
+            job = updated
+            yield f"event: status\ndata: {json.dumps(job_view(job))}\n\n"
+    
+    return Response(stream_with_context(generate(job)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint for per-stage latency and byte/word counters (of every worker)."""
+    return Response((metrics_exporter or metrics).render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """API endpoint exposing summary cache hit/miss counters."""
+    return jsonify({'success': True, 'cache': summary_cache.stats()})
+
+@app.route('/api/duplicates', methods=['GET'])
+def duplicate_clusters():
+    """API endpoint listing near-duplicate clusters and the summaries they saved."""
+    return jsonify(dict(summary_cache.duplicates.clusters(), success=True))
+
+MAX_SEARCH_RESULTS = 100
+
+# Bearer token required by mutating admin endpoints; unset disables them
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+def require_admin_token(view):
+    """Reject requests without ``Authorization: Bearer <ADMIN_TOKEN>`` (all of them when unset)."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({'success': False, 'error': 'Admin endpoints are disabled (ADMIN_TOKEN is not set)'}), 403
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+            return jsonify({'success': False, 'error': 'Invalid admin token'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/api/admin/extraction-profiles', methods=['GET'])
+def list_extraction_profiles():
+    """Admin endpoint listing the learned per-domain content selectors."""
+    if extraction_profiles is None:
+        return jsonify({'success': True, 'enabled': False, 'profiles': {}})
+    host = request.args.get('host', '').strip().lower()
+    profiles = extraction_profiles.profiles()
+    if host:
+        profiles = {name: profile for name, profile in profiles.items() if name == host}
+    return jsonify({
+        'success': True,
+        'enabled': True,
+        'stats': extraction_profiles.stats(),
+        'profiles': profiles
+    })
+
+@app.route('/api/admin/extraction-profiles/<host>', methods=['DELETE'])
+@require_admin_token
+def forget_extraction_profile(host):
+    """Admin endpoint dropping a domain's profile so it is learned again."""
+    if extraction_profiles is None or not extraction_profiles.forget(host.lower()):
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    return jsonify({'success': True, 'host': host.lower()})
+
+@app.route('/api/search', methods=['GET'])
+def search_summaries():
+    """API endpoint to find summarized posts by keyword, ranked by TF-IDF."""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': 'Query parameter q is required'}), 400
+
+    try:
+        k = min(max(int(request.args.get('k', 10)), 1), MAX_SEARCH_RESULTS)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'k must be an integer'}), 400
+
+    start = time.perf_counter()
+    with metrics.timer('search'):
+        results = search_index.search(query, k)
+
+    return jsonify({
+        'success': True,
+        'query': query,
+        'results': results,
+        'total_documents': len(search_index),
+        'took_ms': round((time.perf_counter() - start) * 1000, 3)
+    })
+
+def watch_view(watch):
+    """Public representation of a watch record (without the stored page content)."""
+    return {
+        'id': watch['id'],
+        'url': watch['url'],
+        'interval': watch['interval'],
+        'target_length': watch['target_length'],
+        'engine': watch['engine'],
+        'title': watch['title'],
+        'summary': watch['summary'],
+        'next_check': watch['next_check'],
+        'last_checked': watch['last_checked'],
+        'last_changed': watch['last_changed'],
+        'checks': watch['checks'],
+        'changes': watch['changes'],
+        'errors': watch['errors'],
+        'last_error': watch['last_error']
+    }
+
+@app.route('/api/watch', methods=['POST'])
+def add_watch():
+    """API endpoint to watch a URL; it is re-polled every `interval` seconds."""
+    try:
+        data = request.get_json() or {}
+        url = data.get('url', '').strip()
         
-        # Add key insights
-        if key_points:
-            # Select the most relevant key point
-            best_point = key_points[0]
-            if len(best_point.split()) > 15:
-                best_point = " ".join(best_point.split()[:15]) + "..."
-            summary_parts.append(f". The main insight is: {best_point}")
+        if not url:
+            return jsonify({'success': False, 'error': 'URL is required'}), 400
         
-        # Combine and ensure target length
-        summary = "".join(summary_parts)
+        try:
+            engine = requested_engine(data)
+            watch, created = watch_list.add(url, float(data.get('interval', DEFAULT_INTERVAL)),
+                                            int(data.get('target_length', 150)), engine)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        # Trim if too long
-        words = summary.split()
-        if len(words) > target_length:
-            summary = " ".join(words[:target_length]) + "..."
+        return jsonify({'success': True, 'watch': watch_view(watch)}), 201 if created else 200
         
-        return summary
+    except Exception as e:
+        logging.error(f"Watch API error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
 
+@app.route('/api/watch', methods=['GET'])
+def list_watches():
+    """API endpoint listing watched URLs."""
+    return jsonify({'success': True, 'watches': [watch_view(watch) for watch in watch_list.list()],
+                    'stats': watch_list.stats()})
 
-# Initialize components
-scraper = BlogScraper()
-summarizer = AISummarizer()
+@app.route('/api/watch/<watch_id>', methods=['GET'])
+def get_watch(watch_id):
+    """API endpoint for one watched URL and its latest summary."""
+    watch = watch_list.get(watch_id)
+    if watch is None:
+        return jsonify({'success': False, 'error': 'Watch not found'}), 404
+    return jsonify({'success': True, 'watch': watch_view(watch)})
 
-@app.route('/')
-def index():
-    """Main page route."""
-    return render_template('index.html')
+@app.route('/api/watch/<watch_id>', methods=['DELETE'])
+def remove_watch(watch_id):
+    """API endpoint to stop watching a URL."""
+    if not watch_list.remove(watch_id):
+        return jsonify({'success': False, 'error': 'Watch not found'}), 404
+    return jsonify({'success': True, 'removed': watch_id})
 
-@app.route('/api/summarize', methods=['POST'])
-def summarize_blog():
-    """API endpoint to summarize a blog URL."""
+@app.route('/api/watch/feed', methods=['GET'])
+def watch_feed():
+    """
+    Change feed of watched URLs, oldest first.
+    
+    NDJSON by default, or server-sent events for `Accept: text/event-stream`
+    (resuming from Last-Event-ID). ?since=N starts after sequence N;
+    ?follow=1 keeps the stream open for new changes.
+    """
+    event_stream = request.accept_mimetypes.best == 'text/event-stream'
     try:
-        data = request.get_json()
-        url = data.get('url', '').strip()
-        
-        if not url:
-            return jsonify({'success': False, 'error': 'URL is required'})
+        since = int(request.args.get('since') or request.headers.get('Last-Event-ID') or 0)
+        limit = min(int(request.args.get('limit', MAX_FEED_BATCH)), MAX_FEED_BATCH)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'since and limit must be integers'}), 400
+    follow = request.args.get('follow', '') == '1'
+    
+    def encode(event):
+        if event_stream:
+            return f"id: {event['sequence']}\nevent: change\ndata: {json.dumps(event)}\n\n"
+        return ndjson_line(event)
+    
+    def generate(since):
+        for event in watch_list.events(since, limit):
+            since = event['sequence']
+            yield encode(event)
+        while follow:
+            events = watch_list.wait_events(since, 15)
+            if not events and event_stream:
+                # Keep idle connections open through proxies
+                yield ": keep-alive\n\n"
+            for event in events:
+                since = event['sequence']
+                yield encode(event)
+    
+    if event_stream:
+        return Response(stream_with_context(generate(since)), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache'})
+    return Response(stream_with_context(generate(since)), mimetype='application/x-ndjson')
+
+@app.route('/api/summarize/batch', methods=['POST'])
+def summarize_batch():
+    """API endpoint to summarize many blog URLs, streamed back as NDJSON."""
+    try:
+        data = request.get_json() or {}
+        urls = data.get('urls')
         
-        # Scrape blog content
-        scrape_result = scraper.scrape_blog_content(url)
+        if not isinstance(urls, list) or not urls:
+            return jsonify({'success': False, 'error': 'A non-empty list of URLs is required'})
         
-        if not scrape_result['success']:
-            return jsonify(scrape_result)
+        if len(urls) > DEFAULT_MAX_URLS:
+            return jsonify({'success': False, 'error': f'At most {DEFAULT_MAX_URLS} URLs per batch'})
         
-        # Generate summary
-        summary_result = summarizer.generate_summary(
-            scrape_result['title'], 
-            scrape_result['content']
-        )
+        urls = [str(url).strip() for url in urls]
+        target_length = int(data.get('target_length', 150))
         
-        if not summary_result['success']:
-            return jsonify(summary_result)
+        try:
+            engine = requested_engine(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
         
-        # Combine results
-        response = {
-            'success': True,
-            'url': scrape_result['url'],
-            'title': scrape_result['title'],
-            'content_stats': {
-                'word_count': scrape_result['word_count'],
-                'char_count': scrape_result['char_count']
-            },
-            'summary': summary_result['summary'],
-            'keywords': summary_result['keywords'],
-            'key_points': summary_result['key_points'],
-            'analysis': {
-                'original_length': summary_result['original_length'],
-                'summary_length': summary_result['summary_length'],
-                'compression_ratio': summary_result['compression_ratio']
-            }
-        }
+        def generate():
+            # One JSON object per line, in completion order
+            for result in batch_summarizer.iter_results(urls, target_length, engine):
+                yield ndjson_line(result)
         
-        return jsonify(response)
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
         
     except Exception as e:
-        logging.error(f"API error: {str(e)}")
+        logging.error(f"Batch API error: {str(e)}")
         return jsonify({'success': False, 'error': 'Internal server error'})
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server; use `gunicorn -c gunicorn.conf.py app:app` in production
+    app.run(debug=os.environ.get('FLASK_DEBUG', '') == '1', host='0.0.0.0',
+            port=int(os.environ.get('PORT', 5000)))
@@ -0,0 +1,188 @@
+"""
+Async Scraping Backend
+An asyncio/aiohttp alternative to the blocking requests.Session in BlogScraper.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+import aiohttp
+
+from cache import conditional_headers, response_validators, not_modified_result
+from compression import AIOHTTP_ENCODINGS, needs_decoding, decode_body
+from metrics import registry as metrics, host_of
+
+
+def _trace_config():
+    """aiohttp tracing hooks that time DNS resolution and connection setup."""
+    async def dns_start(session, context, params):
+        context.dns_started = time.perf_counter()
+
+    async def dns_end(session, context, params):
+        metrics.observe('dns', time.perf_counter() - context.dns_started, params.host)
+
+    async def connect_start(session, context, params):
+        context.connect_started = time.perf_counter()
+
+    async def connect_end(session, context, params):
+        host = (context.trace_request_ctx or {}).get('host')
+        metrics.observe('connect', time.perf_counter() - context.connect_started, host)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(dns_start)
+    trace_config.on_dns_resolvehost_end.append(dns_end)
+    trace_config.on_connection_create_start.append(connect_start)
+    trace_config.on_connection_create_end.append(connect_end)
+    return trace_config
+
+DEFAULT_MAX_CONCURRENCY = 200
+DEFAULT_LIMIT_PER_HOST = 8
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 10
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+
+
+class AsyncBlogScraper:
+    """
+    Fetches pages on a shared event loop and returns the same result dicts as
+    BlogScraper.scrape_blog_content.
+
+    HTML parsing is delegated to a BlogScraper instance so both backends
+    extract identical content. Coroutines can be awaited directly
+    (``scrape_async``/``scrape_many``) or called from threads through the
+    blocking ``scrape_blog_content`` wrapper, which runs them on a background
+    event loop.
+    """
+
+    def __init__(self, parser, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 limit_per_host=DEFAULT_LIMIT_PER_HOST,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT,
+                 keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT):
+        """
+        Args:
+            parser (BlogScraper): Provides URL validation and HTML parsing
+            max_concurrency (int): Maximum fetches in flight across all hosts
+            limit_per_host (int): Maximum pooled connections per host
+            connect_timeout (float): Seconds allowed to establish a connection
+            read_timeout (float): Seconds allowed between reads of the body
+            keepalive_timeout (float): Seconds idle connections are kept open
+        """
+        self.parser = parser
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        self.headers = dict(parser.session.headers)
+
+        self._session = None
+        self._session_loop = None
+        self._semaphore = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    async def _get_session(self):
+        """Create the pooled client session on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, headers=self.headers,
+                trace_configs=[_trace_config()]
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._session_loop = loop
+        return self._session
+
+    async def scrape_async(self, url, validators=None):
+        """
+        Scrape text content from a blog URL without blocking the event loop.
+
+        Args:
+            url (str): The blog URL to scrape
+            validators (dict): Optional 'etag'/'last_modified' for a conditional GET
+
+        Returns:
+            dict: Contains title, content, and metadata, or 'not_modified'
+        """
+        try:
+            # Validate URL
+            if not self.parser._is_valid_url(url):
+                raise ValueError("Invalid URL format")
+
+            host = host_of(url)
+            session = await self._get_session()
+            async with self._semaphore:
+                started = time.perf_counter()
+                async with session.get(url, headers=conditional_headers(validators),
+                                       trace_request_ctx={'host': host}) as response:
+                    metrics.observe('headers', time.perf_counter() - started, host)
+                    if response.status == 304:
+                        return not_modified_result(url, response.headers)
+                    response.raise_for_status()
+                    with metrics.timer('download', host):
+                        html = await response.read()
+                    headers = response.headers
+
+            # aiohttp decodes gzip/deflate/br itself; other codings (zstd) are decoded here
+            encoding = needs_decoding(headers, AIOHTTP_ENCODINGS)
+            if encoding:
+                html = decode_body(html, encoding)
+            metrics.increment('bytes_downloaded', len(html), host)
+
+            result = self.parser.parse_html(url, html)
+            result.update(response_validators(headers))
+            return result
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.increment('scrape_errors', 1, host_of(url))
+            error = str(e) or type(e).__name__
+            logging.error(f"Request error for URL {url}: {error}")
+            return {'success': False, 'error': f"Failed to fetch URL: {error}"}
+        except Exception as e:
+            metrics.increment('scrape_errors', 1, host_of(url))
+            logging.error(f"Scraping error for URL {url}: {str(e)}")
+            return {'success': False, 'error': f"Scraping failed: {str(e)}"}
+
+    async def scrape_many(self, urls):
+        """Scrape many URLs concurrently, returning results in input order."""
+        return await asyncio.gather(*(self.scrape_async(url) for url in urls))
+
+    def _ensure_loop(self):
+        """Start the background event loop thread on first use."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="async-scraper", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def scrape_blog_content(self, url, validators=None):
+        """Blocking wrapper with the same contract as BlogScraper.scrape_blog_content."""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self.scrape_async(url, validators), loop).result()
+
+    def close(self):
+        """Close pooled connections and stop the background loop."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
@@ -0,0 +1,278 @@
+"""
+Batch Summarization
+Scrapes and summarizes many blog URLs concurrently, yielding results as they complete.
+"""
+
+import heapq
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from urllib.parse import urlparse
+
+from metrics import registry as metrics
+from longdoc import mark_pool_worker
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_HOST_LIMIT = 4
+DEFAULT_MAX_URLS = 2000
+
+# Summarizer instance owned by each process pool worker (set by the initializer)
+_worker_summarizer = None
+
+
+def _init_summary_worker(summarizer):
+    """Store the summarizer shipped to this worker process once, not per task."""
+    global _worker_summarizer
+    _worker_summarizer = summarizer
+    # Long documents are chunked in this worker rather than in a nested pool
+    mark_pool_worker()
+
+
+def _summarize_in_worker(title, content, target_length, engine=None):
+    """Run generate_summary inside a process pool worker.
+
+    Returns the result with the stage metrics recorded while producing it,
+    so the parent process can add them to its own registry.
+    """
+    with metrics.collect([]) as events:
+        result = _worker_summarizer.generate_summary(title, content, target_length, engine=engine)
+    return result, events
+
+
+def format_result(scrape_result, summary_result):
+    """Combine scrape and summary results into the API response shape."""
+    response = {
+        'success': True,
+        'url': scrape_result['url'],
+        'title': scrape_result['title'],
+        'content_stats': {
+            'word_count': scrape_result['word_count'],
+            'char_count': scrape_result['char_count']
+        },
+        'summary': summary_result['summary'],
+        'keywords': summary_result['keywords'],
+        'key_points': summary_result['key_points'],
+        'analysis': {
+            'original_length': summary_result['original_length'],
+            'summary_length': summary_result['summary_length'],
+            'compression_ratio': summary_result['compression_ratio'],
+            'engine': summary_result.get('engine'),
+            'language': summary_result.get('language')
+        }
+    }
+    if 'summary_urdu' in summary_result:
+        response['summary_urdu'] = summary_result['summary_urdu']
+    if 'download' in scrape_result:
+        response['download'] = scrape_result['download']
+    return response
+
+
+def ndjson_line(result):
+    """Encode a result as one NDJSON line (UTF-8 bytes), with orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(result, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def read_url_list(lines):
+    """Parse URLs from an iterable of lines, skipping blanks and # comments."""
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            urls.append(line)
+    return urls
+
+
+class BatchSummarizer:
+    """Runs the scrape -> summarize pipeline over many URLs at once."""
+
+    def __init__(self, scraper, summarizer, max_workers=DEFAULT_MAX_WORKERS,
+                 per_host_limit=DEFAULT_PER_HOST_LIMIT, summary_processes=None,
+                 use_processes=True, cache=None):
+        """
+        Args:
+            scraper (BlogScraper): Scraper shared by the fetch threads
+            summarizer (AISummarizer): Summarizer copied into each worker process
+            max_workers (int): Maximum number of concurrent fetches overall
+            per_host_limit (int): Maximum number of concurrent fetches per host
+            summary_processes (int): Process pool size (defaults to CPU count)
+            use_processes (bool): Summarize in a process pool instead of the fetch thread
+            cache (SummaryCache): Optional cache consulted before scraping
+        """
+        self.scraper = scraper
+        self.summarizer = summarizer
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.summary_processes = summary_processes
+        self.use_processes = use_processes
+        self.cache = cache
+        self._process_pool = None
+        self._lock = threading.Lock()
+
+    def _get_process_pool(self):
+        """Create the summary process pool on first use."""
+        # concurrent.futures.process imports multiprocessing; load it on demand
+        from concurrent.futures import ProcessPoolExecutor
+
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.summary_processes,
+                    initializer=_init_summary_worker,
+                    initargs=(self.summarizer,)
+                )
+            return self._process_pool
+
+    def shutdown(self):
+        """Release the summary process pool."""
+        with self._lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=True, cancel_futures=True)
+                self._process_pool = None
+
+    def _summarize(self, title, content, target_length, engine=None):
+        """Summarize in the process pool, falling back to the current thread."""
+        if self.use_processes:
+            try:
+                future = self._get_process_pool().submit(
+                    _summarize_in_worker, title, content, target_length, engine
+                )
+                result, events = future.result()
+                metrics.replay(events)
+                return result
+            except Exception as e:
+                logging.error(f"Process pool unavailable, summarizing in thread: {str(e)}")
+                self.use_processes = False
+        return self.summarizer.generate_summary(title, content, target_length, engine=engine)
+
+    def _scrape_and_summarize(self, url, target_length, engine=None):
+        """Scrape a URL and summarize it, returning the combined result dict."""
+        scrape_result = self.scraper.scrape_blog_content(url)
+        if not scrape_result['success']:
+            return dict(scrape_result)
+
+        summary_result = self._summarize(
+            scrape_result['title'], scrape_result['content'], target_length, engine
+        )
+        if not summary_result['success']:
+            return dict(summary_result)
+        return format_result(scrape_result, summary_result)
+
+    def summarize_url(self, url, target_length=150, engine=None):
+        """
+        Scrape and summarize a single URL through the cache and process pool.
+
+        Returns:
+            dict: The API response shape, or an error dict; never raises
+        """
+        try:
+            if self.cache is not None:
+                result = dict(self.cache.get_or_compute(
+                    url, target_length, self.scraper.scrape_blog_content,
+                    partial(self._summarize, engine=engine), variant=engine
+                ))
+            else:
+                result = self._scrape_and_summarize(url, target_length, engine)
+        except Exception as e:
+            logging.error(f"Batch error for URL {url}: {str(e)}")
+            result = {'success': False, 'error': f"Processing failed: {str(e)}"}
+
+        result['url'] = url
+        return result
+
+    def _process_url(self, index, url, target_length, engine=None, politeness=None):
+        """Summarize one URL of a batch, tagging the result with its index.
+
+        With ``politeness``, the host's request slot was already reserved by
+        the dispatcher, so the fetch does not wait for it again.
+        """
+        if politeness is not None:
+            with politeness.prepaid(url):
+                result = self.summarize_url(url, target_length, engine)
+        else:
+            result = self.summarize_url(url, target_length, engine)
+        result['index'] = index
+        return result
+
+    def iter_results(self, urls, target_length=150, engine=None):
+        """
+        Process URLs concurrently and yield results in completion order.
+
+        Fetches are bounded by ``max_workers`` overall and ``per_host_limit``
+        per host. URLs waiting on a busy host are held back instead of
+        occupying a worker, so one slow host cannot stall the others. With a
+        polite scraper, each URL's request slot is reserved from its host's
+        rate limit and the URL is only dispatched once the slot is due.
+
+        Args:
+            urls (list): Blog URLs to summarize
+            target_length (int): Target summary length in words
+            engine (str): Summary engine, or None for the summarizer's default
+
+        Yields:
+            dict: Per-URL result with its ``index`` in the input list
+        """
+        pending = defaultdict(deque)
+        for index, url in enumerate(urls):
+            pending[urlparse(url).netloc.lower()].append((index, url))
+
+        ready_hosts = deque(pending)
+        active = defaultdict(int)
+        in_flight = {}
+        politeness = getattr(self.scraper, 'politeness', None)
+        # (due time, index, url, host) of URLs waiting for their host's rate limit
+        scheduled = []
+
+        def submit(index, url, host, prepaid):
+            future = executor.submit(self._process_url, index, url, target_length, engine,
+                                     politeness if prepaid else None)
+            in_flight[future] = host
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while ready_hosts or in_flight or scheduled:
+                now = time.monotonic()
+                while scheduled and scheduled[0][0] <= now:
+                    _, index, url, host = heapq.heappop(scheduled)
+                    submit(index, url, host, True)
+
+                # Fill free worker slots round-robin across hosts with capacity
+                while ready_hosts and len(in_flight) + len(scheduled) < self.max_workers:
+                    host = ready_hosts.popleft()
+                    index, url = pending[host].popleft()
+                    active[host] += 1
+                    delay = politeness.reserve(url) if politeness is not None else None
+                    if delay:
+                        heapq.heappush(scheduled, (now + delay, index, url, host))
+                    else:
+                        submit(index, url, host, delay is not None)
+                    if pending[host] and active[host] < self.per_host_limit:
+                        ready_hosts.append(host)
+
+                timeout = max(scheduled[0][0] - now, 0) if scheduled else None
+                if not in_flight:
+                    if timeout:
+                        time.sleep(timeout)
+                    continue
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host = in_flight.pop(future)
+                    active[host] -= 1
+                    # Host regained capacity: put it back in the rotation
+                    if pending[host] and active[host] == self.per_host_limit - 1:
+                        ready_hosts.append(host)
+                    yield future.result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
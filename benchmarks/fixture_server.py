@@ -0,0 +1,162 @@
+"""
+Local fixture HTTP server
+Serves a deterministic corpus of blog pages for offline benchmarks and demos.
+
+Routes:
+    /page/<size>[/<n>]   small | medium | huge article page (<n> makes URLs distinct)
+    /gzip/<size>         same page with Content-Encoding: gzip
+    /encoded/<size>      same page in the best of zstd/br/gzip the client accepts
+    /slow/<size>         page dripped out in small chunks
+    /redirect/<hops>     redirect chain ending at /page/small
+"""
+
+import gzip
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.text_throughput import generate_corpus
+from compression import RESPONSE_ENCODINGS, compress
+
+# Approximate article body sizes in bytes
+PAGE_SIZES = {
+    'small': 5 * 1024,
+    'medium': 100 * 1024,
+    'huge': 3 * 1024 * 1024
+}
+
+SLOW_CHUNK_SIZE = 1024
+SLOW_CHUNK_DELAY = 0.005
+
+
+def build_page(size, seed=0):
+    """Build a realistic blog page with chrome around an article of ``size`` bytes."""
+    rng = random.Random(seed)
+    text = generate_corpus(PAGE_SIZES[size] / (1024 * 1024), seed=seed)
+    paragraphs = [text[i:i + 600] for i in range(0, len(text), 600)]
+    links = ''.join(f"<li><a href='/page/small/{rng.randint(0, 999)}'>Related {i}</a></li>" for i in range(20))
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>Fixture post ({size})</title>"
+        "<style>body{font-family:sans-serif}</style>"
+        "<script>window.analytics = {track: function () {}};</script></head><body>"
+        f"<header><nav><ul>{links}</ul></nav></header>"
+        f"<aside class='sidebar'><ul>{links}</ul></aside>"
+        "<main><article class='post'><h1>Fixture post</h1>"
+        + ''.join(f"<p>{paragraph}</p>\n" for paragraph in paragraphs)
+        + "</article></main><footer>Fixture footer</footer></body></html>"
+    ).encode('utf-8')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and a small (e.g. compressed) body go out in separate writes;
+    # with Nagle on, the body waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+    pages = {}
+    gzipped = {}
+    encoded = {}
+
+    def do_GET(self):
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        route, arg = (parts + [None, None])[:2]
+
+        if route == 'page' and arg in self.pages:
+            self._send(self.pages[arg])
+        elif route == 'gzip' and arg in self.gzipped:
+            self._send(self.gzipped[arg], {'Content-Encoding': 'gzip'})
+        elif route == 'encoded' and arg in self.pages:
+            self._send_encoded(arg)
+        elif route == 'slow' and arg in self.pages:
+            self._send(self.pages[arg], drip=True)
+        elif route == 'redirect' and arg is not None and arg.isdigit():
+            hops = int(arg)
+            location = f"/redirect/{hops - 1}" if hops > 1 else "/page/small"
+            self.send_response(302)
+            self.send_header('Location', location)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self.send_error(404)
+
+    def _send_encoded(self, size):
+        accepted = [part.split(';')[0].strip().lower()
+                    for part in self.headers.get('Accept-Encoding', '').split(',')]
+        encoding = next((e for e in RESPONSE_ENCODINGS if e in accepted), None)
+        if encoding is None:
+            self._send(self.pages[size], {'Vary': 'Accept-Encoding'})
+            return
+        if (size, encoding) not in self.encoded:
+            self.encoded[(size, encoding)] = compress(self.pages[size], encoding)
+        self._send(self.encoded[(size, encoding)],
+                   {'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'})
+
+    def _send(self, body, headers=None, drip=False):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', f'"{len(body)}"')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            if not drip:
+                self.wfile.write(body)
+                return
+            for start in range(0, len(body), SLOW_CHUNK_SIZE):
+                self.wfile.write(body[start:start + SLOW_CHUNK_SIZE])
+                self.wfile.flush()
+                time.sleep(SLOW_CHUNK_DELAY)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer:
+    """Runs the fixture corpus on a background thread; usable as a context manager."""
+
+    def __init__(self, host='127.0.0.1', port=0, sizes=None):
+        handler = type('Handler', (FixtureHandler,), {
+            'pages': {size: build_page(size) for size in (sizes or PAGE_SIZES)},
+        })
+        handler.gzipped = {size: gzip.compress(page) for size, page in handler.pages.items()}
+        handler.encoded = {}
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path):
+        return self.base_url + path
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    with FixtureServer(port=8765) as fixtures:
+        print(f"🧪 Serving fixture pages at {fixtures.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
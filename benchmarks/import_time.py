@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark
+Measures the cold import cost of the entry-point modules with
+``python -X importtime`` in fresh interpreters, lists the slowest imports
+and fails when a module is over its budget or pulls in a heavy dependency
+that should only load on first use.
+
+Usage:
+    python -m benchmarks.import_time [--repeat 5] [--top 10] [--module cli_summarizer]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budget per module in ms (interpreter startup excluded)
+BUDGETS = {
+    'cli_summarizer': 150,
+    'blog_scraper': 120,
+    'ai_summarizer': 60,
+    'app': 600
+}
+
+# Dependencies the core library imports on first use rather than at import time
+HEAVY_MODULES = ('flask', 'requests', 'urllib3', 'bs4', 'lxml', 'numpy', 'aiohttp', 'multiprocessing')
+
+# Modules that must stay free of HEAVY_MODULES at import time
+LAZY_MODULES = ('cli_summarizer', 'blog_scraper', 'ai_summarizer')
+
+DEFAULT_REPEAT = 5
+DEFAULT_TOP = 10
+
+
+def parse_importtime(output):
+    """
+    Parse ``-X importtime`` output.
+
+    Args:
+        output (str): stderr of ``python -X importtime``
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) tuples in report order
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((stripped.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def _run(code, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    return subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def measure(module, repeat=DEFAULT_REPEAT):
+    """
+    Import ``module`` in ``repeat`` fresh interpreters.
+
+    Returns:
+        dict: Fastest run's cumulative time in ms and its import rows
+    """
+    best = None
+    for _ in range(repeat):
+        rows = parse_importtime(_run(f"import {module}", importtime=True).stderr)
+        total = next(cumulative for name, _, cumulative, depth in rows if name == module and depth == 0)
+        if best is None or total < best['total_us']:
+            best = {'total_us': total, 'rows': rows}
+    return {'module': module, 'ms': best['total_us'] / 1000, 'rows': best['rows']}
+
+
+def heavy_imports(module):
+    """HEAVY_MODULES that are loaded once ``module`` has been imported."""
+    code = (f"import sys, json, {module}; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    return json.loads(_run(code).stdout)
+
+
+def slowest(rows, module, top=DEFAULT_TOP):
+    """Direct imports of ``module``, by cumulative time."""
+    # Children are reported before their parent, after the previous top-level import
+    end = next(i for i, (name, _, _, depth) in enumerate(rows) if name == module and depth == 0)
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    children = [(name, cumulative) for name, _, cumulative, depth in rows[start:end] if depth == 1]
+    return sorted(children, key=lambda row: row[1], reverse=True)[:top]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Entry-point import time benchmark")
+    parser.add_argument("--module", action="append", choices=sorted(BUDGETS),
+                        help="Module to measure (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Fresh interpreters per module (the fastest run is reported)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="Slowest imports to list per module")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    failures = []
+    for module in args.module or list(BUDGETS):
+        result = measure(module, args.repeat)
+        budget = BUDGETS[module]
+        status = "✅" if result['ms'] <= budget else "❌"
+        print(f"\n{status} {module:<16} {result['ms']:8.1f} ms  (budget {budget} ms)")
+        for name, cumulative in slowest(result['rows'], module, args.top):
+            print(f"     {name:<40} {cumulative / 1000:8.1f} ms")
+        if result['ms'] > budget:
+            failures.append(f"{module} took {result['ms']:.1f} ms (budget {budget} ms)")
+        if module in LAZY_MODULES:
+            loaded = heavy_imports(module)
+            if loaded:
+                failures.append(f"{module} imports {', '.join(loaded)} at import time")
+
+    if failures:
+        print(f"\n❌ {len(failures)} import budget failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\n✅ All modules within their import budgets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
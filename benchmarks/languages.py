@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Mixed-language throughput benchmark
+Cleans and summarizes batches of generated English and Urdu documents with
+language detection, and compares their throughput with the English-only
+path the pipeline had before (no detection, English resources for every
+document) on the all-English batch.
+
+Usage:
+    python -m benchmarks.languages [--documents 200] [--size-kb 8]
+                                   [--urdu-shares 0,0.25,0.5,1] [--repeat 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from ai_summarizer import AISummarizer
+from languages import LANGUAGES, get_language, detect_language
+from normalize import clean_text
+
+DEFAULT_DOCUMENTS = 200
+DEFAULT_SIZE_KB = 8
+DEFAULT_URDU_SHARES = '0,0.25,0.5,1'
+DEFAULT_REPEAT = 3
+
+ENGLISH_WORDS = ("search index cache latency python server summary keyword crawler parser "
+                 "feed update — “quoted” it's e.g. (note) 2024 café").split()
+URDU_WORDS = LANGUAGES['ur']['sample'].replace('۔', ' ').replace('،', ' ').replace('؟', ' ').split()
+
+TERMINATORS = {'en': ('. ', '! ', '? '), 'ur': ('۔ ', '؟ ', '۔\n')}
+
+
+def generate_document(language, size_kb, rng):
+    """Prose-like text of about ``size_kb`` KB in one language."""
+    words = ENGLISH_WORDS if language == 'en' else URDU_WORDS
+    parts = []
+    size = 0
+    while size < size_kb * 1024:
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(4, 30)))
+        sentence += rng.choice(TERMINATORS[language])
+        parts.append(sentence)
+        size += len(sentence.encode('utf-8'))
+    return ''.join(parts)
+
+
+def generate_batch(documents, size_kb, urdu_share, seed=0):
+    """``documents`` texts, ``urdu_share`` of them Urdu, in shuffled order."""
+    rng = random.Random(seed)
+    urdu = round(documents * urdu_share)
+    languages = ['ur'] * urdu + ['en'] * (documents - urdu)
+    rng.shuffle(languages)
+    return [generate_document(language, size_kb, rng) for language in languages]
+
+
+def legacy_pipeline(summarizer, text):
+    """The English-only path: clean and summarize without detection, kept as the baseline."""
+    return summarizer.generate_summary("Benchmark", clean_text(text), language='en')
+
+
+def pipeline(summarizer, text):
+    """Detect the language, clean with its punctuation and summarize."""
+    language = detect_language(text)
+    return summarizer.generate_summary("Benchmark", get_language(language).clean(text), language=language)
+
+
+def throughput(func, summarizer, batch, repeat):
+    """Best-of-N throughput over the batch, in MB/s and documents/s."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in batch:
+            func(summarizer, text)
+        best = min(best, time.perf_counter() - start)
+    size = sum(len(text.encode('utf-8')) for text in batch) / (1024 * 1024)
+    return size / best, len(batch) / best
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mixed-language summarization throughput benchmark")
+    parser.add_argument("--documents", type=int, default=DEFAULT_DOCUMENTS, help="Documents per batch")
+    parser.add_argument("--size-kb", type=float, default=DEFAULT_SIZE_KB, help="Size of each document")
+    parser.add_argument("--urdu-shares", default=DEFAULT_URDU_SHARES,
+                        help="Comma-separated shares of Urdu documents, one batch each")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per batch (best is kept)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summarizer = AISummarizer()
+
+    english = generate_batch(args.documents, args.size_kb, 0)
+    baseline, baseline_docs = throughput(legacy_pipeline, summarizer, english, args.repeat)
+    print(f"{'batch':<24} {'MB/s':>8} {'docs/s':>8} {'vs English-only':>16}")
+    print(f"{'English-only (legacy)':<24} {baseline:>8.2f} {baseline_docs:>8.0f} {'1.00x':>16}")
+
+    for share in (float(share) for share in args.urdu_shares.split(',') if share.strip()):
+        batch = generate_batch(args.documents, args.size_kb, share)
+        mb, docs = throughput(pipeline, summarizer, batch, args.repeat)
+        print(f"{f'{share:.0%} Urdu':<24} {mb:>8.2f} {docs:>8.0f} {f'{mb / baseline:.2f}x':>16}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Per-document memory benchmark
+Runs the parse -> clean -> summarize pipeline on fixture pages, each
+document in a fresh interpreter, and reports the RSS the document added at
+its peak next to the page size. The kernel's peak RSS counter is reset
+right before the document (/proc/self/clear_refs, Linux); the tracemalloc
+peak of Python allocations is reported as well, and alone elsewhere. A
+second table compares the retained sentence and keyword structures
+(list/Counter vs SentenceSpans/KeywordCounts).
+
+Documents are summarized in process with the single-pass path; the
+long-document path (see longdoc) is disabled unless --long-document-chars
+is given, since it summarizes in worker processes.
+
+Usage:
+    python -m benchmarks.memory [--sizes small,medium,huge]
+                                [--engines lxml,html.parser,soup] [--documents 3]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+from ai_summarizer import AISummarizer
+from benchmarks.fixture_server import PAGE_SIZES, build_page
+from blog_scraper import BlogScraper
+from document import SentenceSpans, KeywordCounts
+from normalize import split_sentences
+from text_analysis import keyword_counts
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = 'small,medium,huge'
+DEFAULT_ENGINES = 'lxml,html.parser,soup'
+DEFAULT_DOCUMENTS = 3
+
+
+def read_status():
+    """VmRSS and VmHWM (peak RSS) of this process in kB, or None without /proc."""
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f if line.startswith(('VmRSS', 'VmHWM')))
+    except OSError:
+        return None
+    return {name: int(value.split()[0]) for name, value in fields.items()}
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter to the current RSS (Linux only)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def rss_peak(func, *args):
+    """
+    Run func(*args) and return the RSS it added at its peak, in MB.
+
+    Returns:
+        tuple: (result, peak MB above the starting RSS, or None without /proc)
+    """
+    gc.collect()
+    status = read_status()
+    if status is None or not reset_peak_rss():
+        return func(*args), None
+    result = func(*args)
+    return result, max(read_status()['VmHWM'] - status['VmRSS'], 0) / 1024
+
+
+def python_peak(func, *args):
+    """Run func(*args) and return its tracemalloc peak of Python allocations, in MB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        result = func(*args)
+        peak = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+    return result, peak / (1024 * 1024)
+
+
+def footprint(obj):
+    """Approximate deep size in bytes of strings, arrays and the containers holding them."""
+    if isinstance(obj, SentenceSpans):
+        # The text is shared with the document, only the offsets are extra
+        return sys.getsizeof(obj) + sys.getsizeof(obj.starts) + sys.getsizeof(obj.ends)
+    if isinstance(obj, KeywordCounts):
+        # Interned words are shared with every other document using them
+        return sys.getsizeof(obj) + sys.getsizeof(obj.words) + sys.getsizeof(obj.counts)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(sys.getsizeof(item) for item in obj)
+    return size
+
+
+def summarize_page(scraper, summarizer, url, html):
+    """The per-document pipeline: extract and clean, then summarize."""
+    scrape = scraper.parse_html(url, html)
+    summary = summarizer.generate_summary(scrape['title'], scrape['content'])
+    return scrape, summary
+
+
+def measure_document(engine, size, seed=0, long_document_chars=None):
+    """
+    Peak memory of one document through the pipeline, in this process.
+
+    Run it in a fresh interpreter (see bench_document): a process that has
+    already handled a large page keeps that memory mapped for reuse, which
+    would hide the next document's peak.
+    """
+    scraper = BlogScraper(engine)
+    summarizer = AISummarizer(long_document_chars=long_document_chars)
+    # Warm imports and parser tables so they are not charged to the document
+    summarize_page(scraper, summarizer, 'http://fixtures.local/warm', build_page('small'))
+
+    url = f'http://fixtures.local/page/{size}/{seed}'
+    html = build_page(size, seed=seed)
+    (scrape, summary), rss = rss_peak(summarize_page, scraper, summarizer, url, html)
+    _, python = python_peak(summarize_page, scraper, summarizer, url, html)
+    return {
+        'engine': engine,
+        'size': size,
+        'page_kb': len(html) / 1024,
+        'text_kb': len(scrape['content']) / 1024,
+        'rss_mb': rss,
+        'python_mb': python,
+        'success': summary['success']
+    }
+
+
+def bench_document(engine, size, seed=0, long_document_chars=None):
+    """measure_document in a fresh interpreter."""
+    code = (f"import json; from benchmarks.memory import measure_document; "
+            f"print(json.dumps(measure_document({engine!r}, {size!r}, {seed}, {long_document_chars!r})))")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def retained_sizes(size):
+    """Bytes held by the per-document sentence and keyword structures, old vs compact."""
+    scrape = BlogScraper().parse_html('http://fixtures.local/', build_page(size))
+    text = scrape['content']
+    counts = keyword_counts(text)
+    return {
+        'size': size,
+        'sentence_list': footprint(split_sentences(text)),
+        'sentence_spans': footprint(SentenceSpans(text)),
+        'counter': footprint(counts),
+        'keyword_counts': footprint(KeywordCounts(counts))
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-document peak memory benchmark")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated fixture sizes ({', '.join(PAGE_SIZES)})")
+    parser.add_argument("--engines", default=DEFAULT_ENGINES, help="Comma-separated extraction engines")
+    parser.add_argument("--documents", type=int, default=DEFAULT_DOCUMENTS,
+                        help="Documents measured per engine and size")
+    parser.add_argument("--long-document-chars", type=int, default=0,
+                        help="Use the long-document path from this many characters (0: never)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [size for size in args.sizes.split(',') if size.strip()]
+    engines = [engine for engine in args.engines.split(',') if engine.strip()]
+
+    print(f"{'engine':<12} {'size':<7} {'page KB':>9} {'text KB':>9} {'RSS MB':>8} "
+          f"{'RSS/page':>9} {'Python MB':>10}")
+    for engine in engines:
+        for size in sizes:
+            for seed in range(args.documents):
+                row = bench_document(engine, size, seed, args.long_document_chars or None)
+                rss = (f"{row['rss_mb']:>8.1f} {row['rss_mb'] * 1024 / row['page_kb']:>8.1f}x"
+                       if row['rss_mb'] is not None else f"{'n/a':>8} {'':>9}")
+                status = '' if row['success'] else '  (summary failed)'
+                print(f"{row['engine']:<12} {row['size']:<7} {row['page_kb']:>9.0f} {row['text_kb']:>9.0f} "
+                      f"{rss} {row['python_mb']:>10.1f}{status}")
+
+    print(f"\n{'size':<7} {'sentences list':>15} {'spans':>10} {'Counter':>10} {'KeywordCounts':>14}  (KB)")
+    for size in sizes:
+        sizes_kb = {name: value / 1024 for name, value in retained_sizes(size).items() if name != 'size'}
+        print(f"{size:<7} {sizes_kb['sentence_list']:>15.0f} {sizes_kb['sentence_spans']:>10.0f} "
+              f"{sizes_kb['counter']:>10.0f} {sizes_kb['keyword_counts']:>14.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Offline pipeline benchmark
+Runs BlogScraper, AISummarizer and the /api/summarize endpoint against the
+local fixture server at several concurrency levels and reports throughput,
+p50/p95/p99 latency and peak RSS. Results are saved as JSON and can be
+compared against a previous run to catch regressions.
+
+Usage:
+    python -m benchmarks.pipeline [--requests 20] [--concurrency 1,4,16]
+                                  [--output results.json] [--baseline old.json]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixture_server import FixtureServer
+
+# Fixture paths exercised by the scraper runs, cheapest first (peak RSS only grows)
+SCRAPE_PATHS = [
+    ('small', '/page/small'),
+    ('medium', '/page/medium'),
+    ('gzip-medium', '/gzip/medium'),
+    ('encoded-medium', '/encoded/medium'),
+    ('redirect-5', '/redirect/5'),
+    ('slow-small', '/slow/small'),
+    ('huge', '/page/huge')
+]
+
+SUMMARIZE_SIZES = ['small', 'medium', 'huge']
+
+# Huge pages are slow enough that a handful of requests is representative
+HUGE_REQUEST_CAP = 4
+
+DEFAULT_REQUESTS = 20
+DEFAULT_CONCURRENCY = '1,4,16'
+DEFAULT_TOLERANCE = 0.15
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a sorted list of samples."""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))
+    return samples[index]
+
+
+def run_load(func, items, concurrency):
+    """
+    Call func(item) for every item from ``concurrency`` threads.
+
+    Returns:
+        dict: requests, errors, wall time, throughput and latency percentiles
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def timed(item):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = func(item)
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, items))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(items),
+        'errors': errors,
+        'concurrency': concurrency,
+        'wall_seconds': round(wall, 4),
+        'throughput_rps': round(len(items) / wall, 3) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def thread_local_factory(factory):
+    """Return a getter that builds one object per thread (e.g. one HTTP session)."""
+    local = threading.local()
+
+    def get():
+        instance = getattr(local, 'instance', None)
+        if instance is None:
+            instance = local.instance = factory()
+        return instance
+    return get
+
+
+def bench_scraper(fixtures, levels, requests, report):
+    from app import BlogScraper
+
+    for streaming in (False, True):
+        mode = 'stream' if streaming else 'buffered'
+        get_scraper = thread_local_factory(lambda: BlogScraper(streaming=streaming))
+        for name, path in SCRAPE_PATHS:
+            count = min(requests, HUGE_REQUEST_CAP) if name == 'huge' else requests
+            urls = [fixtures.url(path)] * count
+            for level in levels:
+                stats = run_load(lambda url: get_scraper().scrape_blog_content(url)['success'],
+                                 urls, level)
+                report(f"scrape/{mode}/{name}/c{level}", stats)
+
+
+def bench_summarizer(fixtures, levels, requests, report):
+    from app import BlogScraper, AISummarizer
+
+    scraper = BlogScraper()
+    summarizer = AISummarizer()
+    for size in SUMMARIZE_SIZES:
+        page = scraper.scrape_blog_content(fixtures.url(f'/page/{size}'))
+        count = min(requests, HUGE_REQUEST_CAP) if size == 'huge' else requests
+        items = [(page['title'], page['content'])] * count
+        for level in levels:
+            stats = run_load(lambda item: summarizer.generate_summary(*item)['success'],
+                             items, level)
+            report(f"summarize/{size}/c{level}", stats)
+
+
+def bench_endpoint(fixtures, levels, requests, report):
+    import requests as http
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    endpoint = f"http://127.0.0.1:{server.server_port}/api/summarize"
+    get_session = thread_local_factory(http.Session)
+    run_id = int(time.time() * 1000)
+
+    def post(url):
+        response = get_session().post(endpoint, json={'url': url}, timeout=60)
+        return response.status_code == 200 and response.json().get('success')
+
+    try:
+        for level in levels:
+            # Distinct URLs per run so the summary cache does not turn this into a hit benchmark
+            urls = [fixtures.url(f'/page/small/{run_id}-{level}-{i}') for i in range(requests)]
+            report(f"endpoint/summarize/c{level}", run_load(post, urls, level))
+    finally:
+        server.shutdown()
+
+
+SUITES = {
+    'scraper': bench_scraper,
+    'summarizer': bench_summarizer,
+    'endpoint': bench_endpoint
+}
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare scenario results against a baseline run.
+
+    Args:
+        results (dict): {scenario: stats} for this run
+        baseline (dict): {scenario: stats} from a saved run
+        tolerance (float): Allowed relative slowdown before flagging
+
+    Returns:
+        list: (scenario, metric, baseline value, current value, change) regressions
+    """
+    regressions = []
+    for scenario, stats in results.items():
+        old = baseline.get(scenario)
+        if not old:
+            continue
+        if old['throughput_rps'] and stats['throughput_rps'] < old['throughput_rps'] * (1 - tolerance):
+            change = stats['throughput_rps'] / old['throughput_rps'] - 1
+            regressions.append((scenario, 'throughput_rps', old['throughput_rps'], stats['throughput_rps'], change))
+        if old['p95_ms'] and stats['p95_ms'] > old['p95_ms'] * (1 + tolerance):
+            change = stats['p95_ms'] / old['p95_ms'] - 1
+            regressions.append((scenario, 'p95_ms', old['p95_ms'], stats['p95_ms'], change))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline blog summarizer pipeline benchmark")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="Suite to run (repeatable; default: all)")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS,
+                        help="Requests per scenario")
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY,
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative slowdown allowed before a regression is reported")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    results = {}
+
+    def report(scenario, stats):
+        results[scenario] = stats
+        rss = f"{stats['peak_rss_mb']:.0f} MB" if stats['peak_rss_mb'] is not None else "n/a"
+        print(f"{scenario:<34} {stats['throughput_rps']:9.2f} req/s  "
+              f"p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms  "
+              f"p99 {stats['p99_ms']:9.2f} ms  rss {rss}  errors {stats['errors']}")
+
+    with FixtureServer() as fixtures:
+        print(f"🧪 Fixture server at {fixtures.base_url}")
+        for name in args.suite or list(SUITES):
+            print(f"\n📊 {name}")
+            print("-" * 40)
+            SUITES[name](fixtures, levels, args.requests, report)
+
+    document = {
+        'created_at': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'requests': args.requests,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for scenario, metric, old, new, change in regressions:
+                print(f"  {scenario:<34} {metric:<15} {old:>10} -> {new:<10} ({change:+.0%})")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Search index latency benchmark
+Builds a synthetic segment (Zipf-distributed keywords) and reports query
+latency percentiles for one- and multi-term queries.
+Usage: python -m benchmarks.search_latency [--docs 1000000] [--queries 2000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from search_index import SearchIndex, write_segment, DEFAULT_INDEX_TERMS
+
+VOCABULARY = 200000
+
+
+def term_name(number):
+    """Letters-only keyword for a term number (keywords never contain digits)."""
+    letters = []
+    for _ in range(4):
+        number, digit = divmod(number, 26)
+        letters.append(chr(ord('a') + digit))
+    return 'kw' + ''.join(letters)
+
+
+def build_segment(path, docs, seed=42):
+    """Write a segment of ``docs`` documents with DEFAULT_INDEX_TERMS keywords each."""
+    rng = np.random.default_rng(seed)
+    terms = (rng.zipf(1.2, size=docs * DEFAULT_INDEX_TERMS) - 1) % VOCABULARY
+    doc_ids = np.repeat(np.arange(docs, dtype=np.uint32), DEFAULT_INDEX_TERMS)
+    tfs = np.minimum(rng.zipf(2.0, size=len(terms)), 0xFFFF).astype(np.uint16)
+
+    order = np.argsort(terms, kind='stable')
+    terms, doc_ids, tfs = terms[order], doc_ids[order], tfs[order]
+    bounds = np.flatnonzero(np.r_[True, terms[1:] != terms[:-1], True])
+    postings = {}
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        # Drop repeated (term, doc) pairs from the sampling
+        ids, first = np.unique(doc_ids[start:end], return_index=True)
+        postings[term_name(int(terms[start]))] = (ids, tfs[start:end][first])
+    write_segment(path, [(f"https://example.com/post/{i}", f"Post {i}") for i in range(docs)], postings)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {q: samples[min(len(samples) - 1, int(q / 100 * len(samples)))] * 1000 for q in (50, 95, 99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search index latency benchmark")
+    parser.add_argument("--docs", type=int, default=1000000, help="Documents in the synthetic segment")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries per workload")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.idx")
+        start = time.perf_counter()
+        build_segment(path, args.docs)
+        print(f"🏗️  Built {args.docs:,} docs in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(path) / (1024 * 1024):.0f} MB)")
+
+        start = time.perf_counter()
+        index = SearchIndex(path)
+        print(f"📂 Opened in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        rng = np.random.default_rng(7)
+        workloads = {
+            '1 term (head)': lambda: term_name(int(rng.integers(0, 10))),
+            '1 term (tail)': lambda: term_name(int(rng.integers(1000, VOCABULARY))),
+            '3 terms (mixed)': lambda: " ".join(term_name(int(t)) for t in
+                                                 (rng.integers(0, 10), rng.integers(10, 1000),
+                                                  rng.integers(1000, VOCABULARY)))
+        }
+        for name, make_query in workloads.items():
+            latencies = []
+            for _ in range(args.queries):
+                query = make_query()
+                start = time.perf_counter()
+                index.search(query, k=10)
+                latencies.append(time.perf_counter() - start)
+            p = percentiles(latencies)
+            print(f"{name:<18} p50 {p[50]:7.3f} ms  p95 {p[95]:7.3f} ms  p99 {p[99]:7.3f} ms")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
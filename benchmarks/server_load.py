@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Pre-fork server load test
+Starts the production server (gunicorn -c gunicorn.conf.py app:app) with
+1, 2, 4 ... worker processes against the local fixture server and reports
+/api/summarize throughput and latency per worker count, so scaling with
+cores is visible. Every request summarizes a distinct fixture URL (a cold
+cache), so the numbers measure scrape + summarize work, not cache hits.
+
+Usage:
+    python -m benchmarks.server_load [--workers 1,2,4] [--threads 4]
+                                     [--requests 200] [--size medium]
+"""
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.pipeline import run_load, thread_local_factory
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_THREADS = 4
+DEFAULT_REQUESTS = 200
+DEFAULT_SIZE = 'medium'
+STARTUP_TIMEOUT = 30
+
+
+def default_worker_levels():
+    """1, 2, 4 ... up to the CPU count (always including it)."""
+    cpus = os.cpu_count() or 1
+    levels = []
+    level = 1
+    while level < cpus:
+        levels.append(level)
+        level *= 2
+    return levels + [cpus]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class ProductionServer:
+    """gunicorn with the repo's production settings, on a free local port."""
+
+    def __init__(self, workers, threads=DEFAULT_THREADS, state_dir=None, env=None, quiet=True):
+        self.workers = workers
+        self.threads = threads
+        self.port = free_port()
+        self._tmp = None
+        if state_dir is None:
+            self._tmp = tempfile.TemporaryDirectory()
+            state_dir = self._tmp.name
+        self.env = dict(os.environ, WEB_CONCURRENCY=str(workers), WEB_THREADS=str(threads),
+                        BIND=f"127.0.0.1:{self.port}", SERVER_STATE_DIR=state_dir, **(env or {}))
+        # Fresh files per server so every run starts with a cold shared cache
+        for name in ('CACHE_DB_PATH', 'JOB_DB_PATH', 'WATCH_DB_PATH'):
+            self.env.pop(name, None)
+        self.quiet = quiet
+        self.process = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def url(self, path):
+        return self.base_url + path
+
+    def start(self):
+        output = subprocess.DEVNULL if self.quiet else None
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+            cwd=ROOT, env=self.env, stdout=output, stderr=output
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {self.process.returncode}")
+            try:
+                requests.get(self.url('/api/cache/stats'), timeout=1)
+                return self
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError("gunicorn did not start in time")
+
+    def reload(self):
+        """Gracefully replace the workers (SIGHUP)."""
+        self.process.send_signal(signal.SIGHUP)
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=STARTUP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def bench_workers(fixtures, workers, threads, count, size, offset=0):
+    """Throughput of /api/summarize on distinct URLs with ``workers`` processes."""
+    with ProductionServer(workers, threads) as server:
+        get_session = thread_local_factory(requests.Session)
+
+        def summarize(n):
+            response = get_session().post(server.url('/api/summarize'), timeout=60,
+                                          json={'url': fixtures.url(f'/page/{size}/{n}')})
+            return response.json().get('success')
+
+        # Warm every worker's imports and connections before measuring
+        run_load(summarize, list(range(offset, offset + workers * threads)), workers * threads)
+        # Two requests in flight per server thread keeps every worker busy
+        items = list(range(offset + workers * threads, offset + workers * threads + count))
+        return run_load(summarize, items, workers * threads * 2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-fork production server load test")
+    parser.add_argument("--workers", default=','.join(map(str, default_worker_levels())),
+                        help="Comma-separated worker process counts")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Threads per worker")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS,
+                        help="Measured requests per worker count")
+    parser.add_argument("--size", default=DEFAULT_SIZE, choices=['small', 'medium', 'huge'],
+                        help="Fixture page size to summarize")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    levels = [int(level) for level in args.workers.split(',') if level.strip()]
+
+    with FixtureServer(sizes=[args.size]) as fixtures:
+        print(f"🧪 Fixture server at {fixtures.base_url}, {os.cpu_count()} CPUs, "
+              f"{args.threads} threads per worker")
+        print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+        baseline = None
+        for i, workers in enumerate(levels):
+            stats = bench_workers(fixtures, workers, args.threads, args.requests, args.size,
+                                  offset=i * 1000000)
+            baseline = baseline or stats['throughput_rps']
+            speedup = stats['throughput_rps'] / baseline if baseline else 0.0
+            print(f"{workers:>8} {stats['throughput_rps']:>10.1f} {speedup:>7.2f}x "
+                  f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['errors']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
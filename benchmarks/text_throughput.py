@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Text pipeline micro-benchmark
+Reports MB/s for cleaning, sentence splitting, keyword extraction and
+TextRank scoring.
+Usage: python -m benchmarks.text_throughput [--size-mb 8] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import re
+import time
+
+from normalize import clean_text, iter_sentences, split_sentences
+from summary_engines import textrank_scores
+from text_analysis import top_keywords
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_FILES = ['demo-content.md', 'README.md']
+
+WORDS = ("artificial intelligence healthcare model data learning patient image drug "
+         "network cloud risk policy — “quoted” it's e.g. (note) 2024 café").split()
+
+
+def legacy_clean(text):
+    """The original two-pass cleaner, kept as the baseline."""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)]', '', text)
+    return text.strip()
+
+
+def legacy_sentences(text):
+    """The original list-building sentence splitter, kept as the baseline."""
+    sentences = re.split(r'[.!?]+', text)
+    return [s.strip() for s in sentences if len(s.strip()) > 10]
+
+
+def generate_corpus(size_mb, seed=42):
+    """Generate prose-like text with mixed whitespace and punctuation."""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    target = int(size_mb * 1024 * 1024)
+    while size < target:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30)))
+        sentence += rng.choice(['. ', '! ', '? ', '.\n\n', '...\t'])
+        parts.append(sentence)
+        size += len(sentence)
+    return ''.join(parts)
+
+
+def load_corpora(size_mb):
+    corpora = {}
+    for name in SAMPLE_FILES:
+        path = os.path.join(ROOT, name)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                corpora[name] = f.read()
+    corpora[f'generated-{size_mb}mb'] = generate_corpus(size_mb)
+    return corpora
+
+
+def throughput(func, text, repeat):
+    """Best-of-N throughput in MB/s."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode('utf-8')) / (1024 * 1024) / best
+
+
+BENCHMARKS = [
+    ('clean (legacy)', legacy_clean),
+    ('clean', clean_text),
+    ('sentences (legacy)', legacy_sentences),
+    ('sentences (lazy)', lambda text: sum(1 for _ in iter_sentences(text))),
+    ('keywords top-10', lambda text: top_keywords(text, 10)),
+    ('textrank', lambda text: textrank_scores(split_sentences(text))),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text normalization throughput benchmark")
+    parser.add_argument("--size-mb", type=float, default=8, help="Size of the generated corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    for name, text in load_corpora(args.size_mb).items():
+        size = len(text.encode('utf-8')) / (1024 * 1024)
+        print(f"\n📄 {name} ({size:.2f} MB)")
+        print("-" * 40)
+        for label, func in BENCHMARKS:
+            print(f"{label:<22} {throughput(func, text, args.repeat):8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
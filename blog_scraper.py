@@ -0,0 +1,397 @@
+"""
+Blog Scraper
+Fetches blog pages and extracts their title and main text. Part of the core
+library shared by the Flask app and the CLI; requests, BeautifulSoup and
+aiohttp are only imported once they are needed.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+from metrics import registry as metrics, host_of
+from normalize import count_words
+from languages import get_language, detect_language
+from streaming import (parse_content_type, is_html_content_type, looks_binary, iter_body,
+                       read_budgeted, set_read_timeout, DEFAULT_MAX_BYTES, DEFAULT_DEADLINE)
+from extractor import (extract, StreamingExtraction, ContentExtractor, CONTENT_SELECTORS, UNWANTED_TAGS,
+                       DEFAULT_ENGINE, BODY_SELECTOR, best_candidate, score_candidate, text_chars)
+from cache import conditional_headers, response_validators, not_modified_result
+from dedupe import find_canonical
+from politeness import (HostPoliteness, RobotsCache, CircuitOpenError, DEFAULT_HOST_RATE,
+                        DEFAULT_HOST_BURST)
+from compression import accept_encoding, needs_decoding, decode_body, decode_chunks, wire_bytes
+
+# Seconds to wait for the connection and for each read of a response
+REQUEST_TIMEOUT = 10
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class BlogScraper:
+    """Handles web scraping functionality for blog content."""
+    
+    def __init__(self, extraction_engine=DEFAULT_ENGINE, streaming=False,
+                 max_bytes=DEFAULT_MAX_BYTES, deadline=DEFAULT_DEADLINE, polite=False,
+                 host_rate=DEFAULT_HOST_RATE, host_burst=DEFAULT_HOST_BURST, profiles=None):
+        """
+        Args:
+            extraction_engine (str): 'html.parser' (default) or 'lxml' for the single-pass
+                extractor, or 'soup' for the full BeautifulSoup tree
+            streaming (bool): Stream the body into the parser instead of buffering it
+            max_bytes (int): Streaming mode: body bytes to read before truncating
+            deadline (float): Streaming mode: seconds allowed for the whole transfer
+            polite (bool): Rate-limit, retry and circuit-break requests per host
+            host_rate (float): Polite mode: requests per second per host
+            host_burst (int): Polite mode: requests a host may receive back to back
+            profiles (ExtractionProfiles): Learn and reuse the best content
+                selector per host instead of the fixed selector order
+        """
+        self.extraction_engine = extraction_engine
+        self.streaming = streaming
+        self.max_bytes = max_bytes
+        self.deadline = deadline
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.profiles = profiles
+        self.politeness = None
+        if polite:
+            self.politeness = HostPoliteness(host_rate, host_burst,
+                                             robots=RobotsCache(self._fetch_robots))
+    
+    @property
+    def session(self):
+        """The requests.Session, created (and requests imported) on first use."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+                self._session.headers.update({
+                    'User-Agent': USER_AGENT,
+                    'Accept-Encoding': accept_encoding()
+                })
+            return self._session
+    
+    def _get(self, url, **kwargs):
+        """GET a URL, through the per-host politeness policy in polite mode."""
+        if self.politeness is None:
+            return self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+        
+        import requests
+        return self.politeness.request(
+            url, lambda: self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs),
+            retry_exceptions=(requests.ConnectionError, requests.Timeout)
+        )
+    
+    def _fetch_robots(self, robots_url):
+        """Fetch a robots.txt for the politeness policy."""
+        response = self.session.get(robots_url, timeout=5)
+        return response.status_code, response.text
+    
+    def scrape_blog_content(self, url, validators=None):
+        """
+        Scrape text content from a blog URL.
+        
+        Args:
+            url (str): The blog URL to scrape
+            validators (dict): Optional 'etag'/'last_modified' from a previous
+                fetch, sent as a conditional GET
+            
+        Returns:
+            dict: Contains title, content, and metadata, or 'not_modified'
+                when the server answered 304
+        """
+        import requests
+        
+        try:
+            # Validate URL
+            if not self._is_valid_url(url):
+                raise ValueError("Invalid URL format")
+            
+            host = host_of(url)
+            with metrics.timer('scrape', host):
+                if self.streaming:
+                    return self._scrape_streaming(url, validators)
+                
+                # Fetch the webpage
+                started = time.perf_counter()
+                response = self._get(url, headers=conditional_headers(validators))
+                
+                # elapsed covers DNS, connect and time to the response headers
+                headers_time = response.elapsed.total_seconds()
+                metrics.observe('headers', headers_time, host)
+                metrics.observe('download', max(time.perf_counter() - started - headers_time, 0.0), host)
+                
+                # urllib3 decodes gzip/br itself; other codings (zstd) are decoded here
+                body = response.content
+                encoding = needs_decoding(response.headers)
+                if encoding:
+                    body = decode_body(body, encoding)
+                self._count_transfer(host, len(body), wire_bytes(response, len(response.content)))
+                
+                if response.status_code == 304:
+                    return not_modified_result(url, response.headers)
+                response.raise_for_status()
+                
+                result = self.parse_html(url, body)
+                result.update(response_validators(response.headers))
+                return result
+            
+        except requests.RequestException as e:
+            metrics.increment('scrape_errors', 1, host_of(url))
+            logging.error(f"Request error for URL {url}: {str(e)}")
+            return {'success': False, 'error': f"Failed to fetch URL: {str(e)}"}
+        except CircuitOpenError as e:
+            metrics.increment('scrape_errors', 1, host_of(url))
+            return {'success': False, 'error': f"Failed to fetch URL: {str(e)}"}
+        except Exception as e:
+            metrics.increment('scrape_errors', 1, host_of(url))
+            logging.error(f"Scraping error for URL {url}: {str(e)}")
+            return {'success': False, 'error': f"Scraping failed: {str(e)}"}
+    
+    def _scrape_streaming(self, url, validators=None):
+        """Fetch with a byte budget and deadline, parsing chunks as they arrive."""
+        host = host_of(url)
+        started = time.perf_counter()
+        with self._get(url, headers=conditional_headers(validators), stream=True) as response:
+            metrics.observe('headers', time.perf_counter() - started, host)
+            if response.status_code == 304:
+                return not_modified_result(url, response.headers)
+            response.raise_for_status()
+            
+            # Reject non-HTML before any of the body is downloaded
+            mime_type, charset = parse_content_type(response.headers.get('Content-Type'))
+            if not is_html_content_type(mime_type):
+                return {'success': False, 'error': f"Unsupported content type: {mime_type}"}
+            
+            # No read may block past the deadline, however slowly the server drips
+            transfer_started = time.monotonic()
+            
+            def read_timeout(remaining):
+                set_read_timeout(response, min(REQUEST_TIMEOUT, remaining))
+            
+            chunks = iter_body(response)
+            encoding = needs_decoding(response.headers)
+            if encoding:
+                chunks = decode_chunks(chunks, encoding)
+            if self.deadline is not None:
+                read_timeout(self.deadline)
+            first_chunk = next(chunks, b'')
+            if looks_binary(first_chunk, charset):
+                return {'success': False, 'error': "Unsupported content type: binary data"}
+            chunks = itertools.chain([first_chunk], chunks)
+            
+            if self.extraction_engine == 'soup':
+                body = bytearray()
+                with metrics.timer('download', host):
+                    download = read_budgeted(chunks, body.extend, self.max_bytes, self.deadline,
+                                             read_timeout, transfer_started)
+                # Rebinding drops the bytearray as soon as the copy exists
+                body = bytes(body)
+                result = self.parse_html(url, body)
+            else:
+                target = self._profile_target(host)
+                extraction = StreamingExtraction(self.extraction_engine, charset, target=target)
+                # Parsing is interleaved with the transfer; 'parse' only covers the tail
+                with metrics.timer('download', host):
+                    download = read_budgeted(chunks, extraction.feed, self.max_bytes, self.deadline,
+                                             read_timeout, transfer_started)
+                with metrics.timer('parse', host):
+                    title, content = extraction.close()
+                self._update_profile(host, target)
+                # <head> normally fits in the first chunk
+                result = self._build_result(url, title, content, find_canonical(first_chunk, url))
+            
+            self._count_transfer(host, download['bytes'], wire_bytes(response, download['bytes']))
+            result.update(response_validators(response.headers))
+            result['download'] = download
+            return result
+    
+    def _profile_target(self, host):
+        """ContentExtractor set up from the host's extraction profile (None without profiles)."""
+        if self.profiles is None:
+            return None
+        preferred, rank = self.profiles.plan(host)
+        return ContentExtractor(preferred=preferred, rank=rank)
+    
+    def _update_profile(self, host, target):
+        """Feed the container an extraction used back into the host's profile."""
+        if target is None:
+            return
+        if target.rank:
+            self.profiles.learn(host, best_candidate(target.ranking), target.ranking)
+        else:
+            self.profiles.record(host, target.preferred, target.selector)
+    
+    def _count_transfer(self, host, decoded, wire):
+        """Record decoded body bytes and the bytes that actually crossed the wire."""
+        metrics.increment('bytes_downloaded', decoded, host)
+        metrics.increment('wire_bytes', wire, host)
+        metrics.increment('compression_saved_bytes', max(decoded - wire, 0), host)
+    
+    def parse_html(self, url, html):
+        """
+        Build the scrape result from a downloaded page.
+        
+        Args:
+            url (str): The URL the page was fetched from
+            html (bytes): Raw HTML body
+            
+        Returns:
+            dict: Contains title, content, and metadata
+        """
+        host = host_of(url)
+        target = self._profile_target(host)
+        with metrics.timer('parse', host):
+            if self.extraction_engine == 'soup':
+                from bs4 import BeautifulSoup
+                
+                # Parse HTML content
+                soup = BeautifulSoup(html, 'html.parser')
+                
+                # Extract title
+                title = self._extract_title(soup)
+                
+                # Extract main content
+                content = self._extract_content(soup, target)
+                
+                # The tree is full of parent/child cycles; break them now
+                # instead of leaving it to the cyclic garbage collector
+                soup.decompose()
+                del soup
+            else:
+                # Title and main content in one streaming pass
+                title, content = extract(html, self.extraction_engine, target=target)
+        self._update_profile(host, target)
+        
+        return self._build_result(url, title, content, find_canonical(html, url))
+    
+    def _build_result(self, url, title, content, canonical_url=None):
+        """Clean extracted text and assemble the scrape result."""
+        host = host_of(url)
+        
+        # Clean and process text
+        with metrics.timer('clean', host):
+            cleaned_content = self._clean_text(content)
+        word_count = count_words(cleaned_content)
+        metrics.increment('pages_scraped', 1, host)
+        metrics.increment('words_extracted', word_count, host)
+        
+        result = {
+            'success': True,
+            'url': url,
+            'title': title,
+            'content': cleaned_content,
+            'word_count': word_count,
+            'char_count': len(cleaned_content)
+        }
+        if canonical_url:
+            result['canonical_url'] = canonical_url
+        return result
+    
+    def _is_valid_url(self, url):
+        """Validate if the URL is properly formatted."""
+        try:
+            result = urlparse(url)
+            return all([result.scheme, result.netloc])
+        except:
+            return False
+    
+    def _extract_title(self, soup):
+        """Extract page title from HTML."""
+        title_tag = soup.find('title')
+        if title_tag:
+            return title_tag.get_text().strip()
+        
+        # Try alternative title sources
+        h1_tag = soup.find('h1')
+        if h1_tag:
+            return h1_tag.get_text().strip()
+        
+        return "No title found"
+    
+    def _extract_content(self, soup, target=None):
+        """
+        Extract main content from HTML.
+        
+        Args:
+            soup: Parsed page
+            target (ContentExtractor): Optional extraction profile plan; the
+                preferred or best-ranked container is used and the chosen
+                selector (and ranking) are recorded on it, as the streaming
+                extractor does
+        """
+        # Remove unwanted elements
+        for element in soup(list(UNWANTED_TAGS)):
+            element.decompose()
+        
+        if target is not None:
+            elements = {}
+            for selector in target.selector_names:
+                element = soup.find('body') if selector == BODY_SELECTOR else soup.select_one(selector)
+                if element:
+                    elements[selector] = element
+            
+            if target.rank:
+                target.ranking = []
+                for selector, element in elements.items():
+                    links = sum(text_chars(link.get_text()) for link in element.find_all('a'))
+                    candidate = score_candidate(text_chars(element.get_text()), links,
+                                                len(element.find_all(True)) + 1)
+                    candidate['selector'] = selector
+                    target.ranking.append(candidate)
+                best = best_candidate(target.ranking)
+                if best is not None:
+                    target.selector = best
+                    return elements[best].get_text()
+            elif target.preferred in elements:
+                text = elements[target.preferred].get_text()
+                if text.strip():
+                    target.selector = target.preferred
+                    return text
+            
+            for selector in target.selector_names:
+                if selector in elements:
+                    target.selector = selector
+                    return elements[selector].get_text()
+            return soup.get_text()
+        
+        # Try to find main content containers
+        for selector in CONTENT_SELECTORS:
+            content_element = soup.select_one(selector)
+            if content_element:
+                return content_element.get_text()
+        
+        # Fallback: extract from body
+        body = soup.find('body')
+        if body:
+            return body.get_text()
+        
+        return soup.get_text()
+    
+    def _clean_text(self, text):
+        """Clean and normalize extracted text, keeping its language's punctuation."""
+        return get_language(detect_language(text)).clean(text)
+
+
+def create_scraper(backend='sync', extraction_engine=DEFAULT_ENGINE, **options):
+    """
+    Create a scraper for the requested fetch backend.
+    
+    Args:
+        backend (str): 'sync' for requests.Session, 'async' for the aiohttp engine
+        extraction_engine (str): HTML extraction engine, see BlogScraper
+        **options: Streaming, politeness and profile options passed to BlogScraper
+            (the async backend only uses ``profiles``)
+        
+    Returns:
+        An object providing scrape_blog_content(url)
+    """
+    if backend == 'sync':
+        return BlogScraper(extraction_engine, **options)
+    if backend == 'async':
+        from async_scraper import AsyncBlogScraper
+        return AsyncBlogScraper(BlogScraper(extraction_engine, profiles=options.get('profiles')))
+    raise ValueError(f"Unknown scraper backend: {backend}")
@@ -0,0 +1,429 @@
+"""
+Summary Cache
+Two-tier (memory LRU + optional SQLite) cache for summaries, revalidated with
+conditional GETs and content hashes so unchanged pages are not re-summarized.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from batch import format_result
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_REVALIDATE_AFTER = 5 * 60
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Query parameters that only track the visit and never change the article
+TRACKING_PARAMS = frozenset(['fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid',
+                             'igshid', 'yclid', '_ga', '_hsenc', '_hsmi', 'ref_src'])
+TRACKING_PREFIXES = ('utm_',)
+
+# Query parameters that select an AMP rendering, with the values that do
+# (None: any value)
+AMP_PARAMS = {'amp': None, 'outputtype': frozenset(['amp'])}
+
+# Path segments of listing pages, where a following /amp is a real page
+# (e.g. the "amp" tag) rather than the AMP rendering of an article
+LISTING_SEGMENTS = frozenset(['tag', 'tags', 'topic', 'topics', 'category', 'categories',
+                              'author', 'authors', 'series', 'archive', 'search', 'label'])
+
+
+def _keep_param(name, value):
+    name = name.lower()
+    if name in AMP_PARAMS:
+        values = AMP_PARAMS[name]
+        return values is not None and value.lower() not in values
+    return not (name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES))
+
+
+def _strip_amp_suffix(path):
+    """
+    Path of the article an ``.../article/amp`` path renders, or the path
+    itself. A trailing slash after ``amp`` stays on the article path, so
+    both spellings map as the canonical URL would be written.
+    """
+    trailing = path.endswith('/')
+    segments = path.rstrip('/').split('/')
+    # ['', 'post', 'amp']: an article segment must come before 'amp'
+    if len(segments) < 3 or segments[-1].lower() != 'amp' or segments[-2].lower() in LISTING_SEGMENTS:
+        return path
+    return '/'.join(segments[:-1]) + ('/' if trailing else '')
+
+
+def normalize_url(url):
+    """
+    Normalize a URL so equivalent spellings share a cache entry.
+
+    Lowercases the scheme and host, drops default ports and fragments, sorts
+    the query, strips tracking parameters (utm_*, fbclid, ...) and maps AMP
+    variants (``/article/amp``, ``?amp=1``, ``?outputType=amp``) to the
+    regular article.
+    """
+    parts = urlparse(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or '/'
+    path = _strip_amp_suffix(path)
+    params = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+              if _keep_param(name, value)]
+    query = urlencode(sorted(params))
+    return urlunparse((scheme, host, path, '', query, ''))
+
+
+def cache_key(url, target_length, variant=None):
+    """Build the cache key from the normalized URL, summary length and optional variant."""
+    raw = f"{normalize_url(url)}|{target_length}"
+    if variant is not None:
+        raw = f"{raw}|{variant}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def content_hash(text):
+    """Hash cleaned page content to detect unchanged articles."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def conditional_headers(validators):
+    """Build If-None-Match/If-Modified-Since headers from stored validators."""
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+def response_validators(headers):
+    """Extract the ETag/Last-Modified validators from response headers."""
+    return {
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified')
+    }
+
+
+def not_modified_result(url, headers):
+    """Scrape result for a 304 response: nothing was downloaded or parsed."""
+    result = {'success': True, 'url': url, 'not_modified': True}
+    result.update(response_validators(headers))
+    return result
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with size and TTL bounds."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """On-disk cache tier that several worker processes can share."""
+
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summary_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value, expires FROM summary_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] < time.time():
+            self.delete(key)
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summary_cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + self.ttl)
+            )
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM summary_cache WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        """Remove expired rows; returns the number deleted."""
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM summary_cache WHERE expires < ?", (time.time(),)
+            ).rowcount
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM summary_cache").fetchone()[0]
+
+    def close(self):
+        """Close this thread's connection; the next call opens a new one."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class TieredCache:
+    """Memory LRU in front of an optional shared disk tier."""
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory or LRUCache()
+        self.disk = disk
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+
+class SummaryCache:
+    """
+    Caches summarize results per (normalized URL, target length).
+
+    Entries younger than ``revalidate_after`` seconds are served as-is. Older
+    entries are revalidated with a conditional GET: a 304 reuses the entry
+    without parsing, and a 200 whose cleaned content hash is unchanged reuses
+    the stored summary without running the summarizer again.
+
+    With a ``store`` (a storage.SummaryWriter), URLs missing from the cache
+    are looked up in the persistent table before scraping, and new
+    summaries are queued for it. With an ``index`` (a
+    search_index.SearchIndex), newly summarized pages are indexed for search.
+    With ``duplicates`` (a dedupe.DuplicateIndex), a page whose rel=canonical
+    target or near-duplicate content was already summarized reuses that
+    summary instead of running the summarizer.
+    """
+
+    STATUSES = ('hit', 'stored', 'duplicate', 'revalidated', 'unchanged', 'miss')
+
+    def __init__(self, backend=None, revalidate_after=DEFAULT_REVALIDATE_AFTER, store=None,
+                 index=None, duplicates=None):
+        self.backend = backend or TieredCache()
+        self.revalidate_after = revalidate_after
+        self.store = store
+        self.index = index
+        self.duplicates = duplicates
+        self._stats = dict.fromkeys(self.STATUSES, 0)
+        self._lock = threading.Lock()
+
+    def _count(self, status):
+        with self._lock:
+            self._stats[status] += 1
+
+    def stats(self):
+        """Return hit/miss counters and the hit ratio."""
+        with self._lock:
+            stats = dict(self._stats)
+        total = sum(stats.values())
+        stats['requests'] = total
+        stats['hit_ratio'] = round((total - stats['miss']) / total, 4) if total else 0.0
+        return stats
+
+    def get_or_compute(self, url, target_length, scrape, summarize, variant=None):
+        """
+        Return the summary response for a URL, using the cache where possible.
+
+        Args:
+            url (str): The blog URL
+            target_length (int): Target summary length in words
+            scrape (callable): scrape(url, validators) -> scrape result dict
+            summarize (callable): summarize(title, content, target_length) -> summary dict
+            variant (str): Distinguishes summaries of the same URL and length made
+                differently (e.g. a non-default summary engine); only default
+                summaries (None) go to the persistent store
+
+        Returns:
+            dict: The combined response, with ``cache_status`` set
+        """
+        key = cache_key(url, target_length, variant)
+
+        def key_for(other_url):
+            return cache_key(other_url, target_length, variant)
+        entry = self.backend.get(key)
+
+        if entry and time.time() - entry['checked_at'] < self.revalidate_after:
+            return self._respond(url, entry['result'], 'hit')
+
+        if entry is None and self.store is not None and variant is None:
+            stored = self.store.lookup(url, target_length)
+            if stored is not None:
+                self.backend.set(key, {
+                    'result': stored,
+                    'content_hash': None,
+                    'etag': None,
+                    'last_modified': None,
+                    'checked_at': time.time()
+                })
+                return self._respond(url, stored, 'stored')
+
+        validators = None
+        if entry:
+            validators = {'etag': entry.get('etag'), 'last_modified': entry.get('last_modified')}
+
+        scrape_result = scrape(url, validators)
+        if not scrape_result['success']:
+            return scrape_result
+
+        if scrape_result.get('not_modified') and entry:
+            status = 'revalidated'
+            result = entry['result']
+            digest = entry['content_hash']
+        else:
+            digest = content_hash(scrape_result['content'])
+            if entry and entry['content_hash'] == digest:
+                status = 'unchanged'
+                result = entry['result']
+            else:
+                fingerprint = None
+                if self.duplicates is not None:
+                    fingerprint = self.duplicates.fingerprint(scrape_result['content'])
+                duplicate_of, result = self._find_duplicate(url, scrape_result, key_for, fingerprint)
+                if result is not None:
+                    status = 'duplicate'
+                    result = dict(result, url=scrape_result['url'], duplicate_of=duplicate_of)
+                else:
+                    summary_result = summarize(
+                        scrape_result['title'], scrape_result['content'], target_length
+                    )
+                    if not summary_result['success']:
+                        return summary_result
+                    status = 'miss'
+                    result = format_result(scrape_result, summary_result)
+                    if self.store is not None and variant is None:
+                        self.store.add(url, result, target_length)
+                    if self.index is not None:
+                        self.index.add(url, scrape_result['title'], scrape_result['content'])
+                if fingerprint is not None:
+                    self.duplicates.add(url, fingerprint, saved=status == 'duplicate')
+
+        cached = {
+            'result': result,
+            'content_hash': digest,
+            'etag': scrape_result.get('etag') or (entry or {}).get('etag'),
+            'last_modified': scrape_result.get('last_modified') or (entry or {}).get('last_modified'),
+            'checked_at': time.time()
+        }
+        self.backend.set(key, cached)
+        canonical = scrape_result.get('canonical_url')
+        if status == 'miss' and canonical and normalize_url(canonical) != normalize_url(url):
+            # The page named its canonical URL; requests for it can reuse this summary
+            self.backend.set(key_for(canonical), dict(cached, etag=None, last_modified=None))
+        return self._respond(url, result, status)
+
+    def _find_duplicate(self, url, scrape_result, key_for, fingerprint=None):
+        """
+        Find an already summarized copy of a freshly scraped page.
+
+        Checks the page's ``<link rel=canonical>`` target first, then the
+        near-duplicate cluster matching its content fingerprint.
+
+        Returns:
+            tuple: (URL of the summarized copy, its cached result), or (None, None)
+        """
+        own = normalize_url(url)
+        candidates = []
+        canonical = scrape_result.get('canonical_url')
+        if canonical:
+            candidates.append(normalize_url(canonical))
+        if fingerprint is not None:
+            candidates.append(self.duplicates.find(fingerprint))
+        for candidate in candidates:
+            if candidate and candidate != own:
+                entry = self.backend.get(key_for(candidate))
+                if entry:
+                    return candidate, entry['result']
+        return None, None
+
+    def _respond(self, url, result, status):
+        """Count the outcome and build the response, with the URL's duplicate cluster."""
+        self._count(status)
+        response = dict(result, cache_status=status)
+        if self.duplicates is not None:
+            cluster = self.duplicates.cluster_of(url)
+            if cluster is not None:
+                response['duplicate_cluster'] = cluster
+        return response
+
+
+def create_summary_cache(db_path=None, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL,
+                         revalidate_after=DEFAULT_REVALIDATE_AFTER, store=None, index=None,
+                         duplicates=None):
+    """Build a SummaryCache, adding the SQLite tier when a path is given."""
+    disk = None
+    if db_path:
+        try:
+            disk = SQLiteCache(os.path.expanduser(db_path), ttl=ttl)
+        except sqlite3.Error as e:
+            logging.error(f"Disk cache unavailable at {db_path}: {str(e)}")
+    memory = LRUCache(max_entries=max_entries, ttl=ttl)
+    return SummaryCache(TieredCache(memory, disk), revalidate_after=revalidate_after,
+                        store=store, index=index, duplicates=duplicates)
@@ -2,23 +2,139 @@
 """
 Simple CLI version of the Blog Summarizer
 Usage: python cli_summarizer.py <blog_url>
+       python cli_summarizer.py --batch urls.txt > results.ndjson
 """
 
 import sys
-import json
-from app import BlogScraper, AISummarizer
+import argparse
+import atexit
+import cProfile
+from blog_scraper import create_scraper
+from ai_summarizer import AISummarizer
+from metrics import registry as metrics
+from streaming import DEFAULT_MAX_BYTES, DEFAULT_DEADLINE
+from politeness import DEFAULT_HOST_RATE, DEFAULT_HOST_BURST
+from extraction_profiles import ExtractionProfiles
+from batch import BatchSummarizer, read_url_list, ndjson_line, DEFAULT_MAX_WORKERS, DEFAULT_PER_HOST_LIMIT
+from summary_engines import ENGINES, DEFAULT_SUMMARY_ENGINE
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python cli_summarizer.py <blog_url>")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape and summarize blog posts.")
+    parser.add_argument("url", nargs="?", help="Blog URL to summarize")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="File with one URL per line ('-' for stdin); prints NDJSON results")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Maximum concurrent fetches in batch mode")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST_LIMIT,
+                        help="Maximum concurrent fetches per host in batch mode")
+    parser.add_argument("--backend", choices=["sync", "async"], default="sync",
+                        help="Fetch backend: blocking requests or asyncio/aiohttp")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream pages into the parser with a size cap and deadline")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES,
+                        help="Streaming mode: maximum body bytes to read")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE,
+                        help="Streaming mode: seconds allowed per download")
+    parser.add_argument("--polite", action="store_true",
+                        help="Rate-limit, retry and circuit-break requests per host (honors robots.txt Crawl-delay)")
+    parser.add_argument("--host-rate", type=float, default=DEFAULT_HOST_RATE,
+                        help="Polite mode: requests per second per host")
+    parser.add_argument("--host-burst", type=int, default=DEFAULT_HOST_BURST,
+                        help="Polite mode: requests a host may receive back to back")
+    parser.add_argument("--extraction-profiles", metavar="FILE",
+                        help="Learn the best content selector per site and keep the profiles in FILE")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a per-stage timing breakdown when done")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="With --profile, also dump cProfile stats (pstats format) to FILE")
+    parser.add_argument("--target-length", type=int, default=150,
+                        help="Target summary length in words")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=DEFAULT_SUMMARY_ENGINE,
+                        help="Summary engine: keyword template or extractive TextRank")
+    parser.add_argument("--urdu", action="store_true",
+                        help="Also produce an Urdu summary (translated offline for non-Urdu pages)")
+    args = parser.parse_args(argv)
+    
+    if bool(args.url) == bool(args.batch):
+        parser.print_usage()
         print("Example: python cli_summarizer.py https://example.com/blog-post")
         sys.exit(1)
     
-    url = sys.argv[1]
+    return args
+
+def run_batch(args, scraper, summarizer):
+    """Summarize every URL in the batch file, one JSON line per result."""
+    if args.batch == "-":
+        urls = read_url_list(sys.stdin)
+    else:
+        with open(args.batch, encoding="utf-8") as f:
+            urls = read_url_list(f)
+    
+    batch = BatchSummarizer(scraper, summarizer, max_workers=args.workers,
+                            per_host_limit=args.per_host)
+    failures = 0
+    try:
+        for result in batch.iter_results(urls, args.target_length):
+            if not result['success']:
+                failures += 1
+            sys.stdout.buffer.write(ndjson_line(result))
+            sys.stdout.flush()
+    finally:
+        batch.shutdown()
     
+    print(f"✅ {len(urls) - failures}/{len(urls)} URLs summarized", file=sys.stderr)
+    sys.exit(1 if failures == len(urls) and urls else 0)
+
+def print_profile():
+    """Print the per-stage timing breakdown collected during the run."""
+    stages = metrics.stage_summary()
+    print("\n⏱️  Stage breakdown", file=sys.stderr)
+    print("-" * 60, file=sys.stderr)
+    print(f"{'stage':<12}{'count':>7}{'total ms':>12}{'mean ms':>11}{'p95 ms':>10}{'max ms':>10}",
+          file=sys.stderr)
+    for stage, stats in stages.items():
+        print(f"{stage:<12}{stats['count']:>7}{stats['total'] * 1000:>12.2f}"
+              f"{stats['mean'] * 1000:>11.2f}{stats['p95'] * 1000:>10.2f}{stats['max'] * 1000:>10.2f}",
+              file=sys.stderr)
+    for name, value in sorted(metrics.counters().items()):
+        print(f"{name}: {value}", file=sys.stderr)
+
+def main():
+    args = parse_args()
+    
+    if not args.profile:
+        run(args)
+        return
+    
+    profiler = cProfile.Profile() if args.profile_out else None
+    try:
+        if profiler:
+            profiler.enable()
+        run(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile_out)
+            print(f"📁 cProfile stats written to {args.profile_out}", file=sys.stderr)
+        print_profile()
+
+def run(args):
     # Initialize components
-    scraper = BlogScraper()
-    summarizer = AISummarizer()
+    profiles = None
+    if args.extraction_profiles:
+        profiles = ExtractionProfiles(args.extraction_profiles)
+        atexit.register(profiles.close)
+    scraper = create_scraper(args.backend, streaming=args.stream,
+                             max_bytes=args.max_bytes, deadline=args.deadline,
+                             polite=args.polite, host_rate=args.host_rate,
+                             host_burst=args.host_burst, profiles=profiles)
+    summarizer = AISummarizer(args.engine, urdu_summary=args.urdu)
+    
+    if args.batch:
+        run_batch(args, scraper, summarizer)
+        return
+    
+    url = args.url
     
     print(f"🔄 Scraping content from: {url}")
     
@@ -32,12 +148,16 @@ def main():
     print(f"✅ Successfully scraped content")
     print(f"📰 Title: {scrape_result['title']}")
     print(f"📊 Word count: {scrape_result['word_count']}")
+    download = scrape_result.get('download')
+    if download and download['truncated']:
+        print(f"⚠️  Download stopped early ({download['abort_reason']}) after {download['bytes']} bytes")
     
     # Generate summary
     print(f"🤖 Generating AI summary...")
     summary_result = summarizer.generate_summary(
         scrape_result['title'], 
-        scrape_result['content']
+        scrape_result['content'],
+        args.target_length
     )
     
     if not summary_result['success']:
@@ -53,11 +173,17 @@ def main():
     print(f"📊 Original length: {summary_result['original_length']} words")
     print(f"📊 Summary length: {summary_result['summary_length']} words")
     print(f"📊 Compression ratio: {summary_result['compression_ratio']}%")
+    print(f"🌐 Language: {summary_result['language']}")
     
     print(f"\n📖 Summary:")
     print("-" * 40)
     print(summary_result['summary'])
     
+    if 'summary_urdu' in summary_result:
+        print(f"\n📖 Urdu Summary:")
+        print("-" * 40)
+        print(summary_result['summary_urdu'])
+    
     print(f"\n🏷️  Top Keywords:")
     print("-" * 40)
     print(", ".join(summary_result['keywords'][:10]))
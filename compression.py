@@ -0,0 +1,204 @@
+"""
+HTTP Compression
+Content-Encoding negotiation for page fetches and API responses: the codecs
+available here (gzip always; br and zstd when brotli/zstandard are
+installed), streaming decoders for the codings urllib3 does not decode
+itself, and compressors for whole and streamed response bodies.
+"""
+
+import zlib
+from functools import lru_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Codings aiohttp decodes on its own
+AIOHTTP_ENCODINGS = frozenset(['gzip', 'deflate'] + (['br'] if brotli is not None else []))
+
+# Codings used for API responses, in server preference order
+RESPONSE_ENCODINGS = tuple(
+    encoding for encoding, available in (
+        ('zstd', zstandard is not None),
+        ('br', brotli is not None),
+        ('gzip', True)
+    ) if available
+)
+
+# Responses smaller than this are sent uncompressed (about one packet)
+DEFAULT_MIN_SIZE = 1024
+
+# Levels tuned for per-request speed rather than the last few percent
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+@lru_cache(maxsize=None)
+def urllib3_encodings():
+    """Codings urllib3 (and so requests) decodes on its own.
+
+    urllib3 is only imported on the first call, when a fetch is about to be
+    made anyway.
+    """
+    from urllib3.util.request import ACCEPT_ENCODING as URLLIB3_ACCEPT_ENCODING
+    return frozenset(URLLIB3_ACCEPT_ENCODING.split(','))
+
+
+@lru_cache(maxsize=None)
+def accept_encoding():
+    """The Accept-Encoding header for page fetches.
+
+    Fastest-to-decode first; a coding is only offered when it can be decoded.
+    """
+    decoded = urllib3_encodings()
+    return ', '.join(
+        encoding for encoding, available in (
+            ('zstd', zstandard is not None or 'zstd' in decoded),
+            ('br', brotli is not None or 'br' in decoded),
+            ('gzip', True),
+            ('deflate', True)
+        ) if available
+    )
+
+
+def content_encoding(headers):
+    """The single Content-Encoding of a response (lowercase), or None."""
+    value = (headers.get('Content-Encoding') or '').strip().lower()
+    return value if value and value != 'identity' else None
+
+
+def needs_decoding(headers, decoded=None):
+    """
+    The coding of a fetched response that the HTTP client left encoded, or None.
+
+    Args:
+        headers: Response headers
+        decoded (frozenset): Codings the client decodes itself (default: urllib3's)
+
+    Only a single coding is handled; stacked codings are left to the client.
+    """
+    if decoded is None:
+        decoded = urllib3_encodings()
+    encoding = content_encoding(headers)
+    if encoding in decoded:
+        return None
+    if encoding == 'zstd' and zstandard is not None:
+        return encoding
+    if encoding == 'br' and brotli is not None:
+        return encoding
+    return None
+
+
+def _decoder(encoding):
+    if encoding == 'zstd':
+        return zstandard.ZstdDecompressor().decompressobj(read_across_frames=True).decompress
+    if encoding == 'br':
+        return brotli.Decompressor().process
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def decode_chunks(chunks, encoding):
+    """Decompress a stream of body chunks as they arrive."""
+    decompress = _decoder(encoding)
+    for chunk in chunks:
+        data = decompress(chunk)
+        if data:
+            yield data
+
+
+def decode_body(body, encoding):
+    """Decompress a whole body."""
+    return b''.join(decode_chunks((body,), encoding))
+
+
+def wire_bytes(response, default):
+    """Bytes of a requests response read off the socket (before decoding)."""
+    tell = getattr(response.raw, 'tell', None)
+    try:
+        return tell() if tell else default
+    except (OSError, ValueError):
+        return default
+
+
+def negotiate(accept_encodings, encodings=RESPONSE_ENCODINGS):
+    """
+    Pick the response coding for a request's Accept-Encoding.
+
+    Args:
+        accept_encodings: werkzeug Accept object (request.accept_encodings)
+        encodings (tuple): Codings on offer, in server preference order
+
+    Returns:
+        str: The coding with the highest client quality, or None
+    """
+    return accept_encodings.best_match(encodings)
+
+
+def compress(data, encoding):
+    """Compress a whole body."""
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def compress_stream(chunks, encoding, on_close=None):
+    """
+    Compress a streamed body, flushing after every chunk.
+
+    Each chunk (e.g. an NDJSON line) is decodable by the client as soon as
+    it is sent, so streaming latency is kept.
+
+    Args:
+        chunks (iterable): Body chunks (str or bytes)
+        encoding (str): 'gzip', 'br' or 'zstd'
+        on_close (callable): Called with (raw bytes, compressed bytes) at the end
+
+    Yields:
+        bytes: Compressed data
+    """
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        process = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+    elif encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    elif encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        process = compressor.compress
+        flush = lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        finish = compressor.flush
+    else:
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    raw = sent = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            raw += len(chunk)
+            data = process(chunk) + flush()
+            sent += len(data)
+            yield data
+        data = finish()
+        sent += len(data)
+        yield data
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+        if on_close is not None:
+            on_close(raw, sent)
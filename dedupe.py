@@ -0,0 +1,239 @@
+"""
+Near-Duplicate Detection
+Content fingerprints for syndicated copies and URL variants of the same
+article: ``<link rel=canonical>`` discovery, 64-bit SimHash over word
+shingles, and a banded index that finds a matching cluster in constant time.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urljoin
+
+from cache import normalize_url
+
+# Bytes of the page searched for <link rel=canonical> (it lives in <head>)
+HEAD_BYTES = 64 * 1024
+
+LINK_TAG = re.compile(rb'<link\b[^>]*>', re.IGNORECASE)
+REL_CANONICAL = re.compile(rb'''\brel\s*=\s*["']?\s*canonical\b''', re.IGNORECASE)
+HREF = re.compile(rb'''\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+
+SHINGLE_SIZE = 3
+FINGERPRINT_BITS = 64
+
+# Fingerprints this many bits apart (or fewer) are the same article
+DEFAULT_MAX_DISTANCE = 5
+DEFAULT_MAX_CLUSTERS = 100000
+
+# Members listed per cluster in API responses
+MAX_LISTED_MEMBERS = 20
+
+# Rows of the shingle bit matrix summed at a time (bounds memory on huge pages)
+SIMHASH_BLOCK = 65536
+
+
+def find_canonical(html, base_url):
+    """
+    Return the absolute ``<link rel=canonical>`` URL of a page, or None.
+
+    Only the first HEAD_BYTES of the body are searched.
+    """
+    if isinstance(html, str):
+        html = html.encode('utf-8', 'ignore')
+    for match in LINK_TAG.finditer(html, 0, HEAD_BYTES):
+        tag = match.group(0)
+        if not REL_CANONICAL.search(tag):
+            continue
+        href = HREF.search(tag)
+        if href:
+            value = next(group for group in href.groups() if group is not None)
+            value = value.decode('utf-8', 'ignore').strip()
+            if value:
+                return urljoin(base_url, value)
+    return None
+
+
+def _hash64(word):
+    return int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _rotl(values, bits):
+    import numpy as np
+    return (values << np.uint64(bits)) | (values >> np.uint64(64 - bits))
+
+
+def _mix(values):
+    """splitmix64 finalizer: spreads combined shingle hashes over all bits."""
+    import numpy as np
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def simhash(text, shingle_size=SHINGLE_SIZE):
+    """
+    64-bit SimHash of a document's word shingles.
+
+    Words are hashed once per distinct word (blake2b, stable across
+    processes); shingle hashes are combined and mixed with vectorized
+    uint64 arithmetic, and each output bit is the majority vote of that bit
+    over all shingles.
+    """
+    import numpy as np
+
+    words = text.lower().split()
+    if not words:
+        return 0
+    vocabulary = {}
+    word_ids = np.fromiter((vocabulary.setdefault(word, len(vocabulary)) for word in words),
+                           dtype=np.int64, count=len(words))
+    word_hashes = np.fromiter((_hash64(word) for word in vocabulary), dtype=np.uint64,
+                              count=len(vocabulary))[word_ids]
+
+    size = min(shingle_size, len(words))
+    count = len(words) - size + 1
+    with np.errstate(over='ignore'):
+        shingles = word_hashes[:count].copy()
+        for offset in range(1, size):
+            shingles ^= _rotl(word_hashes[offset:offset + count], 21 * offset % 64)
+        shingles = _mix(shingles)
+
+    votes = np.zeros(FINGERPRINT_BITS, dtype=np.int64)
+    for start in range(0, count, SIMHASH_BLOCK):
+        block = shingles[start:start + SIMHASH_BLOCK]
+        bits = np.unpackbits(block.astype('>u8').view(np.uint8)).reshape(-1, FINGERPRINT_BITS)
+        votes += bits.sum(axis=0, dtype=np.int64)
+    return int.from_bytes(np.packbits(votes * 2 > count).tobytes(), 'big')
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class DuplicateIndex:
+    """
+    Clusters of near-duplicate pages keyed by SimHash.
+
+    The 64-bit fingerprint is split into ``max_distance + 1`` bands; two
+    fingerprints within ``max_distance`` bits must agree exactly on at least
+    one band (pigeonhole), so a lookup is one dict probe per band plus a
+    Hamming check of the few candidates found there.
+    """
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE, max_clusters=DEFAULT_MAX_CLUSTERS):
+        self.max_distance = max_distance
+        self.max_clusters = max_clusters
+        bands = max_distance + 1
+        width = FINGERPRINT_BITS // bands
+        self._bands = [(i * width, FINGERPRINT_BITS if i == bands - 1 else (i + 1) * width)
+                       for i in range(bands)]
+        self._tables = [{} for _ in self._bands]
+        self._clusters = OrderedDict()
+        self._members = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(text):
+        return simhash(text)
+
+    def _band_keys(self, fingerprint):
+        return [(fingerprint >> start) & ((1 << (end - start)) - 1) for start, end in self._bands]
+
+    def _find(self, fingerprint):
+        best, best_distance = None, self.max_distance + 1
+        for table, key in zip(self._tables, self._band_keys(fingerprint)):
+            for cluster_id in table.get(key, ()):
+                distance = hamming_distance(fingerprint, self._clusters[cluster_id]['fingerprint'])
+                if distance < best_distance:
+                    best, best_distance = cluster_id, distance
+        return best
+
+    def find(self, fingerprint):
+        """Return the canonical URL of the cluster matching a fingerprint, or None."""
+        with self._lock:
+            cluster_id = self._find(fingerprint)
+            return self._clusters[cluster_id]['canonical_url'] if cluster_id is not None else None
+
+    def add(self, url, fingerprint, saved=False):
+        """
+        Record a page, joining the matching cluster or starting a new one.
+
+        Args:
+            url (str): Page URL
+            fingerprint (int): simhash() of its cleaned content
+            saved (bool): Whether the page reused the cluster's summary
+
+        Returns:
+            str: Canonical URL of the page's cluster
+        """
+        url = normalize_url(url)
+        with self._lock:
+            cluster_id = self._members.get(url)
+            if cluster_id is None:
+                cluster_id = self._find(fingerprint)
+            if cluster_id is None:
+                cluster_id = self._new_cluster(url, fingerprint)
+            cluster = self._clusters[cluster_id]
+            if url not in cluster['members']:
+                cluster['members'][url] = None
+                self._members[url] = cluster_id
+            if saved:
+                cluster['summaries_saved'] += 1
+            return cluster['canonical_url']
+
+    def _new_cluster(self, url, fingerprint):
+        if len(self._clusters) >= self.max_clusters:
+            self._evict()
+        cluster_id = self._next_id
+        self._next_id += 1
+        self._clusters[cluster_id] = {
+            'canonical_url': url,
+            'fingerprint': fingerprint,
+            'members': {},
+            'summaries_saved': 0
+        }
+        for table, key in zip(self._tables, self._band_keys(fingerprint)):
+            table.setdefault(key, []).append(cluster_id)
+        return cluster_id
+
+    def _evict(self):
+        cluster_id, cluster = self._clusters.popitem(last=False)
+        for table, key in zip(self._tables, self._band_keys(cluster['fingerprint'])):
+            ids = table.get(key)
+            if ids is not None:
+                ids.remove(cluster_id)
+                if not ids:
+                    del table[key]
+        for member in cluster['members']:
+            self._members.pop(member, None)
+
+    def _view(self, cluster):
+        members = list(cluster['members'])
+        return {
+            'canonical_url': cluster['canonical_url'],
+            'size': len(members),
+            'members': members[:MAX_LISTED_MEMBERS],
+            'summaries_saved': cluster['summaries_saved']
+        }
+
+    def cluster_of(self, url):
+        """Public view of the cluster a URL belongs to, if it has duplicates."""
+        with self._lock:
+            cluster_id = self._members.get(normalize_url(url))
+            if cluster_id is None:
+                return None
+            cluster = self._clusters[cluster_id]
+            return self._view(cluster) if len(cluster['members']) > 1 else None
+
+    def clusters(self, limit=100):
+        """Largest duplicate clusters first, plus the total summaries saved."""
+        with self._lock:
+            clusters = [self._view(c) for c in self._clusters.values() if len(c['members']) > 1]
+            saved = sum(c['summaries_saved'] for c in self._clusters.values())
+        clusters.sort(key=lambda c: (-c['size'], c['canonical_url']))
+        return {'clusters': clusters[:limit], 'cluster_count': len(clusters), 'summaries_saved': saved}
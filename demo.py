@@ -5,6 +5,7 @@ Demo script to showcase the Blog Summarizer functionality
 
 import time
 from app import BlogScraper, AISummarizer
+from benchmarks.fixture_server import FixtureServer
 
 def demo_with_sample_content():
     """Demo the summarizer with sample content when URL scraping isn't available."""
@@ -92,15 +93,16 @@ def demo_url_scraping():
     print("\n🌐 URL Scraping Demo")
     print("=" * 50)
     
-    # Test with a simple webpage (you can replace with any accessible URL)
-    test_url = "https://httpbin.org/html"  # Simple test HTML page
-    
+    # Scrape a page from the local fixture server so the demo works offline
     scraper = BlogScraper()
     
-    print(f"🔗 Testing URL: {test_url}")
-    print("🔄 Scraping content...")
-    
-    result = scraper.scrape_blog_content(test_url)
+    with FixtureServer(sizes=['small']) as fixtures:
+        test_url = fixtures.url("/page/small")
+        
+        print(f"🔗 Testing URL: {test_url}")
+        print("🔄 Scraping content...")
+        
+        result = scraper.scrape_blog_content(test_url)
     
     if result['success']:
         print("✅ Scraping successful!")
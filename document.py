@@ -0,0 +1,105 @@
+"""
+Compact Document Model
+Memory-lean representations of an article while it is being summarized:
+sentences as offsets into the one cleaned text instead of copies, and
+keyword counts as interned words with an array of counts instead of a
+Counter per piece of text.
+"""
+
+import sys
+from array import array
+from collections.abc import Sequence
+from heapq import nlargest
+
+from normalize import SENTENCE_BOUNDARY, MIN_SENTENCE_LENGTH
+from text_analysis import keyword_counts
+
+# Offsets and counts are unsigned 32-bit
+OFFSET_TYPE = 'I'
+
+
+class SentenceSpans(Sequence):
+    """
+    The sentences of a text, as split_sentences returns them, stored as
+    (start, end) offsets into that text.
+
+    A sentence string is only created when it is read, so the whole list
+    costs 8 bytes per sentence on top of the text itself.
+    """
+
+    __slots__ = ('text', 'starts', 'ends')
+
+    def __init__(self, text, min_length=MIN_SENTENCE_LENGTH, boundary=SENTENCE_BOUNDARY):
+        self.text = text
+        self.starts = array(OFFSET_TYPE)
+        self.ends = array(OFFSET_TYPE)
+        start = 0
+        for match in boundary.finditer(text):
+            self._add(start, match.start(), min_length)
+            start = match.end()
+        self._add(start, len(text), min_length)
+
+    def _add(self, start, end, min_length):
+        # Stripping can only shorten a piece
+        if end - start <= min_length:
+            return
+        piece = self.text[start:end]
+        stripped = piece.lstrip()
+        length = len(stripped.rstrip())
+        if length > min_length:
+            start += len(piece) - len(stripped)
+            self.starts.append(start)
+            self.ends.append(start + length)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def __iter__(self):
+        text = self.text
+        for start, end in zip(self.starts, self.ends):
+            yield text[start:end]
+
+
+class KeywordCounts:
+    """
+    Keyword counts in first-occurrence order, as interned words and an array.
+
+    Interned words are shared by every KeywordCounts (and document) that
+    contains them, and a count takes 4 bytes instead of a dict entry and an
+    int object. Built from a Counter such as keyword_counts returns.
+    """
+
+    __slots__ = ('words', 'counts')
+
+    def __init__(self, counts):
+        self.words = tuple(map(sys.intern, counts))
+        self.counts = array(OFFSET_TYPE, counts.values())
+
+    @classmethod
+    def from_text(cls, text, **options):
+        """Count ``text``'s keywords (options as for keyword_counts)."""
+        return cls(keyword_counts(text, **options))
+
+    def __len__(self):
+        return len(self.words)
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def items(self):
+        return zip(self.words, self.counts)
+
+    def most_common(self, k=None):
+        """(word, count) pairs, most frequent first, ties in first-occurrence
+        order (as Counter.most_common)."""
+        indexes = range(len(self.words))
+        if k is None:
+            ranked = sorted(indexes, key=self.counts.__getitem__, reverse=True)
+        else:
+            ranked = nlargest(k, indexes, key=self.counts.__getitem__)
+        return [(self.words[i], self.counts[i]) for i in ranked]
@@ -0,0 +1,220 @@
+"""
+Extraction Profiles
+Per-domain memory of which content selector yields a site's article. The
+first visit to a host ranks every candidate container by text and link
+density; later visits use the remembered selector directly and re-rank
+periodically (and after a miss) so a redesign is picked up. Profiles are
+persisted to a JSON file so they survive restarts.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import registry as metrics
+
+DEFAULT_MAX_HOSTS = 10000
+
+# Re-rank a host's candidates after this many uses or this many seconds
+DEFAULT_REVALIDATE_EVERY = 50
+DEFAULT_REVALIDATE_AFTER = 7 * 24 * 60 * 60
+
+# Minimum seconds between writes of the profile file
+DEFAULT_SAVE_INTERVAL = 30
+
+FILE_VERSION = 1
+
+
+class ExtractionProfiles:
+    """
+    Thread-safe LRU of per-host extraction profiles.
+
+    A profile records the winning selector, its scores and usage counters.
+    ``plan`` tells the scraper which selector to prefer and whether to rank
+    candidates on this fetch; ``learn`` and ``record`` feed the outcome back.
+    """
+
+    def __init__(self, path=None, max_hosts=DEFAULT_MAX_HOSTS,
+                 revalidate_every=DEFAULT_REVALIDATE_EVERY,
+                 revalidate_after=DEFAULT_REVALIDATE_AFTER,
+                 save_interval=DEFAULT_SAVE_INTERVAL, clock=time.time):
+        """
+        Args:
+            path (str): JSON file to load and persist profiles; None keeps them in memory
+            max_hosts (int): Profiles kept before the least recently used is dropped
+            revalidate_every (int): Uses of a profile before its candidates are re-ranked
+            revalidate_after (float): Seconds after which a profile is re-ranked
+            save_interval (float): Minimum seconds between writes of the file
+            clock (callable): Wall-clock time source
+        """
+        self.path = path
+        self.max_hosts = max_hosts
+        self.revalidate_every = revalidate_every
+        self.revalidate_after = revalidate_after
+        self.save_interval = save_interval
+        self.clock = clock
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+        # Orders concurrent saves, so an older snapshot never replaces a newer file
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+        self._stats = {'hits': 0, 'misses': 0, 'learned': 0, 'relearned': 0, 'revalidations': 0}
+        if path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load extraction profiles from {self.path}: {str(e)}")
+            return
+        if data.get('version') != FILE_VERSION:
+            return
+        for host, profile in list(data.get('profiles', {}).items())[-self.max_hosts:]:
+            self._profiles[host] = profile
+
+    def plan(self, host):
+        """
+        Decide how to extract a page from ``host``.
+
+        Returns:
+            tuple: (preferred selector or None, whether to rank candidates)
+        """
+        with self._lock:
+            profile = self._profiles.get(host)
+            if profile is None:
+                return None, True
+            self._profiles.move_to_end(host)
+            due = (profile['stale']
+                   or profile['uses_since_validation'] >= self.revalidate_every
+                   or self.clock() - profile['validated_at'] >= self.revalidate_after)
+            if due:
+                self._stats['revalidations'] += 1
+            return profile['selector'], due
+
+    def learn(self, host, selector, ranking):
+        """
+        Store the outcome of ranking a host's candidates.
+
+        Args:
+            host (str): Host the page came from
+            selector (str): Best-ranked selector, or None when no candidate qualified
+            ranking (list): Candidate scores from ContentExtractor.candidates()
+        """
+        if not host or selector is None:
+            return
+        best = next(candidate for candidate in ranking if candidate['selector'] == selector)
+        now = self.clock()
+        with self._lock:
+            previous = self._profiles.pop(host, None)
+            if previous is None:
+                self._stats['learned'] += 1
+                metrics.increment('extraction_profiles_learned', 1, host)
+            elif previous['selector'] != selector:
+                self._stats['relearned'] += 1
+                metrics.increment('extraction_profiles_relearned', 1, host)
+            self._profiles[host] = {
+                'selector': selector,
+                'score': best['score'],
+                'chars': best['chars'],
+                'link_density': best['link_density'],
+                'text_density': best['text_density'],
+                'candidates': {candidate['selector']: candidate['score'] for candidate in ranking},
+                'learned_at': (previous['learned_at']
+                               if previous and previous['selector'] == selector else now),
+                'validated_at': now,
+                'uses': previous['uses'] + 1 if previous else 1,
+                'misses': previous['misses'] if previous else 0,
+                'uses_since_validation': 0,
+                'stale': False
+            }
+            while len(self._profiles) > self.max_hosts:
+                self._profiles.popitem(last=False)
+            self._dirty = True
+        self._maybe_save()
+
+    def record(self, host, selector, used):
+        """
+        Record a fetch that used a stored profile.
+
+        Args:
+            host (str): Host the page came from
+            selector (str): The profile's selector
+            used (str): Selector the extractor actually took the content from
+        """
+        hit = used == selector
+        with self._lock:
+            profile = self._profiles.get(host)
+            if profile is None:
+                return
+            profile['uses'] += 1
+            profile['uses_since_validation'] += 1
+            if hit:
+                self._stats['hits'] += 1
+            else:
+                # The remembered container is gone: re-rank on the next visit
+                profile['misses'] += 1
+                profile['stale'] = True
+                self._stats['misses'] += 1
+            self._dirty = True
+        metrics.increment('extraction_profile_hits' if hit else 'extraction_profile_misses', 1, host)
+        self._maybe_save()
+
+    def forget(self, host):
+        """Drop a host's profile. Returns True when one existed."""
+        with self._lock:
+            removed = self._profiles.pop(host, None) is not None
+            self._dirty = self._dirty or removed
+        if removed:
+            self._maybe_save()
+        return removed
+
+    def profiles(self):
+        """Copy of every stored profile, keyed by host."""
+        with self._lock:
+            return {host: dict(profile) for host, profile in self._profiles.items()}
+
+    def stats(self):
+        """Profile counts and hit/miss/revalidation counters."""
+        with self._lock:
+            return dict(self._stats, hosts=len(self._profiles), max_hosts=self.max_hosts,
+                        path=self.path)
+
+    def _maybe_save(self):
+        if self.path and self.clock() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def save(self):
+        """Write the profiles to ``path`` (atomically) if anything changed."""
+        if not self.path:
+            return
+        # Serialized under the lock, written after releasing it so lookups never wait on the disk
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                text = json.dumps({'version': FILE_VERSION, 'profiles': self._profiles})
+                self._dirty = False
+                self._saved_at = self.clock()
+            directory = os.path.dirname(os.path.abspath(self.path))
+            try:
+                fd, tmp = tempfile.mkstemp(prefix='.profiles-', dir=directory)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                with self._lock:
+                    self._dirty = True
+                logging.error(f"Could not save extraction profiles to {self.path}: {str(e)}")
+
+    def close(self):
+        """Flush pending changes to disk."""
+        self.save()
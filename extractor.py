@@ -0,0 +1,488 @@
+"""
+Streaming Content Extraction
+Single-pass title/content extraction that replaces the BeautifulSoup tree walk,
+decompose() and repeated select_one() calls in BlogScraper.
+"""
+
+import bisect
+import codecs
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+
+# Subtrees BlogScraper never reads text from
+UNWANTED_TAGS = frozenset(['script', 'style', 'nav', 'header', 'footer', 'aside'])
+
+# Main content containers, in priority order
+CONTENT_SELECTORS = [
+    'article',
+    '.post-content',
+    '.entry-content',
+    '.content',
+    'main',
+    '.post-body',
+    '.article-content'
+]
+
+# Elements that never have children (matches BeautifulSoup's html.parser builder)
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+])
+
+ENGINES = ('lxml', 'html.parser')
+# html.parser reproduces the BeautifulSoup path exactly, malformed markup
+# included; lxml is faster but libxml2 repairs broken pages differently
+DEFAULT_ENGINE = 'html.parser'
+FEED_CHUNK_SIZE = 64 * 1024
+
+# Bytes buffered before choosing an encoding for incremental decoding
+SNIFF_BYTES = 4096
+
+# Candidate scoring: containers with less text than this are not ranked
+MIN_CANDIDATE_CHARS = 200
+
+# Characters of text per element at which a container counts as fully dense
+DENSE_CHARS_PER_TAG = 40
+
+# Name of the <body> fallback in candidate rankings
+BODY_SELECTOR = 'body'
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def score_candidate(chars, link_chars, tags):
+    """
+    Score a content container by text density and link density.
+
+    Args:
+        chars (int): Non-whitespace characters of text in the container
+        link_chars (int): Of those, characters inside links
+        tags (int): Elements in the container
+
+    Returns:
+        dict: chars, link_density, text_density and score
+    """
+    link_density = link_chars / chars if chars else 1.0
+    text_density = chars / max(tags, 1)
+    # Link-heavy wrappers (sidebars, menus) and tag soup both lose to the article
+    score = chars * (1 - link_density) ** 2 * min(1.0, text_density / DENSE_CHARS_PER_TAG)
+    return {
+        'chars': chars,
+        'link_density': round(link_density, 4),
+        'text_density': round(text_density, 2),
+        'score': round(score, 2)
+    }
+
+
+def text_chars(text):
+    """Characters of text, ignoring whitespace."""
+    return len(_WHITESPACE.sub('', text))
+
+
+def best_candidate(ranking):
+    """The best-scoring selector of a candidate ranking, or None when none qualifies."""
+    eligible = [candidate for candidate in ranking if candidate['chars'] >= MIN_CANDIDATE_CHARS]
+    if not eligible:
+        return None
+    # max() keeps the first of equal scores, i.e. the higher-priority selector
+    return max(eligible, key=lambda candidate: candidate['score'])['selector']
+
+
+def _compile_selectors(selectors):
+    """Turn 'tag' / '.class' selectors into (kind, name) pairs."""
+    compiled = []
+    for selector in selectors:
+        if selector.startswith('.'):
+            compiled.append(('class', selector[1:]))
+        else:
+            compiled.append(('tag', selector.lower()))
+    return compiled
+
+
+class _OpenElement:
+    """Bookkeeping for an element on the open-element stack."""
+
+    __slots__ = ('tag', 'skip', 'slots', 'title', 'h1', 'link')
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.skip = False
+        self.slots = ()
+        self.title = False
+        self.h1 = False
+        self.link = False
+
+
+class ContentExtractor:
+    """
+    SAX-style handler that extracts the title and main content in one pass.
+
+    Text from unwanted subtrees is dropped as it streams past, and every
+    candidate container is tracked while walking, so the result equals running
+    select_one() for each selector in order after removing unwanted elements.
+    Text is kept once, in document order; each candidate only records the
+    span of chunks it covers.
+
+    It implements the lxml parser-target interface (start/end/data/close) and
+    is also driven by the stdlib HTMLParser via _HTMLParserDriver.
+
+    With a ``preferred`` selector (a learned extraction profile) that
+    container wins when it matched; with ``rank`` every matched container is
+    scored by text and link density and the best one is used. ``selector``
+    and ``ranking`` report what was picked after close().
+    """
+
+    def __init__(self, selectors=None, preferred=None, rank=False):
+        selectors = list(selectors or CONTENT_SELECTORS)
+        if preferred and preferred != BODY_SELECTOR and preferred not in selectors:
+            selectors.append(preferred)
+        self.selector_names = selectors + [BODY_SELECTOR]
+        self.selectors = _compile_selectors(selectors)
+        self.preferred = preferred
+        self.rank = rank
+        self.selector = None
+        self.ranking = None
+        self.chunks = []
+        # One [start, end] chunk span per selector, plus one for <body>
+        self.spans = [None] * (len(self.selectors) + 1)
+        self.body_slot = len(self.selectors)
+        # Elements seen when each span opened and closed, for text density
+        self.tag_spans = [None] * (len(self.selectors) + 1)
+        self.tags = 0
+        # Indexes of chunks inside <a>, for link density
+        self.link_chunks = []
+        self.in_link = 0
+        self.stack = []
+        self.skip_depth = 0
+        self.title_parts = None
+        self.h1_parts = None
+        self.in_title = 0
+        self.in_h1 = 0
+
+    def start(self, tag, attrib):
+        tag = tag.lower()
+        element = _OpenElement(tag)
+
+        if self.title_parts is None and tag == 'title':
+            self.title_parts = []
+            element.title = True
+            self.in_title += 1
+        elif self.h1_parts is None and tag == 'h1':
+            self.h1_parts = []
+            element.h1 = True
+            self.in_h1 += 1
+
+        if self.skip_depth or tag in UNWANTED_TAGS:
+            element.skip = True
+            self.skip_depth += 1
+        else:
+            self.tags += 1
+            if tag == 'a':
+                element.link = True
+                self.in_link += 1
+            slots = []
+            classes = None
+            for index, (kind, name) in enumerate(self.selectors):
+                if self.spans[index] is not None:
+                    continue
+                if kind == 'tag':
+                    matched = tag == name
+                else:
+                    if classes is None:
+                        classes = (attrib.get('class') or '').split()
+                    matched = name in classes
+                if matched:
+                    self.spans[index] = [len(self.chunks), None]
+                    self.tag_spans[index] = [self.tags - 1, None]
+                    slots.append(index)
+            if tag == 'body' and self.spans[self.body_slot] is None:
+                self.spans[self.body_slot] = [len(self.chunks), None]
+                self.tag_spans[self.body_slot] = [self.tags - 1, None]
+                slots.append(self.body_slot)
+            element.slots = slots
+
+        self.stack.append(element)
+        if tag in VOID_TAGS:
+            self._pop()
+
+    def end(self, tag):
+        tag = tag.lower()
+        # Pop up to the most recent open element with this name; ignore strays
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].tag == tag:
+                while len(self.stack) > i:
+                    self._pop()
+                return
+
+    def _pop(self):
+        element = self.stack.pop()
+        if element.skip:
+            self.skip_depth -= 1
+        for index in element.slots:
+            self.spans[index][1] = len(self.chunks)
+            self.tag_spans[index][1] = self.tags
+        if element.link:
+            self.in_link -= 1
+        if element.title:
+            self.in_title -= 1
+        if element.h1:
+            self.in_h1 -= 1
+
+    def data(self, text):
+        if self.in_title:
+            self.title_parts.append(text)
+        if self.in_h1:
+            self.h1_parts.append(text)
+        if not self.skip_depth:
+            if self.in_link:
+                self.link_chunks.append(len(self.chunks))
+            self.chunks.append(text)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        """Finish the document and return ``(title, content)``.
+
+        The per-node text is released once the content is joined, so only
+        the returned string outlives parsing.
+        """
+        while self.stack:
+            self._pop()
+        title, content = self.title(), self.content()
+        self.chunks = []
+        self.link_chunks = []
+        return title, content
+
+    def title(self):
+        """Page title, falling back to the first <h1>."""
+        if self.title_parts is not None:
+            return ''.join(self.title_parts).strip()
+        if self.h1_parts is not None:
+            return ''.join(self.h1_parts).strip()
+        return "No title found"
+
+    def _span_text(self, index):
+        start, end = self.spans[index]
+        return ''.join(self.chunks[start:end if end is not None else len(self.chunks)])
+
+    def candidates(self):
+        """Text/link density scores of every matched container, in priority order."""
+        ranking = []
+        for index, span in enumerate(self.spans):
+            if span is None:
+                continue
+            start, end = span[0], span[1] if span[1] is not None else len(self.chunks)
+            first = bisect.bisect_left(self.link_chunks, start)
+            last = bisect.bisect_left(self.link_chunks, end)
+            link_chars = sum(text_chars(self.chunks[i]) for i in self.link_chunks[first:last])
+            tag_start, tag_end = self.tag_spans[index]
+            tags = (tag_end if tag_end is not None else self.tags) - tag_start
+            candidate = score_candidate(text_chars(self._span_text(index)), link_chars, tags)
+            candidate['selector'] = self.selector_names[index]
+            ranking.append(candidate)
+        return ranking
+
+    def content(self):
+        """Text of the preferred or best-ranked container, else the first
+        matching container, else <body>, else the page."""
+        if self.rank:
+            self.ranking = self.candidates()
+            best = best_candidate(self.ranking)
+            if best is not None:
+                self.selector = best
+                return self._span_text(self.selector_names.index(best))
+        elif self.preferred in self.selector_names:
+            index = self.selector_names.index(self.preferred)
+            if self.spans[index] is not None:
+                text = self._span_text(index)
+                if text.strip():
+                    self.selector = self.preferred
+                    return text
+        for index, span in enumerate(self.spans):
+            if span is not None:
+                self.selector = self.selector_names[index]
+                return self._span_text(index)
+        return ''.join(self.chunks)
+
+
+class _HTMLParserDriver(HTMLParser):
+    """
+    Feeds stdlib HTMLParser events into a ContentExtractor.
+
+    Character references are resolved like BeautifulSoup's html.parser
+    builder does, not by html.unescape: an unknown name stays literal
+    ("&ampx;" is not "&x;") and numeric references below 256 are read as
+    windows-1252.
+    """
+
+    def __init__(self, target):
+        super().__init__(convert_charrefs=False)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        attrib = {}
+        for name, value in attrs:
+            attrib[name] = value if value is not None else ''
+        self.target.start(tag, attrib)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def handle_entityref(self, name):
+        self.target.data(html5.get(name + ';', f'&{name}'))
+
+    def handle_charref(self, name):
+        try:
+            code = int(name[1:], 16) if name[:1] in 'xX' else int(name)
+        except ValueError:
+            code = -1
+        data = None
+        if 0 <= code < 256:
+            try:
+                data = bytes([code]).decode('windows-1252')
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self.target.data(data or '\N{REPLACEMENT CHARACTER}')
+
+    def unknown_decl(self, data):
+        if data.startswith('CDATA['):
+            self.target.data(data[6:])
+
+    def close(self):
+        super().close()
+        return self.target.close()
+
+
+def decode_html(html):
+    """Decode raw page bytes the way BeautifulSoup does (declared charset, sniffing)."""
+    if isinstance(html, str):
+        return html
+    from bs4.dammit import UnicodeDammit
+    return UnicodeDammit(html, is_html=True).unicode_markup or ''
+
+
+def create_parser(engine=DEFAULT_ENGINE, selectors=None, target=None):
+    """
+    Create an incremental parser wired to a ContentExtractor.
+
+    Call ``feed(text)`` any number of times, then ``close()`` to get the
+    ``(title, content)`` tuple.
+
+    Args:
+        engine (str): 'html.parser' (stdlib, the default) or 'lxml'
+            (libxml2, fastest)
+        selectors (list): Content selectors, defaults to CONTENT_SELECTORS
+        target (ContentExtractor): Extractor to drive instead of a fresh one
+    """
+    if target is None:
+        target = ContentExtractor(selectors)
+    if engine == 'lxml':
+        from lxml import etree
+        return etree.HTMLParser(target=target, remove_comments=True)
+    if engine == 'html.parser':
+        return _HTMLParserDriver(target)
+    raise ValueError(f"Unknown extraction engine: {engine}")
+
+
+def extract(html, engine=DEFAULT_ENGINE, selectors=None, target=None):
+    """
+    Extract the title and main content text from a page in a single pass.
+
+    Args:
+        html (bytes or str): Raw page
+        engine (str): Parser engine, see create_parser
+        selectors (list): Content selectors, defaults to CONTENT_SELECTORS
+        target (ContentExtractor): Extractor to drive, e.g. one with a
+            preferred selector or ranking enabled
+
+    Returns:
+        tuple: (title, raw content text)
+    """
+    text = decode_html(html)
+    if not text.strip():
+        # libxml2 rejects documents without any markup
+        engine = 'html.parser'
+    parser = create_parser(engine, selectors, target)
+    for start in range(0, len(text), FEED_CHUNK_SIZE):
+        parser.feed(text[start:start + FEED_CHUNK_SIZE])
+    return parser.close()
+
+
+class StreamingExtraction:
+    """
+    Incremental byte-level front end for create_parser.
+
+    The first SNIFF_BYTES are buffered to pick an encoding (byte order mark,
+    then a <meta> declaration, then the HTTP charset, then UTF-8); after that
+    every chunk is decoded and fed to the parser as it arrives, so the raw
+    body is never held in memory as a whole.
+    """
+
+    def __init__(self, engine=DEFAULT_ENGINE, http_charset=None, selectors=None, target=None):
+        self.engine = engine
+        self.http_charset = http_charset
+        self.selectors = selectors
+        self.target = target
+        self.parser = None
+        self.decoder = None
+        self._prefix = b''
+
+    def _start(self):
+        """Choose the encoding from the buffered prefix and start parsing."""
+        from bs4.dammit import EncodingDetector
+
+        prefix, bom_encoding = EncodingDetector.strip_byte_order_mark(self._prefix)
+        encoding = (bom_encoding
+                    or EncodingDetector.find_declared_encoding(prefix, is_html=True)
+                    or self.http_charset
+                    or 'utf-8')
+        try:
+            self.decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._prefix = b''
+        self._feed_text(self.decoder.decode(prefix))
+
+    def _feed_text(self, text):
+        if not text:
+            return
+        if self.parser is None:
+            # libxml2 rejects documents without any markup, so wait for some
+            if self.engine == 'lxml' and not text.strip():
+                return
+            self.parser = create_parser(self.engine, self.selectors, self.target)
+        self.parser.feed(text)
+
+    def feed(self, chunk):
+        """Feed the next chunk of raw body bytes."""
+        if self.decoder is None:
+            self._prefix += chunk
+            if len(self._prefix) >= SNIFF_BYTES:
+                self._start()
+            return
+        self._feed_text(self.decoder.decode(chunk))
+
+    def close(self):
+        """Finish parsing and return ``(title, content)``."""
+        if self.decoder is None:
+            self._start()
+        self._feed_text(self.decoder.decode(b'', final=True))
+        if self.parser is None:
+            return (self.target or ContentExtractor(self.selectors)).close()
+        return self.parser.close()
@@ -0,0 +1,76 @@
+"""
+Production server settings (gunicorn, pre-fork)
+The app is imported once in the master (models, parser tables, the search
+index segment and the summarizer are then shared copy-on-write), and forked
+into one worker process per core, each serving requests on a few threads.
+Workers share the summary cache and job queue through SQLite files: each job
+is owned by the worker that queued it, and a worker that starts (or sweeps
+periodically) takes over the jobs of workers that have exited. /metrics
+reports the sum over all workers, which write metric snapshots to a shared
+directory. A SEARCH_INDEX_PATH segment is compacted under a file lock,
+merging the other workers' documents first.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+
+Environment:
+    PORT / BIND            Listen address (default 0.0.0.0:5000)
+    WEB_CONCURRENCY        Worker processes (default: CPU count)
+    WEB_THREADS            Threads per worker (default 4)
+    WEB_TIMEOUT            Seconds before a silent worker is restarted (default 60)
+    GRACEFUL_TIMEOUT       Seconds workers get to finish requests on reload/stop (default 30)
+    MAX_REQUESTS           Recycle a worker after this many requests (default 0: never)
+    SERVER_STATE_DIR       Directory for the shared SQLite files and metric
+                           snapshots (default: temp dir)
+
+Reloading:
+    kill -HUP <master>     Gracefully replace the workers (same preloaded code)
+    kill -USR2 <master>    Start a new master with new code, then send the old
+                           one WINCH and QUIT once it is serving
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread'
+preload_app = True
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+max_requests = int(os.environ.get('MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+accesslog = '-'
+
+# Read by app.py when it is preloaded below
+os.environ['PREFORK_SERVER'] = '1'
+
+# Workers share one cache tier, job store and watch list instead of one per process
+state_dir = os.environ.get('SERVER_STATE_DIR', os.path.join(tempfile.gettempdir(), 'blog-summarizer'))
+os.makedirs(state_dir, exist_ok=True)
+os.environ.setdefault('CACHE_DB_PATH', os.path.join(state_dir, 'summary-cache.sqlite3'))
+os.environ.setdefault('JOB_DB_PATH', os.path.join(state_dir, 'jobs.sqlite3'))
+os.environ.setdefault('WATCH_DB_PATH', os.path.join(state_dir, 'watchlist.sqlite3'))
+os.environ.setdefault('METRICS_DIR', os.path.join(state_dir, 'metrics'))
+
+
+def on_starting(server):
+    # Snapshots of a previous server's workers would be counted again
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+
+
+def pre_fork(server, worker):
+    app = sys.modules.get('app')
+    if app is not None:
+        app.before_fork()
+
+
+def post_fork(server, worker):
+    app = sys.modules.get('app')
+    if app is not None:
+        app.after_fork()
@@ -0,0 +1,133 @@
+"""
+Incremental Document Analysis
+Keeps the keyword counts of each sentence segment of a document so that
+a new version of the page is analysed by diffing sentences: only inserted or
+replaced segments are re-tokenized, and the keyword totals are adjusted by
+the difference. Keywords, key points and sentences always equal what
+AISummarizer computes from scratch on the same text.
+"""
+
+from collections import Counter
+from difflib import SequenceMatcher
+
+from document import KeywordCounts
+from languages import detect_language, get_language
+from normalize import MIN_SENTENCE_LENGTH, count_words
+
+
+def _sentence(segment):
+    sentence = segment.strip()
+    return sentence if len(sentence) > MIN_SENTENCE_LENGTH else None
+
+
+class DocumentAnalysis:
+    """
+    Keyword counts of one document, per sentence segment.
+
+    The text is cut at the same sentence boundaries as split_sentences,
+    but short segments are kept too: keywords never span a boundary, so the
+    document's keyword counts are exactly the sum of the segments' counts.
+    Analyses are kept for many watched pages, so segments are not stored
+    (they are re-cut from the content on update) and their counts are
+    compact KeywordCounts. The language is detected from the first version
+    unless given, and kept for later ones.
+    """
+
+    __slots__ = ('content', 'language', 'keyword_totals', 'words', '_counts')
+
+    def __init__(self, content, language=None):
+        self.content = content
+        self.language = get_language(language or detect_language(content))
+        self.keyword_totals = Counter()
+        self._counts = []
+        for segment in self.language.sentence_boundary.split(content):
+            counts = self.language.keyword_counts(segment)
+            self.keyword_totals.update(counts)
+            self._counts.append(KeywordCounts(counts))
+        self.words = count_words(content)
+
+    @property
+    def sentences(self):
+        """Sentences as split_sentences returns them (offsets into the content)."""
+        return self.language.sentences(self.content)
+
+    def update(self, content):
+        """
+        Move the analysis to a new version of the document.
+
+        Returns:
+            dict: 'added' and 'removed' sentences, and the number of
+                segments that were re-tokenized ('rescored')
+        """
+        boundary = self.language.sentence_boundary
+        old_segments = boundary.split(self.content)
+        segments = boundary.split(content)
+
+        # Edits are usually local: match the common head and tail directly
+        head, limit = 0, min(len(old_segments), len(segments))
+        while head < limit and old_segments[head] == segments[head]:
+            head += 1
+        tail = 0
+        while tail < limit - head and old_segments[-1 - tail] == segments[-1 - tail]:
+            tail += 1
+
+        # autojunk would treat frequent segments as noise in long documents
+        matcher = SequenceMatcher(None, old_segments[head:len(old_segments) - tail],
+                                  segments[head:len(segments) - tail], autojunk=False)
+        counts = self._counts[:head]
+        added, removed = [], []
+        rescored = 0
+        dropped = set()
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            i1, i2, j1, j2 = i1 + head, i2 + head, j1 + head, j2 + head
+            if tag == 'equal':
+                counts.extend(self._counts[i1:i2])
+                continue
+            for old in self._counts[i1:i2]:
+                for word, count in old.items():
+                    self.keyword_totals[word] -= count
+                dropped.update(old)
+            for segment in segments[j1:j2]:
+                new = self.language.keyword_counts(segment)
+                self.keyword_totals.update(new)
+                counts.append(KeywordCounts(new))
+            rescored += j2 - j1
+            removed.extend(sentence for sentence in map(_sentence, old_segments[i1:i2]) if sentence)
+            added.extend(sentence for sentence in map(_sentence, segments[j1:j2]) if sentence)
+        counts.extend(self._counts[len(old_segments) - tail:])
+
+        # Subtracting leaves zero counts behind
+        for word in dropped:
+            if self.keyword_totals[word] <= 0:
+                del self.keyword_totals[word]
+        self.content = content
+        self._counts = counts
+        self.words = count_words(content)
+        return {'added': added, 'removed': removed, 'rescored': rescored}
+
+    def top_keywords(self, k=None):
+        """
+        Most frequent keywords, ties in first-occurrence order (as top_keywords).
+
+        Only the words tied with a selected count need their first occurrence,
+        which is found by walking the segments' counts until all are seen.
+        """
+        ranked = sorted(self.keyword_totals.items(), key=lambda item: -item[1])
+        if k is not None and k < len(ranked):
+            cutoff = ranked[k - 1][1]
+            ranked = [item for item in ranked if item[1] >= cutoff]
+
+        position = {}
+        pending = {word for word, _ in ranked}
+        for index, counts in enumerate(self._counts):
+            if not pending:
+                break
+            found = pending.intersection(counts)
+            if found:
+                for offset, word in enumerate(counts):
+                    if word in found:
+                        position[word] = (index, offset)
+                pending -= found
+
+        ranked.sort(key=lambda item: (-item[1], position[item[0]]))
+        return [word for word, _ in ranked[:k]]
@@ -0,0 +1,442 @@
+"""
+Background Jobs
+Bounded job queue drained by a local worker pool, with pluggable job stores
+(in-memory, or SQLite so queued jobs survive a restart and can be shared by
+the processes of a pre-fork server). Every job records the pid of the
+process that will run it; jobs whose process is gone are taken over by
+another one.
+"""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 256
+DEFAULT_POLL_INTERVAL = 0.25
+
+# Finished jobs are kept this many seconds for clients to fetch their results,
+# and at most this many of them at once
+DEFAULT_JOB_TTL = 3600
+DEFAULT_MAX_FINISHED = 10000
+
+# Minimum seconds between two pruning passes of the SQLite store
+PRUNE_INTERVAL = 60
+
+# Seconds between sweeps for jobs orphaned by a process that exited
+DEFAULT_RECOVER_INTERVAL = 30
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+def new_job(payload, owner=None):
+    """Create a job record for a payload, owned by a process id."""
+    now = time.time()
+    return {
+        'id': uuid.uuid4().hex,
+        'status': QUEUED,
+        'payload': payload,
+        'result': None,
+        'error': None,
+        'owner': owner,
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def process_alive(pid):
+    """True if a process with this id exists (on this host)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MemoryJobStore:
+    """
+    Keeps job records in a dict; lost when the process exits.
+
+    Finished jobs are dropped once older than ttl seconds, or oldest first
+    when more than max_finished of them are kept.
+    """
+
+    def __init__(self, ttl=DEFAULT_JOB_TTL, max_finished=DEFAULT_MAX_FINISHED):
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self._jobs = {}
+        # Finished job ids in the order they finished, with the time they did
+        self._finished = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, job):
+        with self._lock:
+            self._prune(time.time())
+            self._jobs[job['id']] = dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id, **fields):
+        now = time.time()
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields, updated_at=now)
+            if job['status'] in FINISHED:
+                self._finished[job_id] = now
+                self._finished.move_to_end(job_id)
+                self._prune(now)
+            return dict(job)
+
+    def unfinished(self):
+        with self._lock:
+            return [dict(job) for job in self._jobs.values() if job['status'] not in FINISHED]
+
+    def take_over(self, job_id, owner, new_owner):
+        """Re-queue an unfinished job for new_owner if ``owner`` still owns it."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] in FINISHED or job.get('owner') != owner:
+                return False
+            job.update(status=QUEUED, owner=new_owner, updated_at=time.time())
+            return True
+
+    def prune(self):
+        """Drop expired finished jobs now (also done on every create and finish)."""
+        with self._lock:
+            self._prune(time.time())
+
+    def _prune(self, now):
+        expired = now - self.ttl
+        finished = self._finished
+        while finished and (len(finished) > self.max_finished or next(iter(finished.values())) < expired):
+            job_id, _ = finished.popitem(last=False)
+            self._jobs.pop(job_id, None)
+
+
+class SQLiteJobStore:
+    """
+    Keeps job records in SQLite so they survive worker restarts.
+
+    Finished jobs older than ttl seconds, and the oldest beyond max_finished,
+    are deleted when a job is created, at most every PRUNE_INTERVAL seconds.
+    """
+
+    COLUMNS = ('id', 'status', 'payload', 'result', 'error', 'owner', 'created_at', 'updated_at')
+
+    def __init__(self, path, ttl=DEFAULT_JOB_TTL, max_finished=DEFAULT_MAX_FINISHED):
+        self.path = path
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self._pruned_at = 0.0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, "
+                "result TEXT, error TEXT, owner INTEGER, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            # Tables created before jobs had owners
+            if 'owner' not in {info[1] for info in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at)")
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _to_job(self, row):
+        job = dict(zip(self.COLUMNS, row))
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def create(self, job):
+        if time.time() - self._pruned_at >= PRUNE_INTERVAL:
+            self.prune()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, payload, result, error, owner, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job['id'], job['status'], json.dumps(job['payload']),
+                 json.dumps(job['result']) if job['result'] else None,
+                 job['error'], job.get('owner'), job['created_at'], job['updated_at'])
+            )
+
+    def get(self, job_id):
+        row = self._connect().execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return self._to_job(row) if row else None
+
+    def update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result']) if fields['result'] else None
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        return self.get(job_id)
+
+    def unfinished(self):
+        rows = self._connect().execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+            (QUEUED, RUNNING)
+        ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def take_over(self, job_id, owner, new_owner):
+        """
+        Re-queue an unfinished job for new_owner if ``owner`` still owns it.
+
+        The check and the update are one statement, so when several
+        processes race for an orphaned job exactly one of them gets it.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, updated_at = ? "
+                "WHERE id = ? AND owner IS ? AND status IN (?, ?)",
+                (QUEUED, new_owner, time.time(), job_id, owner, QUEUED, RUNNING)
+            )
+        return cursor.rowcount == 1
+
+    def prune(self):
+        """Delete expired finished jobs, and the oldest beyond max_finished."""
+        self._pruned_at = now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, now - self.ttl)
+            )
+            conn.execute(
+                "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN (?, ?) "
+                "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (DONE, FAILED, self.max_finished)
+            )
+
+    def close(self):
+        """Close this thread's connection; the next call opens a new one."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class JobQueue:
+    """
+    Runs submitted jobs on a pool of worker threads.
+
+    The queue is bounded: submit() raises QueueFull instead of letting work
+    pile up, so callers can push back on clients. CPU-heavy work belongs in
+    the handler's own process pool (see BatchSummarizer); the threads here
+    only wait on I/O and on that pool.
+
+    Jobs are owned by the process that submitted them. When processes share
+    a store, each one takes over the unfinished jobs of processes that have
+    exited: when it starts, and every ``recover_interval`` seconds.
+    """
+
+    def __init__(self, handler, store=None, workers=DEFAULT_WORKERS,
+                 max_pending=DEFAULT_MAX_PENDING, poll_interval=DEFAULT_POLL_INTERVAL,
+                 recover_interval=DEFAULT_RECOVER_INTERVAL):
+        """
+        Args:
+            handler (callable): handler(payload) -> result dict with 'success'
+            store: Job store (MemoryJobStore by default)
+            workers (int): Number of worker threads
+            max_pending (int): Maximum number of queued jobs
+            poll_interval (float): Store polling interval when waiting on jobs
+                that may be run by another process
+            recover_interval (float): Seconds between sweeps for jobs orphaned
+                by exited processes, or None to recover only on start
+        """
+        self.handler = handler
+        self.store = store or MemoryJobStore()
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.recover_interval = recover_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._changed = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self, recover=True):
+        """
+        Start the workers and take over jobs left unfinished by exited processes.
+
+        Args:
+            recover (bool): Re-queue orphaned jobs from the store, now and
+                every recover_interval seconds
+        """
+        self._stopping.clear()
+        if recover:
+            # Jobs recorded under this pid belong to an earlier queue: this one has none yet
+            self.recover(include_own=True)
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if recover and self.recover_interval:
+            thread = threading.Thread(target=self._sweep, name="job-recovery", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def recover(self, include_own=False):
+        """
+        Take over and queue the unfinished jobs whose owning process has exited.
+
+        Args:
+            include_own (bool): Also take jobs recorded under this process id
+
+        Returns:
+            int: Number of jobs taken over
+        """
+        pid = os.getpid()
+        recovered = 0
+        for job in self.store.unfinished():
+            owner = job.get('owner')
+            if owner == pid:
+                orphaned = include_own
+            else:
+                orphaned = owner is None or not process_alive(owner)
+            if not orphaned:
+                continue
+            if self._queue.full():
+                logging.error(f"Job queue full, could not recover job {job['id']}")
+                break
+            if not self.store.take_over(job['id'], owner, pid):
+                continue  # Finished meanwhile, or another process took it
+            try:
+                self._queue.put_nowait(job['id'])
+            except queue.Full:
+                # Leave it for the next sweep of any process
+                self.store.update(job['id'], owner=None)
+                logging.error(f"Job queue full, could not recover job {job['id']}")
+                break
+            recovered += 1
+        return recovered
+
+    def _sweep(self):
+        while not self._stopping.wait(self.recover_interval):
+            try:
+                self.recover()
+            except Exception as e:
+                logging.error(f"Job recovery failed: {str(e)}")
+
+    def shutdown(self, wait=True):
+        """Stop the workers once the jobs already taken have finished."""
+        self._stopping.set()
+        for thread in self._threads:
+            if thread.name.startswith('job-worker'):
+                self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def submit(self, payload):
+        """
+        Queue a job and return its record immediately.
+
+        Raises:
+            QueueFull: When max_pending jobs are already waiting
+        """
+        if self._queue.full():
+            raise QueueFull("Job queue is full")
+        job = new_job(payload, owner=os.getpid())
+        self.store.create(job)
+        try:
+            self._queue.put_nowait(job['id'])
+        except queue.Full:
+            self.store.update(job['id'], status=FAILED, error="Job queue is full")
+            raise QueueFull("Job queue is full")
+        return job
+
+    def pending(self):
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def wait(self, job_id, timeout, updated_after=None):
+        """
+        Block until the job changes (or finishes) or the timeout expires.
+
+        Args:
+            job_id (str): Job to watch
+            timeout (float): Maximum seconds to wait
+            updated_after (float): Return once the job's updated_at is newer
+                than this; by default wait until the job is finished
+
+        Returns:
+            dict: The latest job record, or None for an unknown job
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job['status'] in FINISHED:
+                return job
+            if updated_after is not None and job['updated_at'] > updated_after:
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            with self._changed:
+                self._changed.wait(min(remaining, self.poll_interval))
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        job = self.store.get(job_id)
+        if job is None or job['status'] in FINISHED:
+            return
+        self.store.update(job_id, status=RUNNING)
+        self._notify()
+        try:
+            result = self.handler(job['payload'])
+            status = DONE if result.get('success') else FAILED
+            self.store.update(job_id, status=status, result=result, error=result.get('error'))
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {str(e)}")
+            self.store.update(job_id, status=FAILED, error=f"Job failed: {str(e)}")
+        self._notify()
@@ -0,0 +1,262 @@
+"""
+Languages
+Language detection and the per-language resources of the summarization
+pipeline: cleaning, sentence splitting, keyword tokens, stop words and the
+phrases of the template summary. Detection scores character trigrams of a
+short prefix of the text against small per-language profiles; a language's
+resources are compiled the first time a document in it is seen, and cached.
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+
+from document import SentenceSpans
+from normalize import DISALLOWED_CHARS, MIN_SENTENCE_LENGTH, clean_text, split_sentences
+from text_analysis import KEYWORD_PATTERN, STOP_WORDS, keyword_counts
+
+DEFAULT_LANGUAGE = 'en'
+
+# Characters at the start of a text that detection looks at
+DETECT_PREFIX_CHARS = 1024
+
+# Characters of the prefix scored by trigrams, once the prefix contains
+# another script (the scoring is far slower than the script check)
+SCORE_PREFIX_CHARS = 384
+
+# Most frequent trigrams of the sample text kept in a language's profile
+PROFILE_SIZE = 300
+
+# Share of a prefix's trigrams a profile must contain to be chosen
+MIN_DETECT_SCORE = 0.2
+
+_LETTERS = re.compile(r'[^\W\d_]+')
+
+URDU_STOP_WORDS = (
+    'کے', 'کی', 'کا', 'ہے', 'میں', 'اور', 'سے', 'کو', 'نے', 'یہ', 'وہ', 'ہیں',
+    'تھا', 'تھی', 'تھے', 'پر', 'بھی', 'ایک', 'کہ', 'جو', 'ان', 'اس', 'لیے', 'لئے',
+    'گیا', 'گئی', 'گئے', 'ہو', 'ہوا', 'ہوتا', 'ہوتی', 'رہا', 'رہی', 'رہے', 'کر',
+    'کرنے', 'کیا', 'کیے', 'تو', 'نہیں', 'ہی', 'اپنے', 'اپنی', 'اپنا', 'جس', 'جب',
+    'تک', 'یا', 'لیکن', 'اگر', 'بعد', 'ساتھ', 'والے', 'والی', 'سکتا', 'سکتی'
+)
+
+# Plain specs, compiled into a Language on first use (see get_language).
+# English reuses the pipeline's original patterns, so its results are
+# unchanged. Every other language has a 'script' outside Latin: text
+# without any of those characters is English without trigram scoring.
+LANGUAGES = {
+    'en': {
+        'name': 'English',
+        'terminators': '.!?',
+        'disallowed': DISALLOWED_CHARS.pattern,
+        'keyword_pattern': KEYWORD_PATTERN.pattern,
+        'stop_words': STOP_WORDS,
+        'sentence_end': '.',
+        'phrases': {
+            'titled': "This article titled '{title}' discusses",
+            'untitled': "This content covers",
+            'topics': " {topics}",
+            'topic_separator': ", ",
+            'insight': ". The main insight is: {point}"
+        },
+        'sample': (
+            "The team released a new version of the library this week, and the "
+            "changes are worth a closer look. Most of the work went into making "
+            "the server faster when many people use it at the same time. There "
+            "is also a better way to search through old articles, which should "
+            "help readers find what they are looking for. In the past, every "
+            "request had to wait for the one before it, so pages were slow to "
+            "load during busy hours. Now the work is shared between several "
+            "processes. The authors explain how they measured the difference "
+            "and what they learned along the way. They also discuss which "
+            "features they would like to build next, including support for "
+            "more languages and a simpler interface for mobile devices. If you "
+            "have been following this project for some time, you will notice "
+            "that the documentation has been rewritten from the beginning."
+        )
+    },
+    'ur': {
+        'name': 'Urdu',
+        'terminators': '.!?۔؟',
+        # Arabic script blocks, including presentation forms
+        'script': r'[\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF]',
+        # Also keeps Urdu punctuation, diacritics and the zero-width non-joiner
+        'disallowed': r'[^\w\s.,!?;:\-()\u060C\u061B\u061F\u06D4\u064B-\u065F\u0670\u200C]+',
+        # Arabic-script letters and diacritics, or Latin words as in English
+        'keyword_pattern': r'[\u0621-\u063A\u0641-\u065F\u0670-\u06D3\u06D5]{2,}|\b[a-zA-Z]{3,}\b',
+        'stop_words': frozenset(URDU_STOP_WORDS) | STOP_WORDS,
+        'sentence_end': '۔',
+        'phrases': {
+            'titled': "'{title}' کے عنوان سے یہ مضمون",
+            'untitled': "یہ مواد",
+            'topics': " {topics} کے بارے میں ہے",
+            'topic_separator': "، ",
+            'insight': "۔ اہم نکتہ: {point}"
+        },
+        'sample': (
+            "یہ مضمون ٹیکنالوجی کے بارے میں ہے۔ پاکستان میں انٹرنیٹ کا استعمال "
+            "تیزی سے بڑھ رہا ہے اور لوگ اپنے کاروبار کے لیے نئی ایپلیکیشنز استعمال "
+            "کر رہے ہیں۔ حکومت نے تعلیم اور صحت کے شعبوں میں بہتری کے لیے کئی "
+            "منصوبے شروع کیے ہیں۔ اس کتاب میں مصنف نے اپنی زندگی کے تجربات بیان "
+            "کیے ہیں۔ ہم نے دیکھا کہ بچوں کو اسکول جانے میں بہت مشکلات کا سامنا "
+            "تھا۔ یہ بات اہم ہے کہ ہر شہری کو معلومات تک رسائی حاصل ہو۔ دنیا بھر "
+            "میں موسمیاتی تبدیلی ایک بڑا مسئلہ بن چکی ہے، جس سے کسانوں کی فصلیں "
+            "متاثر ہوتی ہیں۔ کیا آپ جانتے ہیں کہ اردو زبان برصغیر میں کروڑوں لوگ "
+            "بولتے اور سمجھتے ہیں؟ شہر کے بازاروں میں آج کل بہت رش ہوتا ہے اور "
+            "دکاندار نئی چیزیں فروخت کرنے کی کوشش کرتے ہیں۔"
+        )
+    }
+}
+
+
+# Samples of languages detection tells apart from the ones in LANGUAGES but
+# has no resources for: text in them is DEFAULT_LANGUAGE rather than
+# whichever supported language shares their script
+UNSUPPORTED_SAMPLES = {
+    'ar': (
+        "أصدر الفريق هذا الأسبوع نسخة جديدة من المكتبة، والتغييرات تستحق نظرة "
+        "أقرب. ذهب معظم العمل إلى جعل الخادم أسرع عندما يستخدمه عدد كبير من "
+        "الناس في الوقت نفسه. هناك أيضا طريقة أفضل للبحث في المقالات القديمة، "
+        "وهي تساعد القراء على العثور على ما يبحثون عنه. في الماضي كان على كل "
+        "طلب أن ينتظر الطلب الذي قبله، لذلك كانت الصفحات بطيئة في ساعات الذروة. "
+        "أما الآن فيتم توزيع العمل بين عدة عمليات. يشرح المؤلفون كيف قاسوا "
+        "الفرق وما الذي تعلموه خلال ذلك. ويناقشون أيضا الميزات التي يريدون "
+        "بناءها في المستقبل، ومنها دعم المزيد من اللغات وواجهة أبسط للهواتف. "
+        "مرحبا بكم في موقعنا، حيث نقدم لكم أفضل المقالات عن التكنولوجيا والعلوم "
+        "والثقافة في العالم العربي."
+    )
+}
+
+
+class Language:
+    """The compiled resources of one language (see get_language)."""
+
+    def __init__(self, code, spec):
+        self.code = code
+        self.name = spec['name']
+        terminators = spec['terminators']
+        self.sentence_boundary = re.compile(f'[{terminators}]+')
+        # Where the long-document path may end a chunk (see longdoc)
+        self.chunk_boundary = re.compile(f'[{terminators}]+\\s')
+        self.disallowed = re.compile(spec['disallowed'])
+        self.keyword_pattern = re.compile(spec['keyword_pattern'])
+        self.stop_words = frozenset(spec['stop_words'])
+        self.sentence_end = spec['sentence_end']
+        self.phrases = spec['phrases']
+
+    def __repr__(self):
+        return f"Language({self.code!r})"
+
+    def clean(self, text):
+        """normalize.clean_text, keeping this language's punctuation."""
+        return clean_text(text, self.disallowed)
+
+    def sentences(self, text, min_length=MIN_SENTENCE_LENGTH):
+        """Sentences as SentenceSpans (offsets into text)."""
+        return SentenceSpans(text, min_length, self.sentence_boundary)
+
+    def split_sentences(self, text, min_length=MIN_SENTENCE_LENGTH):
+        return split_sentences(text, min_length, self.sentence_boundary)
+
+    def keyword_counts(self, text):
+        return keyword_counts(text, self.keyword_pattern, self.stop_words)
+
+    def top_keywords(self, text, k=None):
+        """Most frequent non-stop-words, as text_analysis.top_keywords."""
+        return [word for word, count in self.keyword_counts(text).most_common(k)]
+
+    def terms(self, text):
+        """Keyword tokens of text in order, stop words removed (for TextRank)."""
+        stop_words = self.stop_words
+        return [word for word in self.keyword_pattern.findall(text.lower()) if word not in stop_words]
+
+
+@lru_cache(maxsize=None)
+def get_language(code):
+    """
+    The Language for a code, compiled on first use.
+
+    Raises:
+        ValueError: For an unsupported language
+    """
+    try:
+        spec = LANGUAGES[code]
+    except KeyError:
+        raise ValueError(f"Unsupported language: {code} (choose from {', '.join(sorted(LANGUAGES))})")
+    return Language(code, spec)
+
+
+def trigrams(text):
+    """
+    Character trigrams of the lowercased words of text, each word padded
+    with a space on both sides (two spaces between words, so no trigram
+    spans two words' letters).
+    """
+    padded = f" {'  '.join(_LETTERS.findall(text.lower()))} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+@lru_cache(maxsize=None)
+def _other_scripts():
+    """Characters of any script of a language other than DEFAULT_LANGUAGE."""
+    scripts = [spec['script'] for spec in LANGUAGES.values() if 'script' in spec]
+    return re.compile('|'.join(scripts)) if scripts else None
+
+
+@lru_cache(maxsize=None)
+def language_profile(code):
+    """The PROFILE_SIZE most frequent trigrams of a language's sample text."""
+    sample = LANGUAGES[code]['sample'] if code in LANGUAGES else UNSUPPORTED_SAMPLES[code]
+    counts = Counter(trigrams(sample))
+    return frozenset(gram for gram, count in counts.most_common(PROFILE_SIZE))
+
+
+def detect_language(text, prefix_chars=DETECT_PREFIX_CHARS):
+    """
+    Guess the language of text from its first ``prefix_chars`` characters.
+
+    A prefix without characters of another language's script is
+    DEFAULT_LANGUAGE, found with a single regex search. Otherwise every
+    trigram of the prefix counts for the languages whose profile contains
+    it; the language covering the largest share wins if that share reaches
+    MIN_DETECT_SCORE and it is not one of UNSUPPORTED_SAMPLES (so Arabic is
+    not taken for Urdu). A mixed-language text gets the language most of
+    its prefix is written in.
+
+    Returns:
+        str: A LANGUAGES code (DEFAULT_LANGUAGE when unsure)
+    """
+    prefix = text[:prefix_chars]
+    scripts = _other_scripts()
+    if prefix.isascii() or scripts is None or not scripts.search(prefix):
+        return DEFAULT_LANGUAGE
+
+    grams = trigrams(prefix[:SCORE_PREFIX_CHARS])
+    best, best_score = DEFAULT_LANGUAGE, MIN_DETECT_SCORE * len(grams)
+    for code in chain(LANGUAGES, UNSUPPORTED_SAMPLES):
+        score = sum(map(language_profile(code).__contains__, grams))
+        if score > best_score:
+            best, best_score = code, score
+    return best if best in LANGUAGES else DEFAULT_LANGUAGE
+
+
+def detect_language_of_pieces(pieces, prefix_chars=DETECT_PREFIX_CHARS):
+    """
+    detect_language for a text read in pieces (e.g. the lines of a file).
+
+    Returns:
+        tuple: (language code, iterable over all the pieces, including the
+            ones read to fill the prefix)
+    """
+    if isinstance(pieces, str):
+        return detect_language(pieces, prefix_chars), (pieces,)
+    pieces = iter(pieces)
+    head = []
+    size = 0
+    for piece in pieces:
+        head.append(piece)
+        size += len(piece)
+        if size >= prefix_chars:
+            break
+    return detect_language(''.join(head), prefix_chars), chain(head, pieces)
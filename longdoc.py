@@ -0,0 +1,300 @@
+"""
+Long Document Summarization
+Map-reduce scoring for very long texts (transcripts, documentation): cleaned
+text is fed from a generator in fixed-size chunks, each chunk is scored in a
+process pool shared by every long document of the process, and the partial
+keyword counts and candidate sentences are merged in document order. Memory is bounded by the chunk size, the number of
+chunks in flight and the vocabulary, not by the length of the document.
+"""
+
+import os
+import re
+import threading
+from collections import Counter, deque
+
+from languages import DEFAULT_LANGUAGE, get_language
+from summary_engines import TextRankEngine
+from text_analysis import LEAD_FRACTION, MIN_POINT_WORDS, MAX_POINT_WORDS
+
+# Content at least this long (characters) takes the long-document path
+LONG_DOCUMENT_CHARS = 250000
+
+DEFAULT_CHUNK_CHARS = 64 * 1024
+
+# Key points selected per document (AISummarizer uses the same number)
+KEY_POINTS = 5
+
+# Candidate sentences kept per length class. With fewer than KEY_POINTS
+# sentences in the lead, the lead holds at most KEY_POINTS - 1 of them, so
+# twice as many candidates always include the first non-lead ones.
+CANDIDATES = 2 * KEY_POINTS
+
+# Extractive candidates are re-ranked once their pool reaches this many
+# sentences, keeping EXTRACT_HEADROOM times the target length in words
+MAX_EXTRACT_SENTENCES = 2000
+EXTRACT_HEADROOM = 4
+
+# Chunks submitted to the pool but not yet reduced, per process
+CHUNKS_IN_FLIGHT = 2
+
+# Upper bound on the shared pool's size, whatever a caller asks for
+MAX_POOL_PROCESSES = os.cpu_count() or 1
+
+# Chunks end after a sentence terminator run and the whitespace following it
+CHUNK_BOUNDARY = re.compile(r'[.!?]+\s')
+WHITESPACE = re.compile(r'\s')
+
+# The pool shared by all long documents of this process (see shared_pool)
+_pool = None
+_pool_lock = threading.Lock()
+
+# Set in pool worker processes, which must not start pools of their own
+_in_pool_worker = False
+
+
+def mark_pool_worker():
+    """
+    Flag this process as a pool worker, so long documents summarized in it
+    are scored in-process. Process pool initializers call this.
+    """
+    global _in_pool_worker
+    _in_pool_worker = True
+
+
+def shared_pool(processes):
+    """
+    The process pool for chunk scoring, created on first use.
+
+    Its size is fixed by the first caller, capped at MAX_POOL_PROCESSES.
+    """
+    global _pool
+    # concurrent.futures.process imports multiprocessing; load it on demand
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=min(processes, MAX_POOL_PROCESSES),
+                                        initializer=mark_pool_worker)
+        return _pool
+
+
+def shutdown_pool(wait=True):
+    """Release the shared pool; the next long document starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _discard_pool(pool):
+    """Drop a broken pool (a worker died) so the next caller gets a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _forget_pool():
+    """A forked child does not own its parent's pool."""
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_pool)
+
+
+def iter_chunks(pieces, chunk_chars=DEFAULT_CHUNK_CHARS, boundary=CHUNK_BOUNDARY):
+    """
+    Re-cut a stream of text pieces into chunks of about ``chunk_chars``.
+
+    Chunks end at the first sentence boundary past ``chunk_chars``, so their
+    sentences, words and keywords are the same as those of the text as a
+    whole. A run with no boundary within twice that is cut at whitespace,
+    which splits a sentence across two chunks, or with no whitespace either
+    at ``2 * chunk_chars``, which splits a word; chunks stay bounded rather
+    than exact for such text.
+
+    Args:
+        pieces: Cleaned text (see normalize.clean_text) as a string, or an
+            iterable of consecutive pieces of it
+        chunk_chars (int): Target chunk size in characters
+        boundary: Sentence boundary pattern (see Language.chunk_boundary)
+
+    Yields:
+        str: Consecutive chunks of the text
+    """
+    if isinstance(pieces, str):
+        pieces = (pieces,)
+
+    buffer = ''
+    start = 0
+    for piece in pieces:
+        buffer = buffer[start:] + piece
+        start = 0
+        while len(buffer) - start > chunk_chars:
+            limit = start + 2 * chunk_chars
+            match = boundary.search(buffer, start + chunk_chars, limit)
+            if match:
+                end = match.end()
+            elif len(buffer) <= limit:
+                break  # wait for more text
+            else:
+                match = WHITESPACE.search(buffer, start + chunk_chars, limit)
+                end = match.end() if match else limit
+            yield buffer[start:end]
+            start = end
+
+    if start < len(buffer):
+        yield buffer[start:]
+
+
+def score_chunk(text, extract_length=None, language=DEFAULT_LANGUAGE):
+    """
+    Map step: partial statistics for one chunk.
+
+    Args:
+        text (str): Cleaned chunk text
+        extract_length (int): For extractive engines, the summary length in
+            words to pre-select candidate sentences for
+        language (str): Language code of the text (a code, so it pickles
+            cheaply to the pool)
+
+    Returns:
+        dict: Word and sentence counts, keyword counts, the first CANDIDATES
+            sentences of each length class and the extractive candidates,
+            with sentence positions relative to the chunk
+    """
+    language = get_language(language)
+    sentences = language.split_sentences(text)
+    fitting, other = [], []
+    for position, sentence in enumerate(sentences):
+        bucket = fitting if MIN_POINT_WORDS <= len(sentence.split()) <= MAX_POINT_WORDS else other
+        if len(bucket) < CANDIDATES:
+            bucket.append((position, sentence))
+
+    extract = []
+    if extract_length and sentences:
+        extract = [(i, sentences[i]) for i in TextRankEngine().select(sentences, extract_length, language)]
+
+    return {
+        'words': len(text.split()),
+        'sentences': len(sentences),
+        'keywords': language.keyword_counts(text),
+        'fitting': fitting,
+        'other': other,
+        'extract': extract
+    }
+
+
+def map_chunks(chunks, extract_length=None, processes=None, language=DEFAULT_LANGUAGE):
+    """
+    Score chunks across the shared process pool, yielding partials in chunk order.
+
+    At most CHUNKS_IN_FLIGHT chunks per process are submitted ahead of the
+    reduce step, so a generator source is only read as fast as it is scored.
+    With one process, or inside a pool worker, the chunks are scored in the
+    current process.
+    """
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1 or _in_pool_worker:
+        for chunk in chunks:
+            yield score_chunk(chunk, extract_length, language)
+        return
+
+    from concurrent.futures.process import BrokenProcessPool
+
+    pool = shared_pool(processes)
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(score_chunk, chunk, extract_length, language))
+            if len(pending) >= processes * CHUNKS_IN_FLIGHT:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        # An abandoned generator leaves no chunks queued in the shared pool
+        for future in pending:
+            future.cancel()
+
+
+class ChunkReducer:
+    """
+    Reduce step: merges chunk partials, in document order, into the
+    statistics AISummarizer needs.
+
+    Keyword counts are merged in chunk order, so ties keep first-occurrence
+    order exactly as top_keywords does, and key points match
+    top_key_points over the whole document.
+    """
+
+    def __init__(self, extract_length=None, language=DEFAULT_LANGUAGE):
+        self.extract_length = extract_length
+        self.language = get_language(language)
+        self.words = 0
+        self.sentences = 0
+        self.keywords = Counter()
+        self.fitting = []
+        self.other = []
+        self.extract = []
+
+    def add(self, partial):
+        offset = self.sentences
+        self.words += partial['words']
+        self.sentences += partial['sentences']
+        self.keywords.update(partial['keywords'])
+        for merged, candidates in ((self.fitting, partial['fitting']), (self.other, partial['other'])):
+            room = CANDIDATES - len(merged)
+            merged.extend((offset + i, sentence) for i, sentence in candidates[:room])
+
+        self.extract.extend((offset + i, sentence) for i, sentence in partial['extract'])
+        if len(self.extract) > MAX_EXTRACT_SENTENCES:
+            sentences = [sentence for _, sentence in self.extract]
+            keep = TextRankEngine().select(sentences, self.extract_length * EXTRACT_HEADROOM, self.language)
+            self.extract = [self.extract[i] for i in keep]
+
+    def top_keywords(self, k=None):
+        return [word for word, count in self.keywords.most_common(k)]
+
+    def key_points(self, k=KEY_POINTS):
+        """Same ranking as top_key_points (lead first, then 10-30 words)."""
+        lead = self.sentences * LEAD_FRACTION
+        buckets = (
+            [s for i, s in self.fitting if i < lead][:k],
+            [s for i, s in self.other if i < lead][:k],
+            [s for i, s in self.fitting if i >= lead][:k],
+            [s for i, s in self.other if i >= lead][:k]
+        )
+        return (buckets[0] + buckets[1] + buckets[2] + buckets[3])[:k]
+
+    def extract_sentences(self):
+        """Extractive candidates in document order."""
+        return [sentence for _, sentence in self.extract]
+
+
+def reduce_chunks(pieces, extract_length=None, processes=None, chunk_chars=DEFAULT_CHUNK_CHARS,
+                  language=DEFAULT_LANGUAGE):
+    """
+    Chunk, map and reduce a long text.
+
+    Args:
+        pieces: Cleaned text, or an iterable of consecutive pieces of it
+        extract_length (int): Summary length to pre-select extractive candidates for
+        processes (int): Pool size (defaults to the CPU count; 1 scores in-process)
+        chunk_chars (int): Target chunk size in characters
+        language (str): Language code of the text
+
+    Returns:
+        ChunkReducer: The merged statistics
+    """
+    reducer = ChunkReducer(extract_length, language)
+    chunks = iter_chunks(pieces, chunk_chars, reducer.language.chunk_boundary)
+    for partial in map_chunks(chunks, extract_length, processes, language):
+        reducer.add(partial)
+    return reducer
@@ -0,0 +1,284 @@
+"""
+Pipeline Metrics
+Per-stage latency histograms and byte/word counters for the scrape ->
+summarize pipeline, rendered in the Prometheus text exposition format.
+Processes of a pre-fork server share theirs through snapshot files (see
+MultiprocessExporter), so any worker can report the totals of all of them.
+"""
+
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Latency buckets in seconds (upper bounds; +Inf is implicit)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Distinct host label values kept before folding the rest into "other"
+MAX_HOSTS = 200
+
+ALL_HOSTS = ''
+
+# Seconds between snapshots written by each process for MultiprocessExporter
+DEFAULT_EXPORT_INTERVAL = 5
+
+
+def host_of(url):
+    """Host label for a URL."""
+    try:
+        return (urlparse(url).hostname or '').lower()
+    except ValueError:
+        return ''
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with sum, count and max."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'max')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Estimate a quantile from the bucket counts (upper bucket bound)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class MetricsRegistry:
+    """Thread-safe store for stage histograms and counters, labelled by host."""
+
+    def __init__(self, max_hosts=MAX_HOSTS):
+        self.max_hosts = max_hosts
+        self._histograms = {}
+        self._counters = {}
+        self._hosts = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _host_label(self, host):
+        if not host:
+            return ALL_HOSTS
+        if host not in self._hosts:
+            if len(self._hosts) >= self.max_hosts:
+                return 'other'
+            self._hosts.add(host)
+        return host
+
+    def observe(self, stage, seconds, host=None):
+        """Record a stage latency, overall and for the host."""
+        self._journal(('observe', stage, seconds, host))
+        with self._lock:
+            label = self._host_label(host)
+            for key in {(stage, ALL_HOSTS), (stage, label)}:
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram()
+                histogram.observe(seconds)
+
+    def increment(self, name, amount=1, host=None):
+        """Add to a counter, overall and for the host."""
+        self._journal(('increment', name, amount, host))
+        with self._lock:
+            label = self._host_label(host)
+            for key in {(name, ALL_HOSTS), (name, label)}:
+                self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, stage, host=None):
+        """Time the enclosed block as one observation of ``stage``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, host)
+
+    def _journal(self, event):
+        journal = getattr(self._local, 'journal', None)
+        if journal is not None:
+            journal.append(event)
+
+    @contextmanager
+    def collect(self, events):
+        """Also append this thread's observations to ``events`` (for shipping
+        metrics recorded in a worker process back to the parent)."""
+        previous = getattr(self._local, 'journal', None)
+        self._local.journal = events
+        try:
+            yield events
+        finally:
+            self._local.journal = previous
+
+    def replay(self, events):
+        """Apply observations collected in another process."""
+        for kind, name, value, host in events:
+            getattr(self, kind)(name, value, host)
+
+    def stage_summary(self):
+        """Overall per-stage stats: {stage: {'count', 'total', 'mean', 'p95', 'max'}}."""
+        with self._lock:
+            summary = {}
+            for (stage, host), histogram in sorted(self._histograms.items()):
+                if host != ALL_HOSTS:
+                    continue
+                summary[stage] = {
+                    'count': histogram.count,
+                    'total': histogram.sum,
+                    'mean': histogram.sum / histogram.count if histogram.count else 0.0,
+                    'p95': histogram.quantile(0.95),
+                    'max': histogram.max
+                }
+            return summary
+
+    def counters(self):
+        """Overall counter values."""
+        with self._lock:
+            return {name: value for (name, host), value in self._counters.items() if host == ALL_HOSTS}
+
+    def snapshot(self):
+        """Plain (JSON-serializable) copy of every histogram and counter."""
+        with self._lock:
+            return {
+                'histograms': [[stage, host, list(h.counts), h.sum, h.count, h.max]
+                               for (stage, host), h in self._histograms.items()],
+                'counters': [[name, host, value] for (name, host), value in self._counters.items()]
+            }
+
+    def merge(self, snapshot):
+        """Add a snapshot (see snapshot()) taken in another registry to this one."""
+        with self._lock:
+            for stage, host, counts, total, count, maximum in snapshot['histograms']:
+                histogram = self._histograms.get((stage, host))
+                if histogram is None:
+                    histogram = self._histograms[(stage, host)] = Histogram()
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+                histogram.max = max(histogram.max, maximum)
+            for name, host, value in snapshot['counters']:
+                self._counters[(name, host)] = self._counters.get((name, host), 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._hosts.clear()
+
+    def render_prometheus(self, prefix='blog_summarizer'):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Latency of each pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds histogram"
+        ]
+        with self._lock:
+            for (stage, host), histogram in sorted(self._histograms.items()):
+                labels = f'stage="{stage}",host="{_escape(host or "all")}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{{labels}}} {histogram.sum:.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{{labels}}} {histogram.count}')
+
+            names = sorted({name for name, host in self._counters})
+            for name in names:
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                for (counter, host), value in sorted(self._counters.items()):
+                    if counter == name:
+                        lines.append(f'{prefix}_{name}_total{{host="{_escape(host or "all")}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MultiprocessExporter:
+    """
+    Aggregates the registries of several processes through a shared directory.
+
+    Each started process writes a snapshot of its registry to its own file
+    every ``interval`` seconds (and right before it renders); rendering
+    merges the files of every process, including exited ones, so counters
+    never go backwards when a worker is replaced. The directory should be
+    emptied when the server starts.
+    """
+
+    def __init__(self, directory, registry, interval=DEFAULT_EXPORT_INTERVAL):
+        self.directory = directory
+        self.registry = registry
+        self.interval = interval
+        self.path = None
+        self._thread = None
+
+    def start(self):
+        """Begin writing this process's snapshots (call once per process, after fork)."""
+        os.makedirs(self.directory, exist_ok=True)
+        # Unique per process lifetime: a reused pid must not overwrite an exited worker's totals
+        self.path = os.path.join(self.directory, f"metrics-{os.getpid()}-{time.time_ns()}.json")
+        self.write()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self):
+        """Write this process's snapshot atomically."""
+        if self.path is None:
+            return
+        fd, tmp = tempfile.mkstemp(prefix='.metrics-', dir=self.directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(tmp, self.path)
+
+    def aggregate(self):
+        """A registry holding the sum of every process's latest snapshot."""
+        self.write()
+        merged = MetricsRegistry()
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith('metrics-') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                    merged.merge(json.load(f))
+            except (OSError, ValueError):
+                continue  # Removed or being replaced meanwhile
+        return merged
+
+    def render_prometheus(self, prefix='blog_summarizer'):
+        return self.aggregate().render_prometheus(prefix)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                pass
+
+
+# Process-wide registry used by BlogScraper, AISummarizer and the /metrics route
+registry = MetricsRegistry()
@@ -0,0 +1,87 @@
+"""
+Text Normalization
+Precompiled cleaning and sentence-splitting used by BlogScraper and AISummarizer.
+"""
+
+import re
+
+# Characters BlogScraper drops after whitespace is collapsed
+DISALLOWED_CHARS = re.compile(r'[^\w\s.,!?;:\-()]+')
+
+# Sentence terminators used by AISummarizer
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+')
+
+MIN_SENTENCE_LENGTH = 10
+
+# Long texts are split, cleaned and counted a window at a time, so the
+# per-word lists str.split() builds stay bounded by the window size
+WINDOW_CHARS = 64 * 1024
+
+_WHITESPACE = re.compile(r'\s')
+
+
+def iter_windows(text, size=None):
+    """
+    Yield consecutive slices of about ``size`` characters (WINDOW_CHARS by
+    default) that together make up text.
+
+    Every slice but the first starts at a whitespace character, so no word
+    (and no ``\\b``-delimited token) is cut between two windows.
+    """
+    size = size or WINDOW_CHARS
+    start, length = 0, len(text)
+    while start < length:
+        end = start + size
+        if end < length:
+            match = _WHITESPACE.search(text, end)
+            end = match.start() if match else length
+        yield text[start:end]
+        start = end
+
+
+def clean_text(text, disallowed=DISALLOWED_CHARS):
+    """
+    Collapse whitespace runs to single spaces and strip disallowed characters.
+
+    Equivalent to ``re.sub(r'\\s+', ' ')`` followed by removing characters
+    outside ``[\\w\\s.,!?;:\\-()]`` and stripping, but whitespace is collapsed
+    by str.split/join in C, leaving a single regex pass over the text. Long
+    texts are cleaned window by window: the word list of the whole text
+    would take several times its size. Languages with other punctuation
+    pass their own ``disallowed`` pattern (see languages).
+    """
+    if len(text) <= WINDOW_CHARS:
+        return disallowed.sub('', ' '.join(text.split())).strip()
+    # Disallowed runs never span a space, so cleaning windows and joining them is exact
+    return ' '.join(disallowed.sub('', ' '.join(words))
+                    for words in map(str.split, iter_windows(text)) if words).strip()
+
+
+def count_words(text):
+    """Number of whitespace-separated words, as ``len(text.split())`` without the list."""
+    if len(text) <= WINDOW_CHARS:
+        return len(text.split())
+    return sum(len(window.split()) for window in iter_windows(text))
+
+
+def iter_sentences(text, min_length=MIN_SENTENCE_LENGTH, boundary=SENTENCE_BOUNDARY):
+    """
+    Yield stripped sentences longer than ``min_length`` characters, lazily.
+
+    Produces the same sentences as splitting on ``boundary`` (``[.!?]+`` by
+    default) without building the intermediate list of pieces.
+    """
+    start = 0
+    for match in boundary.finditer(text):
+        sentence = text[start:match.start()].strip()
+        if len(sentence) > min_length:
+            yield sentence
+        start = match.end()
+    sentence = text[start:].strip()
+    if len(sentence) > min_length:
+        yield sentence
+
+
+def split_sentences(text, min_length=MIN_SENTENCE_LENGTH, boundary=SENTENCE_BOUNDARY):
+    """Split text into a list of sentences (see iter_sentences)."""
+    return list(iter_sentences(text, min_length, boundary))
@@ -0,0 +1,441 @@
+"""
+Per-Host Politeness
+Keeps each host's traffic polite while many hosts are fetched in parallel:
+token-bucket request rates per host (slowed further by robots.txt
+Crawl-delay), retries with exponential backoff on 429/5xx that honor
+Retry-After, and a circuit breaker that fails fast on hosts that keep failing.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from metrics import registry as metrics, host_of
+
+# Requests per second per host, and how many may be sent back to back
+DEFAULT_HOST_RATE = 2.0
+DEFAULT_HOST_BURST = 4
+
+# Retries of a request answered with RETRY_STATUSES or a connection error
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+
+# Retry-After longer than this is not waited out by the request: it fails,
+# and the host stays paused for the other requests until the time is up
+DEFAULT_MAX_RETRY_AFTER = 30.0
+
+# Consecutive failures that open a host's circuit, and the cool-down before
+# a single probe request is let through again
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_COOLDOWN = 30.0
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# robots.txt entries cached, and for how long
+ROBOTS_TTL = 3600
+MAX_ROBOTS_HOSTS = 1000
+
+# Hosts whose bucket and breaker state is kept
+MAX_HOSTS = 10000
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def host_key(url):
+    """Scheme and network location: the unit rates and circuits apply to."""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def parse_retry_after(value, now=None):
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date).
+
+    Returns:
+        float: Seconds (never negative), or None when absent or unparseable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    from email.utils import parsedate_to_datetime
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(when.timestamp() - now, 0.0)
+
+
+class TokenBucket:
+    """
+    Reserve-ahead token bucket: ``reserve`` always takes a token and returns
+    how long the caller must wait until that token is due.
+    """
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def ready_in(self, now):
+        """Seconds until a token is available, without taking it."""
+        self._refill(now)
+        return max(self.updated + max(1 - self.tokens, 0.0) / self.rate - now, 0.0)
+
+    def reserve(self, now):
+        self._refill(now)
+        wait = self.ready_in(now)
+        self.tokens -= 1
+        return wait
+
+    def pause_until(self, when):
+        """Hold back every token until ``when`` (e.g. a Retry-After)."""
+        if when > self.updated:
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = when
+
+
+class CircuitBreaker:
+    """Closed -> open after ``threshold`` consecutive failures -> half-open after ``cooldown``."""
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def state(self, now):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half_open' if now - self.opened_at >= self.cooldown else 'open'
+
+    def allow(self, now):
+        """Whether a request may be sent; in half-open state only one probe is."""
+        state = self.state(now)
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record(self, success, now):
+        """Count an outcome; ``success=None`` only ends a probe without a verdict."""
+        self.probing = False
+        if success is None:
+            return
+        if success:
+            self.failures = 0
+            self.opened_at = None
+            return
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.threshold:
+            self.opened_at = now
+
+
+class RobotsCache:
+    """
+    Parsed robots.txt per host, fetched once and kept for ROBOTS_TTL seconds.
+
+    Only Crawl-delay (and Request-rate) are used. A robots.txt that cannot
+    be fetched is treated as empty.
+    """
+
+    def __init__(self, fetch, user_agent='*', ttl=ROBOTS_TTL, max_hosts=MAX_ROBOTS_HOSTS):
+        """
+        Args:
+            fetch (callable): ``fetch(robots_url) -> (status_code, text)``
+            user_agent (str): Agent whose rules apply
+            ttl (float): Seconds a parsed robots.txt is reused
+            max_hosts (int): Hosts cached before the oldest are dropped
+        """
+        self.fetch = fetch
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.max_hosts = max_hosts
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def _load(self, key):
+        # urllib.robotparser pulls in urllib.request; only load it once robots.txt is used
+        from urllib.robotparser import RobotFileParser
+
+        parser = RobotFileParser(f"{key}/robots.txt")
+        try:
+            status, text = self.fetch(f"{key}/robots.txt")
+        except Exception as e:
+            logging.error(f"robots.txt fetch failed for {key}: {str(e)}")
+            status, text = None, ''
+        parser.parse(text.splitlines() if status == 200 else [])
+        return parser
+
+    def crawl_delay(self, url):
+        """Minimum seconds between requests to the URL's host, or None."""
+        key = host_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            loading = self._loading.setdefault(key, threading.Lock())
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            # One fetch per host; concurrent callers wait for it
+            with loading:
+                with self._lock:
+                    entry = self._entries.get(key)
+                if entry is None or time.monotonic() - entry[0] > self.ttl:
+                    entry = (time.monotonic(), self._load(key))
+                    with self._lock:
+                        self._entries[key] = entry
+                        self._entries.move_to_end(key)
+                        while len(self._entries) > self.max_hosts:
+                            old, _ = self._entries.popitem(last=False)
+                            self._loading.pop(old, None)
+
+        parser = entry[1]
+        delay = parser.crawl_delay(self.user_agent)
+        rate = parser.request_rate(self.user_agent)
+        if rate and rate.requests:
+            delay = max(delay or 0.0, rate.seconds / rate.requests)
+        return float(delay) if delay else None
+
+
+class _HostState:
+    __slots__ = ('bucket', 'breaker', 'crawl_delay', 'lock')
+
+    def __init__(self, bucket, breaker, crawl_delay):
+        self.bucket = bucket
+        self.breaker = breaker
+        self.crawl_delay = crawl_delay
+        self.lock = threading.Lock()
+
+
+class HostPoliteness:
+    """
+    Rate limits, retries and circuit breaking for requests grouped by host.
+
+    ``request(url, send)`` wraps one HTTP request. Schedulers that fetch many
+    URLs (BatchSummarizer) can ``reserve`` a host's next slot up front and
+    dispatch the URL when it is due, instead of parking a worker thread in
+    ``acquire``; the worker then runs inside ``prepaid(url)``.
+    """
+
+    def __init__(self, rate=DEFAULT_HOST_RATE, burst=DEFAULT_HOST_BURST, robots=None,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF,
+                 max_backoff=DEFAULT_MAX_BACKOFF, max_retry_after=DEFAULT_MAX_RETRY_AFTER,
+                 failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN,
+                 max_hosts=MAX_HOSTS, clock=time.monotonic, sleep=time.sleep, rng=None):
+        """
+        Args:
+            rate (float): Requests per second per host
+            burst (int): Requests a host may receive back to back
+            robots (RobotsCache): Source of per-host Crawl-delay, or None
+            max_retries (int): Retries after a 429/5xx or connection error
+            backoff (float): First retry delay in seconds, doubled per attempt
+            max_backoff (float): Upper bound of a backoff delay
+            max_retry_after (float): Longest Retry-After waited out in place
+            failure_threshold (int): Consecutive failures that open a circuit
+            cooldown (float): Seconds an open circuit fails fast
+            max_hosts (int): Hosts tracked before the least recent are dropped
+            clock (callable): Monotonic time source
+            sleep (callable): Blocking sleep
+            rng (random.Random): Jitter source
+        """
+        self.rate = rate
+        self.burst = burst
+        self.robots = robots
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_hosts = max_hosts
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self._hosts = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _state(self, url, create=True):
+        key = host_key(url)
+        with self._lock:
+            state = self._hosts.get(key)
+            if state is not None:
+                self._hosts.move_to_end(key)
+                return state
+        if not create:
+            return None
+
+        # robots.txt is fetched outside the registry lock
+        crawl_delay = self.robots.crawl_delay(url) if self.robots else None
+        rate, burst = self.rate, self.burst
+        if crawl_delay:
+            rate, burst = min(rate, 1 / crawl_delay), 1
+        state = _HostState(TokenBucket(rate, burst, self.clock()),
+                           CircuitBreaker(self.failure_threshold, self.cooldown), crawl_delay)
+        with self._lock:
+            state = self._hosts.setdefault(key, state)
+            while len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+        return state
+
+    def ready_in(self, url):
+        """Seconds until the URL's host can take another request (0 if unknown)."""
+        state = self._state(url, create=False)
+        if state is None:
+            return 0.0
+        with state.lock:
+            return state.bucket.ready_in(self.clock())
+
+    def reserve(self, url):
+        """
+        Take the host's next request slot.
+
+        Returns:
+            float: Seconds until the slot is due, or None for a host not seen
+                yet (its first request sets it up in ``acquire``)
+        """
+        state = self._state(url, create=False)
+        if state is None:
+            return None
+        with state.lock:
+            return state.bucket.reserve(self.clock())
+
+    @contextmanager
+    def prepaid(self, url):
+        """Let the next ``acquire`` for this URL's host in this thread skip the bucket."""
+        self._local.prepaid = host_key(url)
+        try:
+            yield
+        finally:
+            self._local.prepaid = None
+
+    def acquire(self, url):
+        """
+        Wait for the host's next request slot.
+
+        Raises:
+            CircuitOpenError: The host's circuit is open
+        """
+        state = self._state(url)
+        with state.lock:
+            now = self.clock()
+            if not state.breaker.allow(now):
+                metrics.increment('circuit_rejections', 1, host_of(url))
+                remaining = state.breaker.cooldown - (now - state.breaker.opened_at)
+                raise CircuitOpenError(
+                    f"Host {host_key(url)} is failing; retrying after {max(remaining, 0):.0f}s"
+                )
+            if getattr(self._local, 'prepaid', None) == host_key(url):
+                self._local.prepaid = None
+                return
+            wait = state.bucket.reserve(now)
+        if wait > 0:
+            self.sleep(wait)
+
+    def record(self, url, success, retry_after=None):
+        """
+        Feed a request outcome to the host's circuit breaker.
+
+        Args:
+            url (str): Request URL
+            success (bool): Outcome, or None when the request never got an answer
+                for reasons unrelated to the host
+            retry_after (float): Seconds the host asked to be left alone
+        """
+        state = self._state(url)
+        with state.lock:
+            now = self.clock()
+            was_open = state.breaker.state(now) != 'closed'
+            state.breaker.record(success, now)
+            if retry_after:
+                state.bucket.pause_until(now + retry_after)
+            if not was_open and state.breaker.state(now) != 'closed':
+                logging.error(f"Circuit opened for {host_key(url)} after "
+                              f"{state.breaker.failures} consecutive failures")
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff with jitter for retry ``attempt`` (0-based)."""
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return delay * self.rng.uniform(0.5, 1.0)
+
+    def request(self, url, send, retry_exceptions=()):
+        """
+        Send one request politely.
+
+        Args:
+            url (str): Request URL (selects the host)
+            send (callable): Performs the request and returns a response
+                with ``status_code`` and ``headers``
+            retry_exceptions (tuple): Exception types from ``send`` that count
+                as host failures and are retried
+
+        Returns:
+            The last response (which may still carry a 429/5xx status)
+
+        Raises:
+            CircuitOpenError: The host's circuit is open
+        """
+        host = host_of(url)
+        attempt = 0
+        while True:
+            self.acquire(url)
+            try:
+                response = send()
+            except retry_exceptions:
+                self.record(url, False)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+            except Exception:
+                self.record(url, None)
+                raise
+            else:
+                status = response.status_code
+                if status not in RETRY_STATUSES:
+                    self.record(url, True)
+                    return response
+                if status == 429:
+                    metrics.increment('rate_limited', 1, host)
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.record(url, False, retry_after)
+                if attempt >= self.max_retries or (retry_after or 0) > self.max_retry_after:
+                    return response
+                delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+                response.close()
+
+            metrics.increment('fetch_retries', 1, host)
+            attempt += 1
+            self.sleep(delay)
+
+    def host_stats(self):
+        """Rate, crawl delay and circuit state of every tracked host."""
+        with self._lock:
+            hosts = list(self._hosts.items())
+        now = self.clock()
+        stats = {}
+        for key, state in hosts:
+            with state.lock:
+                stats[key] = {
+                    'rate': state.bucket.rate,
+                    'crawl_delay': state.crawl_delay,
+                    'circuit': state.breaker.state(now),
+                    'consecutive_failures': state.breaker.failures
+                }
+        return stats
@@ -0,0 +1,543 @@
+"""
+Keyword Search Index
+Inverted index (keyword -> postings of document ids and term frequencies)
+fed by every summarization and queried with TF-IDF ranking. Documents and
+queries are tokenized with the resources of their detected language.
+
+Documents are added to an in-memory delta and periodically compacted, on a
+background thread, into an immutable segment file that is memory-mapped, so
+opening an index of a million documents costs a few page faults instead of a
+load. Processes sharing a segment file (pre-fork workers) compact under a
+file lock, each merging its documents into the latest file, and reopen the
+file when another process has replaced it.
+
+Segment file layout (little-endian, arrays 8-byte aligned):
+    header          magic, version, n_docs, n_terms, n_postings
+    term_offsets    uint64[n_terms + 1]   into the sorted term blob
+    post_offsets    uint64[n_terms + 1]   into doc_ids/tfs
+    doc_ids         uint32[n_postings]    per term, highest tf first
+    tfs             uint16[n_postings]
+    url_offsets     uint64[n_docs + 1]    into the url blob
+    title_offsets   uint64[n_docs + 1]    into the title blob
+    term blob, url blob, title blob (UTF-8)
+"""
+
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from cache import normalize_url
+from languages import detect_language, get_language
+
+MAGIC = b'BSIX'
+VERSION = 1
+HEADER = struct.Struct('<4sIQQQ')
+
+# Keywords indexed per document (the most frequent ones)
+DEFAULT_INDEX_TERMS = 32
+
+# Postings read per query term; lists are impact-ordered (highest tf first),
+# so scores are exact whenever every list is shorter than this
+DEFAULT_CANDIDATE_DEPTH = 4096
+
+# Delta size (documents) that triggers a compaction into the segment file
+DEFAULT_COMPACT_EVERY = 10000
+
+# Seconds between checks for a segment file replaced by another process
+REFRESH_INTERVAL = 5
+
+MAX_TF = 0xFFFF
+
+
+def query_terms(query):
+    """Tokenize a search query the same way documents are indexed."""
+    language = get_language(detect_language(query))
+    seen = []
+    for term in language.keyword_pattern.findall(query.lower()):
+        if term not in language.stop_words and term not in seen:
+            seen.append(term)
+    return seen
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class Segment:
+    """Read-only view of a segment file through mmap."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        # Changes when the file at path is replaced (see SearchIndex.refresh)
+        self.identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.n_docs, self.n_terms, self.n_postings = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a search index segment: {path}")
+
+        offset = _align(HEADER.size)
+        self.term_offsets, offset = self._array(offset, np.uint64, self.n_terms + 1)
+        self.post_offsets, offset = self._array(offset, np.uint64, self.n_terms + 1)
+        self.doc_ids, offset = self._array(offset, np.uint32, self.n_postings)
+        self.tfs, offset = self._array(offset, np.uint16, self.n_postings)
+        self.url_offsets, offset = self._array(offset, np.uint64, self.n_docs + 1)
+        self.title_offsets, offset = self._array(offset, np.uint64, self.n_docs + 1)
+        self.term_base = offset
+        self.url_base = self.term_base + int(self.term_offsets[-1])
+        self.title_base = self.url_base + int(self.url_offsets[-1])
+
+    def _array(self, offset, dtype, count):
+        array = np.frombuffer(self._map, dtype=dtype, count=count, offset=offset)
+        return array, _align(offset + array.nbytes)
+
+    def _blob(self, base, offsets, i):
+        return self._map[base + int(offsets[i]):base + int(offsets[i + 1])].decode('utf-8')
+
+    def term(self, i):
+        return self._blob(self.term_base, self.term_offsets, i)
+
+    def url(self, doc_id):
+        return self._blob(self.url_base, self.url_offsets, doc_id)
+
+    def title(self, doc_id):
+        return self._blob(self.title_base, self.title_offsets, doc_id)
+
+    def find(self, term):
+        """Binary search the sorted term blob; returns the term number or -1."""
+        target = term.encode('utf-8')
+        low, high = 0, self.n_terms
+        while low < high:
+            mid = (low + high) // 2
+            start = self.term_base + int(self.term_offsets[mid])
+            candidate = self._map[start:self.term_base + int(self.term_offsets[mid + 1])]
+            if candidate < target:
+                low = mid + 1
+            elif candidate > target:
+                high = mid
+            else:
+                return mid
+        return -1
+
+    def postings(self, term):
+        """(doc_ids, tfs) views for a term, highest tf first."""
+        i = self.find(term)
+        if i < 0:
+            return None
+        start, end = int(self.post_offsets[i]), int(self.post_offsets[i + 1])
+        return self.doc_ids[start:end], self.tfs[start:end]
+
+    def iter_terms(self):
+        for i in range(self.n_terms):
+            start, end = int(self.post_offsets[i]), int(self.post_offsets[i + 1])
+            yield self.term(i), self.doc_ids[start:end], self.tfs[start:end]
+
+    def close(self):
+        # Drop numpy views before closing the map they point into
+        self.term_offsets = self.post_offsets = self.doc_ids = self.tfs = None
+        self.url_offsets = self.title_offsets = None
+        self._map.close()
+        self._file.close()
+
+
+def write_segment(path, docs, postings):
+    """
+    Write a segment file atomically.
+
+    Args:
+        path (str): Destination file
+        docs (list): (url, title) per document id
+        postings (dict): term -> (doc_ids array, tfs array)
+    """
+    terms = sorted(postings)
+    term_bytes = [term.encode('utf-8') for term in terms]
+    url_bytes = [url.encode('utf-8') for url, _ in docs]
+    title_bytes = [(title or '').encode('utf-8') for _, title in docs]
+
+    def offsets(parts):
+        return np.concatenate(([0], np.cumsum([len(p) for p in parts], dtype=np.uint64))).astype(np.uint64)
+
+    ordered_ids, ordered_tfs = [], []
+    for term in terms:
+        doc_ids, tfs = postings[term]
+        # Impact order: highest tf first, then lowest doc id
+        order = np.lexsort((doc_ids, -tfs.astype(np.int32)))
+        ordered_ids.append(doc_ids[order])
+        ordered_tfs.append(tfs[order])
+    sizes = [len(ids) for ids in ordered_ids]
+    post_offsets = np.concatenate(([0], np.cumsum(sizes, dtype=np.uint64))).astype(np.uint64)
+    doc_ids = np.concatenate(ordered_ids).astype(np.uint32) if terms else np.zeros(0, np.uint32)
+    tfs = np.concatenate(ordered_tfs).astype(np.uint16) if terms else np.zeros(0, np.uint16)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(docs), len(terms), len(doc_ids)))
+        for array in (offsets(term_bytes), post_offsets, doc_ids, tfs,
+                      offsets(url_bytes), offsets(title_bytes)):
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+            f.write(array.tobytes())
+        f.write(b'\0' * (_align(f.tell()) - f.tell()))
+        for parts in (term_bytes, url_bytes, title_bytes):
+            f.write(b''.join(parts))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SearchIndex:
+    """
+    Incrementally updated keyword index with TF-IDF top-k search.
+
+    Re-indexing a URL keeps its document id; its old segment postings are
+    masked out until the next compaction rewrites the segment. Compaction
+    builds the new segment from a snapshot, without holding the lock, so
+    searches and adds carry on meanwhile; documents changed during the build
+    stay in the delta.
+
+    Compaction merges the snapshot into the segment file as it is on disk,
+    under an exclusive lock on ``<path>.lock``, so processes sharing the file
+    never drop each other's documents; document ids are renumbered by it.
+    """
+
+    def __init__(self, path=None, index_terms=DEFAULT_INDEX_TERMS,
+                 candidate_depth=DEFAULT_CANDIDATE_DEPTH, compact_every=DEFAULT_COMPACT_EVERY):
+        """
+        Args:
+            path (str): Segment file; None keeps the index in memory only
+            index_terms (int): Most frequent keywords indexed per document
+            candidate_depth (int): Postings read per query term
+            compact_every (int): Delta documents that trigger a compaction
+        """
+        self.path = path
+        self.index_terms = index_terms
+        self.candidate_depth = candidate_depth
+        self.compact_every = compact_every
+        self.segment = Segment(path) if path and os.path.exists(path) else None
+        self._lock = threading.RLock()
+        # Held for a whole compaction, so only one runs at a time
+        self._compact_lock = threading.Lock()
+        # Doc ids changed since the running compaction's snapshot (None when idle)
+        self._dirty = None
+        self._compactor = None
+        self._checked_at = time.monotonic()
+        self._doc_ids = None
+        self._new_docs = []
+        self._updated_docs = {}
+        self._delta = {}
+        self._delta_docs = {}
+        self._stale = np.zeros(self.segment.n_docs if self.segment else 0, dtype=bool)
+
+    def __len__(self):
+        return (self.segment.n_docs if self.segment else 0) + len(self._new_docs)
+
+    def _doc_id_map(self):
+        """url -> doc id, built on the first write (reads never need it)."""
+        if self._doc_ids is None:
+            self._doc_ids = {}
+            if self.segment is not None:
+                for doc_id in range(self.segment.n_docs):
+                    self._doc_ids[self.segment.url(doc_id)] = doc_id
+        return self._doc_ids
+
+    def add(self, url, title, content):
+        """Index a document's most frequent keywords (replacing an earlier version)."""
+        language = get_language(detect_language(content))
+        counts = language.keyword_counts(content).most_common(self.index_terms)
+        self.add_counts(url, title, counts)
+
+    def add_counts(self, url, title, counts):
+        """Index precomputed (keyword, count) pairs for a document."""
+        url = normalize_url(url)
+        with self._lock:
+            self._add(url, title, counts)
+            compact = self.path is not None and len(self._delta_docs) >= self.compact_every
+        if compact:
+            self._start_compaction()
+
+    def _add(self, url, title, counts):
+        """Put a document in the delta (under the lock)."""
+        doc_ids = self._doc_id_map()
+        doc_id = doc_ids.get(url)
+        base_docs = self.segment.n_docs if self.segment else 0
+        if doc_id is None:
+            doc_id = doc_ids[url] = base_docs + len(self._new_docs)
+            self._new_docs.append((url, title))
+        else:
+            if doc_id < base_docs:
+                self._stale[doc_id] = True
+                self._updated_docs[doc_id] = (url, title)
+            else:
+                self._new_docs[doc_id - base_docs] = (url, title)
+            for term in self._delta_docs.get(doc_id, ()):
+                self._delta[term].pop(doc_id, None)
+        terms = []
+        for term, count in counts:
+            self._delta.setdefault(term, {})[doc_id] = min(count, MAX_TF)
+            terms.append(term)
+        self._delta_docs[doc_id] = terms
+        if self._dirty is not None:
+            self._dirty.add(doc_id)
+
+    def _start_compaction(self):
+        """Compact on a background thread, unless a compaction is already running."""
+        with self._lock:
+            if self._dirty is not None:
+                return
+            # Marks a compaction as running until the thread takes its snapshot
+            self._dirty = set()
+        self._compactor = threading.Thread(target=self._compact_in_background,
+                                           name="search-index-compaction", daemon=True)
+        self._compactor.start()
+
+    def wait_for_compaction(self, timeout=None):
+        """Block until the background compaction started by add() (if any) is done."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            logging.error(f"Search index compaction failed: {str(e)}")
+
+    def refresh(self):
+        """
+        Pick up a segment file another process has replaced.
+
+        An index without pending documents just maps the new file; one with
+        pending documents merges them into it with a background compaction.
+        """
+        if self.path is None:
+            return
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        if self.segment is not None and self.segment.identity == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+            return
+        if self._delta_docs:
+            self._start_compaction()
+            return
+        if not self._compact_lock.acquire(blocking=False):
+            return  # The running compaction maps the latest file when it ends
+        try:
+            segment = Segment(self.path)
+            with self._lock:
+                self._dirty = set()
+                self._swap_segment(segment)
+        finally:
+            self._compact_lock.release()
+
+    def _document(self, doc_id):
+        base_docs = self.segment.n_docs if self.segment else 0
+        if doc_id >= base_docs:
+            return self._new_docs[doc_id - base_docs]
+        if doc_id in self._updated_docs:
+            return self._updated_docs[doc_id]
+        return self.segment.url(doc_id), self.segment.title(doc_id)
+
+    def _term_postings(self, term):
+        """Candidate (doc_ids, tfs, df) for a term across segment and delta."""
+        doc_ids = tfs = None
+        df = 0
+        if self.segment is not None:
+            found = self.segment.postings(term)
+            if found is not None:
+                doc_ids, tfs = found
+                df = len(doc_ids)
+                doc_ids, tfs = doc_ids[:self.candidate_depth], tfs[:self.candidate_depth]
+                if self._updated_docs:
+                    live = ~self._stale[doc_ids]
+                    doc_ids, tfs = doc_ids[live], tfs[live]
+        delta = self._delta.get(term)
+        if delta:
+            df += len(delta)
+            extra_ids = np.fromiter(delta.keys(), dtype=np.uint32, count=len(delta))
+            extra_tfs = np.fromiter(delta.values(), dtype=np.uint16, count=len(delta))
+            if doc_ids is None:
+                doc_ids, tfs = extra_ids, extra_tfs
+            else:
+                doc_ids = np.concatenate((doc_ids, extra_ids))
+                tfs = np.concatenate((tfs, extra_tfs))
+        if doc_ids is None:
+            return None
+        return doc_ids, tfs, df
+
+    def search(self, query, k=10):
+        """
+        Rank documents for a query by TF-IDF.
+
+        Each matching term contributes ``(1 + ln tf) * ln(1 + N / df)``.
+
+        Returns:
+            list: Up to ``k`` dicts with url, title and score, best first
+        """
+        terms = query_terms(query)
+        if self.path is not None and time.monotonic() - self._checked_at >= REFRESH_INTERVAL:
+            self._checked_at = time.monotonic()
+            self.refresh()
+        with self._lock:
+            total = len(self)
+            all_ids, all_scores = [], []
+            for term in terms:
+                found = self._term_postings(term)
+                if found is None:
+                    continue
+                doc_ids, tfs, df = found
+                idf = math.log(1 + total / df)
+                all_ids.append(doc_ids)
+                all_scores.append((1 + np.log(tfs.astype(np.float32))) * idf)
+            if not all_ids:
+                return []
+
+            if len(all_ids) == 1:
+                doc_ids, scores = all_ids[0], all_scores[0]
+            else:
+                doc_ids = np.concatenate(all_ids)
+                scores = np.concatenate(all_scores)
+                order = np.argsort(doc_ids)
+                doc_ids, scores = doc_ids[order], scores[order]
+                starts = np.flatnonzero(np.r_[True, doc_ids[1:] != doc_ids[:-1]])
+                doc_ids, scores = doc_ids[starts], np.add.reduceat(scores, starts)
+
+            if len(scores) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(len(scores))
+            # Best score first, ties by lower doc id
+            top = top[np.lexsort((doc_ids[top], -scores[top]))]
+
+            results = []
+            for i in top:
+                url, title = self._document(int(doc_ids[i]))
+                results.append({'url': url, 'title': title, 'score': round(float(scores[i]), 6)})
+            return results
+
+    def compact(self):
+        """
+        Merge the delta into the segment file and memory-map the result.
+
+        Blocks until done; add() runs this on a background thread instead.
+        """
+        if self.path is None:
+            return
+        with self._compact_lock:
+            with self._lock:
+                updates = {}
+                for doc_id in self._delta_docs:
+                    url, title = self._document(doc_id)
+                    updates[url] = (title, self._counts(doc_id))
+                self._dirty = set()
+            try:
+                with self._file_lock():
+                    self._merge_into_file(updates)
+                    segment = Segment(self.path)
+            except Exception:
+                with self._lock:
+                    self._dirty = None
+                raise
+            with self._lock:
+                self._swap_segment(segment)
+
+    def _counts(self, doc_id):
+        """(keyword, count) pairs of a document in the delta."""
+        return [(term, self._delta[term][doc_id]) for term in self._delta_docs[doc_id]]
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on <path>.lock, held while the segment file is rewritten."""
+        import fcntl
+
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _merge_into_file(self, updates):
+        """
+        Rewrite the segment file with ``updates`` ({url: (title, counts)})
+        merged into its current contents, which another process may have
+        written since this index mapped it (runs without the lock).
+        """
+        current = Segment(self.path) if os.path.exists(self.path) else None
+        try:
+            docs = [(current.url(i), current.title(i)) for i in range(current.n_docs)] if current else []
+            doc_ids = {url: doc_id for doc_id, (url, _) in enumerate(docs)}
+            replaced = np.zeros(len(docs), dtype=bool)
+            delta = {}
+            for url, (title, counts) in updates.items():
+                doc_id = doc_ids.get(url)
+                if doc_id is None:
+                    doc_id = doc_ids[url] = len(docs)
+                    docs.append((url, title))
+                else:
+                    docs[doc_id] = (url, title)
+                    replaced[doc_id] = True
+                for term, count in counts:
+                    delta.setdefault(term, {})[doc_id] = count
+
+            postings = {}
+            if current is not None:
+                for term, term_ids, tfs in current.iter_terms():
+                    live = ~replaced[term_ids]
+                    term_ids, tfs = term_ids[live], tfs[live]
+                    if len(term_ids):
+                        postings[term] = (np.array(term_ids), np.array(tfs))
+            for term, term_delta in delta.items():
+                extra_ids = np.fromiter(term_delta.keys(), dtype=np.uint32, count=len(term_delta))
+                extra_tfs = np.fromiter(term_delta.values(), dtype=np.uint16, count=len(term_delta))
+                if term in postings:
+                    term_ids, tfs = postings[term]
+                    postings[term] = (np.concatenate((term_ids, extra_ids)), np.concatenate((tfs, extra_tfs)))
+                else:
+                    postings[term] = (extra_ids, extra_tfs)
+        finally:
+            if current is not None:
+                current.close()
+        write_segment(self.path, docs, postings)
+
+    def _swap_segment(self, segment):
+        """
+        Replace the segment with a freshly written one (under the lock).
+
+        Document ids restart from the new file; documents changed since the
+        compaction's snapshot are indexed again on top of it.
+        """
+        dirty, self._dirty = self._dirty, None
+        carried = []
+        for doc_id in sorted(dirty):
+            url, title = self._document(doc_id)
+            carried.append((url, title, self._counts(doc_id)))
+
+        if self.segment is not None:
+            self.segment.close()
+        self.segment = segment
+        self._doc_ids = None
+        self._new_docs = []
+        self._updated_docs = {}
+        self._delta = {}
+        self._delta_docs = {}
+        self._stale = np.zeros(segment.n_docs, dtype=bool)
+        for url, title, counts in carried:
+            self._add(url, title, counts)
+
+    def close(self):
+        """Compact pending documents (after any running compaction) and unmap the segment."""
+        self.wait_for_compaction()
+        if self._delta_docs:
+            self.compact()
+        with self._lock:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment = None
@@ -0,0 +1,388 @@
+"""
+Summary Storage
+Persists summaries to the ``blog_summaries`` table from supabase-schema.sql,
+on PostgreSQL or on a SQLite stand-in with the same columns. Rows are
+buffered by SummaryWriter and written as batched ``ON CONFLICT (url)`` upserts.
+"""
+
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+
+from cache import normalize_url
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_POOL_SIZE = 8
+
+# Failed flushes a row survives before it is dropped
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Largest value of the DECIMAL(5,2) compression_ratio column
+MAX_COMPRESSION_RATIO = 999.99
+
+# Summaries in the table are generated at the API's default length
+DEFAULT_TARGET_LENGTH = 150
+
+COLUMNS = ('url', 'title', 'summary_english', 'summary_urdu', 'keywords', 'key_points',
+           'word_count', 'summary_length', 'compression_ratio', 'char_count', 'engine', 'language')
+
+# Columns added to the original schema, with their SQLite definitions
+ADDED_COLUMNS = {
+    'char_count': 'INTEGER',
+    'engine': 'TEXT',
+    'language': 'TEXT'
+}
+
+UPDATE_COLUMNS = COLUMNS[1:]
+
+
+def clamp_ratio(ratio):
+    """Fit a compression ratio into the DECIMAL(5,2) column (non-finite becomes 0)."""
+    if not math.isfinite(ratio):
+        return 0.0
+    return round(min(max(ratio, 0.0), MAX_COMPRESSION_RATIO), 2)
+
+
+def summary_row(url, response):
+    """Map an API response to a blog_summaries row."""
+    analysis = response['analysis']
+    return {
+        'url': normalize_url(url),
+        'title': response['title'],
+        'summary_english': response['summary'],
+        'summary_urdu': response.get('summary_urdu', ''),
+        'keywords': list(response['keywords']),
+        'key_points': list(response['key_points']),
+        'word_count': response['content_stats']['word_count'],
+        'summary_length': analysis['summary_length'],
+        'compression_ratio': clamp_ratio(analysis['compression_ratio']),
+        'char_count': response['content_stats'].get('char_count'),
+        'engine': analysis.get('engine'),
+        'language': analysis.get('language')
+    }
+
+
+def response_from_row(row):
+    """Rebuild the API response shape (see batch.format_result) from a stored row."""
+    response = {
+        'success': True,
+        'url': row['url'],
+        'title': row['title'],
+        'content_stats': {
+            'word_count': row['word_count'],
+            'char_count': row.get('char_count')
+        },
+        'summary': row['summary_english'],
+        'keywords': list(row['keywords']),
+        'key_points': list(row['key_points']),
+        'analysis': {
+            'original_length': row['word_count'],
+            'summary_length': row['summary_length'],
+            'compression_ratio': float(row['compression_ratio']),
+            'engine': row.get('engine'),
+            'language': row.get('language')
+        }
+    }
+    if row.get('summary_urdu'):
+        response['summary_urdu'] = row['summary_urdu']
+    return response
+
+
+class SQLiteSummaryStore:
+    """blog_summaries on SQLite (arrays stored as JSON text); one connection per thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blog_summaries ("
+                "url TEXT NOT NULL UNIQUE, title TEXT NOT NULL, "
+                "summary_english TEXT NOT NULL, summary_urdu TEXT NOT NULL DEFAULT '', "
+                "keywords TEXT NOT NULL DEFAULT '[]', key_points TEXT NOT NULL DEFAULT '[]', "
+                "word_count INTEGER DEFAULT 0, summary_length INTEGER DEFAULT 0, "
+                "compression_ratio REAL DEFAULT 0, "
+                "char_count INTEGER, engine TEXT, language TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            # Tables created before the added columns existed
+            existing = {info[1] for info in conn.execute("PRAGMA table_info(blog_summaries)")}
+            for name, definition in ADDED_COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE blog_summaries ADD COLUMN {name} {definition}")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_blog_summaries_created_at "
+                "ON blog_summaries (created_at DESC)"
+            )
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def upsert_many(self, rows):
+        """Insert or update rows in one transaction."""
+        now = time.time()
+        assignments = ', '.join(f"{name} = excluded.{name}" for name in UPDATE_COLUMNS)
+        placeholders = ', '.join('?' for _ in range(len(COLUMNS) + 2))
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO blog_summaries ({', '.join(COLUMNS)}, created_at, updated_at) "
+                f"VALUES ({placeholders}) "
+                f"ON CONFLICT (url) DO UPDATE SET {assignments}, updated_at = excluded.updated_at",
+                [(row['url'], row['title'], row['summary_english'], row['summary_urdu'],
+                  json.dumps(row['keywords']), json.dumps(row['key_points']),
+                  row['word_count'], row['summary_length'], row['compression_ratio'],
+                  row['char_count'], row['engine'], row['language'], now, now)
+                 for row in rows]
+            )
+
+    def fetch(self, urls):
+        """Return {url: row} for the stored rows among ``urls``."""
+        urls = list(urls)
+        if not urls:
+            return {}
+        rows = self._connect().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM blog_summaries "
+            f"WHERE url IN ({', '.join('?' for _ in urls)})", urls
+        ).fetchall()
+        found = {}
+        for values in rows:
+            row = dict(zip(COLUMNS, values))
+            row['keywords'] = json.loads(row['keywords'])
+            row['key_points'] = json.loads(row['key_points'])
+            found[row['url']] = row
+        return found
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class PostgresSummaryStore:
+    """
+    blog_summaries on PostgreSQL/Supabase through a psycopg2 connection pool.
+
+    The table is expected to exist with the added columns (see
+    supabase-schema.sql). Requires psycopg2.
+    """
+
+    def __init__(self, dsn, min_connections=1, max_connections=DEFAULT_POOL_SIZE):
+        self.dsn = dsn
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self.pool = None
+        self._pool()
+
+    def _pool(self):
+        """Return the connection pool, (re)opening it after close()."""
+        from psycopg2.pool import ThreadedConnectionPool
+
+        with self._lock:
+            if self.pool is None:
+                self.pool = ThreadedConnectionPool(self.min_connections, self.max_connections, self.dsn)
+            return self.pool
+
+    def _run(self, work):
+        pool = self._pool()
+        conn = pool.getconn()
+        try:
+            with conn:
+                with conn.cursor() as cursor:
+                    return work(cursor)
+        finally:
+            pool.putconn(conn)
+
+    def upsert_many(self, rows):
+        """Insert or update rows with a single multi-row statement."""
+        from psycopg2.extras import execute_values
+
+        assignments = ', '.join(f"{name} = EXCLUDED.{name}" for name in UPDATE_COLUMNS)
+        statement = (
+            f"INSERT INTO blog_summaries ({', '.join(COLUMNS)}) VALUES %s "
+            f"ON CONFLICT (url) DO UPDATE SET {assignments}"
+        )
+        values = [tuple(row[name] for name in COLUMNS) for row in rows]
+        self._run(lambda cursor: execute_values(cursor, statement, values, page_size=len(values)))
+
+    def fetch(self, urls):
+        """Return {url: row} for the stored rows among ``urls``."""
+        urls = list(urls)
+        if not urls:
+            return {}
+
+        def select(cursor):
+            cursor.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM blog_summaries WHERE url = ANY(%s)", (urls,)
+            )
+            return cursor.fetchall()
+
+        return {values[0]: dict(zip(COLUMNS, values)) for values in self._run(select)}
+
+    def close(self):
+        with self._lock:
+            if self.pool is not None:
+                self.pool.closeall()
+                self.pool = None
+
+
+def create_summary_store(url, pool_size=DEFAULT_POOL_SIZE):
+    """
+    Build a store from a connection URL.
+
+    ``postgres://`` / ``postgresql://`` URLs use PostgresSummaryStore with up
+    to ``pool_size`` connections; ``sqlite:///path`` or a bare file path uses
+    SQLiteSummaryStore.
+    """
+    if url.startswith(('postgres://', 'postgresql://')):
+        return PostgresSummaryStore(url, max_connections=pool_size)
+    if url.startswith('sqlite:///'):
+        url = url[len('sqlite:///'):]
+    return SQLiteSummaryStore(url)
+
+
+class SummaryWriter:
+    """
+    Buffers summaries and flushes them to a store in batches.
+
+    A batch is written once ``batch_size`` rows are pending or every
+    ``flush_interval`` seconds, whichever comes first. Rows for the same URL
+    are coalesced, and lookups see pending rows before they are flushed. A
+    row still unwritten after ``max_attempts`` failed flushes is dropped.
+    """
+
+    def __init__(self, store, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 target_length=DEFAULT_TARGET_LENGTH, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        Args:
+            store: SQLiteSummaryStore or PostgresSummaryStore
+            batch_size (int): Pending rows that trigger an immediate flush
+            flush_interval (float): Maximum seconds a row waits before being written
+            target_length (int): Summary length the stored rows were generated for
+            max_attempts (int): Failed flushes after which a row is dropped
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.target_length = target_length
+        self.max_attempts = max_attempts
+        self._pending = {}
+        # Failed flushes of each pending row, by URL
+        self._attempts = {}
+        self._closed = False
+        self._start()
+
+    def _start(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="summary-writer", daemon=True)
+        self._thread.start()
+
+    def after_fork(self):
+        """
+        Restart the flush thread in a forked child process.
+
+        Threads do not survive fork(), and the parent's thread may have held
+        a lock at that moment, so the locks are replaced too. Rows pending in
+        the parent are left for the parent to write.
+        """
+        self._pending = {}
+        self._attempts = {}
+        self._start()
+
+    def add(self, url, response, target_length=DEFAULT_TARGET_LENGTH):
+        """Queue a summary response for the next batch (other lengths are not stored)."""
+        if target_length != self.target_length:
+            return
+        row = summary_row(url, response)
+        with self._lock:
+            self._pending[row['url']] = row
+            # A new version of the row gets a fresh set of attempts
+            self._attempts.pop(row['url'], None)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def lookup(self, url, target_length=DEFAULT_TARGET_LENGTH):
+        """
+        Return the stored response for a URL, or None.
+
+        Only summaries of the writer's target length are stored, so other
+        lengths always miss.
+        """
+        if target_length != self.target_length:
+            return None
+        key = normalize_url(url)
+        with self._lock:
+            row = self._pending.get(key)
+        if row is None:
+            try:
+                row = self.store.fetch([key]).get(key)
+            except Exception as e:
+                logging.error(f"Summary lookup failed: {str(e)}")
+                return None
+        return response_from_row(row) if row else None
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """
+        Write all pending rows now.
+
+        Rows are kept for retry if the write fails, until they have failed
+        max_attempts times; then they are dropped and logged.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, {}
+            if not rows:
+                return 0
+            try:
+                self.store.upsert_many(list(rows.values()))
+            except Exception as e:
+                logging.error(f"Summary flush of {len(rows)} rows failed: {str(e)}")
+                with self._lock:
+                    attempts = self._attempts
+                    for url in list(rows):
+                        if url in self._pending:
+                            # Superseded by a newer row queued during the failed write
+                            continue
+                        attempts[url] = attempts.get(url, 0) + 1
+                        if attempts[url] >= self.max_attempts:
+                            del rows[url], attempts[url]
+                            logging.error(f"Dropping summary for {url} after {self.max_attempts} failed writes")
+                    # Newer rows queued during the failed write take precedence
+                    rows.update(self._pending)
+                    self._pending = rows
+                return 0
+            with self._lock:
+                for url in rows:
+                    self._attempts.pop(url, None)
+            return len(rows)
+
+    def close(self):
+        """Flush the remaining rows and stop the background thread."""
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
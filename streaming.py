@@ -0,0 +1,146 @@
+"""
+Streaming Downloads
+Content-Type checks, binary sniffing and budgeted body iteration for
+BlogScraper's streaming fetch mode.
+"""
+
+import codecs
+import time
+
+HTML_CONTENT_TYPES = frozenset(['text/html', 'application/xhtml+xml', 'text/plain'])
+
+# Leading bytes of common non-HTML payloads served without a Content-Type
+BINARY_SIGNATURES = (
+    b'%PDF', b'\x89PNG', b'GIF8', b'\xff\xd8\xff', b'PK\x03\x04', b'\x1f\x8b',
+    b'ID3', b'OggS', b'fLaC', b'RIFF', b'\x00\x00\x00'
+)
+
+# Byte order marks of the UTF-16/32 encodings, whose text is full of NUL bytes
+UNICODE_BOMS = (codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+# '<' as the first character of UTF-16 text without a BOM
+UTF16_MARKUP_STARTS = (b'<\x00', b'\x00<')
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_DEADLINE = 20
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# A read that fails this close to the deadline was cut short by it
+DEADLINE_SLACK = 0.05
+
+
+def parse_content_type(header):
+    """Split a Content-Type header into (mime type, charset)."""
+    if not header:
+        return None, None
+    parts = [part.strip() for part in header.split(';')]
+    charset = None
+    for part in parts[1:]:
+        name, _, value = part.partition('=')
+        if name.strip().lower() == 'charset' and value:
+            charset = value.strip().strip('"\'') or None
+    return parts[0].lower() or None, charset
+
+
+def is_html_content_type(mime_type):
+    """True for HTML-like types, or when the server did not send one."""
+    return mime_type is None or mime_type in HTML_CONTENT_TYPES
+
+
+def is_wide_encoding(charset):
+    """True for the UTF-16/32 charsets, whose text legitimately contains NUL bytes."""
+    return bool(charset) and charset.lower().replace('_', '-').startswith(('utf-16', 'utf-32', 'utf16', 'utf32'))
+
+
+def looks_binary(prefix, charset=None):
+    """
+    Sniff the first bytes of a body for non-HTML payloads.
+
+    NUL bytes mark binary data unless the body is UTF-16/32 text: it starts
+    with a byte order mark or with '<' in UTF-16, or the response declares
+    such a charset.
+    """
+    if prefix.startswith(UNICODE_BOMS) or prefix.startswith(UTF16_MARKUP_STARTS) or is_wide_encoding(charset):
+        return False
+    head = prefix.lstrip()
+    return head.startswith(BINARY_SIGNATURES) or b'\x00' in prefix[:1024]
+
+
+def iter_body(response, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield decoded body chunks as soon as they arrive.
+
+    Uses urllib3's read1() when available so a slow-drip server cannot hold a
+    read open until a whole chunk has accumulated; otherwise falls back to
+    requests' iter_content().
+    """
+    read1 = getattr(response.raw, 'read1', None)
+    if read1 is None:
+        yield from response.iter_content(chunk_size)
+        return
+    while True:
+        chunk = read1(chunk_size, decode_content=True)
+        if not chunk:
+            break
+        yield chunk
+
+
+def set_read_timeout(response, seconds):
+    """
+    Set the socket timeout for the next reads of a streaming requests response.
+
+    Returns:
+        bool: False when the connection's socket is not reachable (the
+            request's own read timeout then still applies)
+    """
+    sock = getattr(getattr(response.raw, 'connection', None), 'sock', None)
+    if sock is None:
+        return False
+    sock.settimeout(max(seconds, 0.001))
+    return True
+
+
+def read_budgeted(chunks, feed, max_bytes=DEFAULT_MAX_BYTES, deadline=DEFAULT_DEADLINE,
+                  read_timeout=None, started=None):
+    """
+    Feed chunks until the body ends, the byte budget is spent or time runs out.
+
+    Args:
+        chunks (iterable): Body chunks (bytes)
+        feed (callable): Receives each accepted chunk
+        max_bytes (int): Maximum body bytes to accept, or None for no limit
+        deadline (float): Seconds allowed for the whole transfer, or None
+        read_timeout (callable): Called with the seconds left before the
+            deadline ahead of every read, to cap how long a stalled read
+            can block (see set_read_timeout)
+        started (float): time.monotonic() at which the transfer started
+            (defaults to now)
+
+    Returns:
+        dict: 'bytes' read, whether the body was 'truncated', and the
+            'abort_reason' ('max_bytes' or 'deadline') when it was
+    """
+    started = time.monotonic() if started is None else started
+    received = 0
+    chunks = iter(chunks)
+    while True:
+        if deadline is not None and read_timeout is not None:
+            read_timeout(deadline - (time.monotonic() - started))
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            break
+        except Exception:
+            # A read the capped timeout interrupted at the deadline
+            if deadline is not None and time.monotonic() - started + DEADLINE_SLACK >= deadline:
+                return {'bytes': received, 'truncated': True, 'abort_reason': 'deadline'}
+            raise
+        if max_bytes is not None and received + len(chunk) > max_bytes:
+            feed(chunk[:max_bytes - received])
+            received = max_bytes
+            return {'bytes': received, 'truncated': True, 'abort_reason': 'max_bytes'}
+        feed(chunk)
+        received += len(chunk)
+        if deadline is not None and time.monotonic() - started > deadline:
+            return {'bytes': received, 'truncated': True, 'abort_reason': 'deadline'}
+    return {'bytes': received, 'truncated': False, 'abort_reason': None}
@@ -0,0 +1,211 @@
+"""
+Summary Engines
+Pluggable strategies that compose the summary text for AISummarizer: the
+original keyword template, and an extractive TextRank engine.
+"""
+
+from languages import DEFAULT_LANGUAGE, get_language
+
+# TextRank parameters
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+
+
+class SummaryEngine:
+    """Interface: turn the analysed document into summary text."""
+
+    name = None
+
+    # Whether compose() ranks the sentences themselves (the long-document
+    # path then has to keep candidate sentences, see longdoc)
+    extractive = False
+
+    def compose(self, title, sentences, keywords, key_points, target_length, language=None):
+        """
+        Args:
+            title (str): Article title
+            sentences (list): Sentences of the article, in order
+            keywords (list): Top keywords, most frequent first
+            key_points (list): Key sentences, best first
+            target_length (int): Target summary length in words
+            language (Language): Language of the article (defaults to English)
+
+        Returns:
+            str: The summary
+        """
+        raise NotImplementedError
+
+
+class TemplateEngine(SummaryEngine):
+    """Title, top keywords and the best key point pasted into a sentence."""
+
+    name = 'template'
+
+    def compose(self, title, sentences, keywords, key_points, target_length, language=None):
+        phrases = (language or get_language(DEFAULT_LANGUAGE)).phrases
+        summary_parts = []
+
+        # Start with title context if available
+        if title and title != "No title found":
+            summary_parts.append(phrases['titled'].format(title=title))
+        else:
+            summary_parts.append(phrases['untitled'])
+
+        # Add main topics based on keywords
+        if keywords:
+            main_topics = phrases['topic_separator'].join(keywords[:3])
+            summary_parts.append(phrases['topics'].format(topics=main_topics))
+
+        # Add key insights
+        if key_points:
+            # Select the most relevant key point
+            best_point = key_points[0]
+            if len(best_point.split()) > 15:
+                best_point = " ".join(best_point.split()[:15]) + "..."
+            summary_parts.append(phrases['insight'].format(point=best_point))
+
+        # Combine and ensure target length
+        summary = "".join(summary_parts)
+
+        # Trim if too long
+        words = summary.split()
+        if len(words) > target_length:
+            summary = " ".join(words[:target_length]) + "..."
+
+        return summary
+
+
+def sentence_vectors(sentences, language=None):
+    """
+    L2-normalized TF-IDF vectors of the sentences as a CSR-style triple,
+    over the keyword terms of ``language`` (English by default).
+
+    Returns:
+        tuple: (row of each entry, column of each entry, weights, per-row
+            flag for sentences with at least one term)
+    """
+    import numpy as np
+
+    terms = (language or get_language(DEFAULT_LANGUAGE)).terms
+    vocabulary = {}
+    rows, cols = [], []
+    for row, sentence in enumerate(sentences):
+        for word in terms(sentence):
+            rows.append(row)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    n = len(sentences)
+    if not rows:
+        return (np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0), np.zeros(n, bool))
+
+    # Term frequency per (sentence, term) pair
+    pairs, tf = np.unique(np.array(rows, np.int64) * len(vocabulary) + np.array(cols, np.int64),
+                          return_counts=True)
+    rows, cols = pairs // len(vocabulary), pairs % len(vocabulary)
+
+    df = np.bincount(cols, minlength=len(vocabulary))
+    weights = (1 + np.log(tf)) * (np.log(n / df[cols]) + 1)
+    norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+    weights = weights / norms[rows]
+    return rows, cols, weights, norms > 0
+
+
+def textrank_scores(sentences, damping=DAMPING, max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE,
+                    language=None):
+    """
+    TextRank centrality of each sentence over cosine similarity of TF-IDF vectors.
+
+    The similarity matrix S = X Xᵀ (minus its diagonal) is never built:
+    every power-iteration step applies it as two sparse products, X (Xᵀ u),
+    so a step costs O(non-zero terms) rather than O(sentences²). Iteration
+    stops once the L1 change falls below ``tolerance``.
+
+    Returns:
+        numpy.ndarray: One score per sentence (sums to 1)
+    """
+    import numpy as np
+
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+    rows, cols, weights, nonempty = sentence_vectors(sentences, language)
+    terms = int(cols.max()) + 1 if len(cols) else 0
+    self_similarity = nonempty.astype(float)
+
+    def similarity_times(vector):
+        per_term = np.bincount(cols, weights=weights * vector[rows], minlength=terms)
+        return np.bincount(rows, weights=weights * per_term[cols], minlength=n) - self_similarity * vector
+
+    degree = similarity_times(np.ones(n))
+    linked = degree > 1e-12
+    inverse_degree = np.zeros(n)
+    inverse_degree[linked] = 1 / degree[linked]
+
+    scores = np.full(n, 1 / n)
+    for _ in range(max_iterations):
+        # Sentences without links spread their score evenly
+        dangling = scores[~linked].sum()
+        updated = (1 - damping) / n + damping * (similarity_times(scores * inverse_degree) + dangling / n)
+        change = np.abs(updated - scores).sum()
+        scores = updated
+        if change < tolerance:
+            break
+    return scores
+
+
+class TextRankEngine(SummaryEngine):
+    """Extractive summary: the most central sentences, in document order."""
+
+    name = 'textrank'
+    extractive = True
+
+    def select(self, sentences, target_length, language=None):
+        """
+        Pick the most central sentences that fit in ``target_length`` words.
+
+        Returns:
+            list: Indices of the chosen sentences, in document order
+        """
+        scores = textrank_scores(sentences, language=language)
+
+        # Best sentences first; skip any that would overshoot and keep filling
+        chosen = []
+        total = 0
+        for i in (-scores).argsort(kind='stable'):
+            length = len(sentences[i].split())
+            if total + length <= target_length:
+                chosen.append(int(i))
+                total += length
+                if total == target_length:
+                    break
+        return sorted(chosen)
+
+    def compose(self, title, sentences, keywords, key_points, target_length, language=None):
+        if not sentences:
+            return TemplateEngine().compose(title, sentences, keywords, key_points, target_length, language)
+
+        chosen = self.select(sentences, target_length, language)
+        if not chosen:
+            best = sentences[int(textrank_scores(sentences, language=language).argmax())].split()
+            return " ".join(best[:target_length]) + "..."
+        end = (language or get_language(DEFAULT_LANGUAGE)).sentence_end
+        return " ".join(sentences[i] + end for i in chosen)
+
+
+ENGINES = {engine.name: engine for engine in (TemplateEngine, TextRankEngine)}
+
+DEFAULT_SUMMARY_ENGINE = 'template'
+
+
+def get_engine(name):
+    """
+    Instantiate a summary engine by name.
+
+    Raises:
+        ValueError: For an unknown engine
+    """
+    try:
+        return ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown summary engine: {name} (choose from {', '.join(sorted(ENGINES))})")
@@ -10,10 +10,18 @@ CREATE TABLE blog_summaries (
     word_count INTEGER DEFAULT 0,
     summary_length INTEGER DEFAULT 0,
     compression_ratio DECIMAL(5,2) DEFAULT 0.00,
+    char_count INTEGER,
+    engine TEXT,
+    language TEXT,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Upgrade a table created before char_count, engine and language were added
+ALTER TABLE blog_summaries ADD COLUMN IF NOT EXISTS char_count INTEGER;
+ALTER TABLE blog_summaries ADD COLUMN IF NOT EXISTS engine TEXT;
+ALTER TABLE blog_summaries ADD COLUMN IF NOT EXISTS language TEXT;
+
 -- Add indexes for better performance
 CREATE INDEX idx_blog_summaries_url ON blog_summaries(url);
 CREATE INDEX idx_blog_summaries_created_at ON blog_summaries(created_at DESC);
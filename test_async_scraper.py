@@ -0,0 +1,62 @@
+"""
+Tests for the asyncio scraping backend against a local HTTP server
+"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app import BlogScraper, create_scraper
+from async_scraper import AsyncBlogScraper
+
+PAGE = b"""<html><head><title>Local Post</title></head><body>
+<nav>Menu</nav><article><p>Async scraping keeps many fetches in flight.</p>
+<p>Connection pooling reuses sockets per host.</p></article></body></html>"""
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/missing':
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_async_matches_sync_result():
+    server, base = serve()
+    scraper = create_scraper('async')
+    try:
+        assert isinstance(scraper, AsyncBlogScraper)
+        expected = BlogScraper().scrape_blog_content(base + '/post')
+        assert scraper.scrape_blog_content(base + '/post') == expected
+        assert expected['title'] == 'Local Post'
+    finally:
+        scraper.close()
+        server.shutdown()
+
+
+def test_async_scrape_many_and_errors():
+    server, base = serve()
+    scraper = AsyncBlogScraper(BlogScraper(), max_concurrency=4)
+    try:
+        urls = [f"{base}/post/{i}" for i in range(10)] + [base + '/missing', 'not-a-url']
+        results = asyncio.run(scraper.scrape_many(urls))
+    finally:
+        server.shutdown()
+
+    assert all(r['success'] for r in results[:10])
+    assert results[10]['error'].startswith('Failed to fetch URL')
+    assert results[11]['error'] == 'Scraping failed: Invalid URL format'
@@ -0,0 +1,89 @@
+"""
+Tests for concurrent batch summarization
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from app import AISummarizer, app
+from batch import BatchSummarizer, read_url_list
+
+CONTENT = (
+    "Machine learning is a subset of artificial intelligence that enables computers "
+    "to learn from data. Supervised learning uses labeled data to train models. "
+    "Applications of machine learning are everywhere, from recommendation systems "
+    "to autonomous vehicles."
+)
+
+
+class FakeScraper:
+    """Offline scraper that records per-host concurrency."""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.active = defaultdict(int)
+        self.peak = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def scrape_blog_content(self, url):
+        host = url.split('/')[2]
+        with self.lock:
+            self.active[host] += 1
+            self.peak[host] = max(self.peak[host], self.active[host])
+        time.sleep(self.delays.get(host, 0.01))
+        with self.lock:
+            self.active[host] -= 1
+        if 'fail' in url:
+            return {'success': False, 'error': 'Failed to fetch URL: boom'}
+        return {
+            'success': True, 'url': url, 'title': 'Post', 'content': CONTENT,
+            'word_count': len(CONTENT.split()), 'char_count': len(CONTENT)
+        }
+
+
+def test_batch_respects_per_host_limit():
+    scraper = FakeScraper()
+    urls = [f"https://a.example/{i}" for i in range(12)] + [f"https://b.example/{i}" for i in range(6)]
+    batch = BatchSummarizer(scraper, AISummarizer(), max_workers=8, per_host_limit=2,
+                            use_processes=False)
+
+    results = list(batch.iter_results(urls))
+
+    assert sorted(r['index'] for r in results) == list(range(len(urls)))
+    assert all(r['success'] for r in results)
+    assert scraper.peak['a.example'] <= 2
+    assert scraper.peak['b.example'] <= 2
+
+
+def test_batch_streams_in_completion_order():
+    scraper = FakeScraper(delays={'slow.example': 0.5})
+    urls = ["https://slow.example/post", "https://fast.example/post", "https://fail.example/post"]
+    batch = BatchSummarizer(scraper, AISummarizer(), use_processes=False)
+
+    results = list(batch.iter_results(urls))
+
+    assert results[-1]['url'] == "https://slow.example/post"
+    failed = [r for r in results if not r['success']]
+    assert len(failed) == 1 and failed[0]['index'] == 2
+
+
+def test_batch_process_pool():
+    batch = BatchSummarizer(FakeScraper(), AISummarizer(), summary_processes=1)
+    try:
+        results = list(batch.iter_results(["https://a.example/1", "https://a.example/2"]))
+    finally:
+        batch.shutdown()
+
+    assert all(r['success'] and r['keywords'] for r in results)
+
+
+def test_batch_endpoint_validates_input():
+    client = app.test_client()
+    response = client.post('/api/summarize/batch', json={'urls': []})
+    assert response.get_json()['success'] is False
+
+
+def test_read_url_list():
+    lines = ["https://a.example/1\n", "\n", "# comment\n", "  https://b.example/2  \n"]
+    assert read_url_list(lines) == ["https://a.example/1", "https://b.example/2"]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline benchmark fixture server and pipeline helpers
+"""
+
+import gzip
+
+import pytest
+import requests
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.languages import generate_batch
+from benchmarks.import_time import LAZY_MODULES, heavy_imports, parse_importtime, slowest
+from benchmarks.memory import measure_document, retained_sizes
+from benchmarks.pipeline import compare, percentile, run_load
+from languages import detect_language
+
+
+@pytest.fixture(scope="module")
+def fixtures():
+    with FixtureServer(sizes=['small', 'medium']) as server:
+        yield server
+
+
+def test_fixture_pages_are_sized(fixtures):
+    small = requests.get(fixtures.url('/page/small'))
+    medium = requests.get(fixtures.url('/page/medium/7'))
+    assert small.status_code == 200 and medium.status_code == 200
+    assert '<article' in small.text
+    assert len(medium.content) > 10 * len(small.content)
+
+
+def test_fixture_gzip_and_redirects(fixtures):
+    raw = requests.get(fixtures.url('/gzip/small'), stream=True)
+    assert raw.headers['Content-Encoding'] == 'gzip'
+    body = raw.raw.read(decode_content=False)
+    assert gzip.decompress(body) == requests.get(fixtures.url('/page/small')).content
+
+    redirected = requests.get(fixtures.url('/redirect/3'))
+    assert len(redirected.history) == 3
+    assert redirected.url.endswith('/page/small')
+
+
+def test_fixture_slow_drip_and_missing(fixtures):
+    assert requests.get(fixtures.url('/slow/small')).content == requests.get(fixtures.url('/page/small')).content
+    assert requests.get(fixtures.url('/page/unknown')).status_code == 404
+
+
+def test_run_load_reports_percentiles():
+    stats = run_load(lambda item: item != 3, list(range(10)), concurrency=4)
+    assert stats['requests'] == 10
+    assert stats['errors'] == 1
+    assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    assert percentile([1, 2, 3, 4], 0.99) == 4
+
+
+def test_compare_flags_regressions():
+    baseline = {'a': {'throughput_rps': 100.0, 'p95_ms': 10.0}}
+    assert compare({'a': {'throughput_rps': 95.0, 'p95_ms': 11.0}}, baseline) == []
+    regressions = compare({'a': {'throughput_rps': 50.0, 'p95_ms': 20.0}, 'b': {}}, baseline)
+    assert [metric for _, metric, _, _, _ in regressions] == ['throughput_rps', 'p95_ms']
+
+
+def test_parse_importtime_tracks_depth():
+    output = """import time: self [us] | cumulative | imported package
+import time:        80 |         80 |   certifi
+import time:       200 |        280 | site
+import time:        40 |         40 |     _abc
+import time:       300 |        900 |   normalize
+import time:       100 |       1500 | cli_summarizer
+"""
+    rows = parse_importtime(output)
+    assert rows[-1] == ('cli_summarizer', 100, 1500, 0)
+    assert slowest(rows, 'cli_summarizer') == [('normalize', 900)]
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_core_library_imports_heavy_dependencies_lazily(module):
+    assert heavy_imports(module) == []
+
+
+def test_memory_benchmark_measures_one_document():
+    row = measure_document('lxml', 'small')
+    assert row['success'] and row['text_kb'] > 0 and row['python_mb'] > 0
+
+    sizes = retained_sizes('small')
+    assert sizes['sentence_spans'] < sizes['sentence_list']
+
+
+def test_language_benchmark_mixes_languages():
+    batch = generate_batch(8, 1, 0.5)
+    assert sorted(map(detect_language, batch)) == ['en'] * 4 + ['ur'] * 4
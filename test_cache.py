@@ -0,0 +1,106 @@
+"""
+Tests for the summary cache tiers and revalidation flow
+"""
+
+import time
+
+from app import AISummarizer
+from cache import (LRUCache, SQLiteCache, TieredCache, SummaryCache,
+                   normalize_url, cache_key)
+
+CONTENT = ("Caching avoids downloading and parsing the same article twice. "
+           "Conditional requests let unchanged pages cost a single round trip.")
+
+
+class FakeScraper:
+    """Scripted scraper returning 200, 304 or changed content on demand."""
+
+    def __init__(self):
+        self.content = CONTENT
+        self.not_modified = False
+        self.calls = []
+
+    def scrape(self, url, validators=None):
+        self.calls.append(validators)
+        if self.not_modified and validators and validators.get('etag') == '"v1"':
+            return {'success': True, 'url': url, 'not_modified': True, 'etag': '"v1"',
+                    'last_modified': None}
+        return {'success': True, 'url': url, 'title': 'Post', 'content': self.content,
+                'word_count': len(self.content.split()), 'char_count': len(self.content),
+                'etag': '"v1"', 'last_modified': None}
+
+
+class CountingSummarizer(AISummarizer):
+    calls = 0
+
+    def generate_summary(self, title, content, target_length=150):
+        CountingSummarizer.calls += 1
+        return super().generate_summary(title, content, target_length)
+
+
+def test_lru_size_and_ttl_bounds():
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+
+    expiring = LRUCache(ttl=-1)
+    expiring.set('a', 1)
+    assert expiring.get('a') is None
+
+
+def test_sqlite_tier_is_shared(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    SQLiteCache(path).set('k', {'summary': 'x'})
+    tiered = TieredCache(LRUCache(), SQLiteCache(path))
+    assert tiered.get('k') == {'summary': 'x'}
+    assert tiered.memory.get('k') == {'summary': 'x'}
+
+
+def test_cache_key_normalizes_url():
+    assert normalize_url('HTTPS://Example.com:443/post?b=2&a=1#top') == 'https://example.com/post?a=1&b=2'
+    assert cache_key('https://example.com/post', 150) != cache_key('https://example.com/post', 100)
+
+
+def test_revalidation_skips_parse_and_summarize():
+    scraper = FakeScraper()
+    summarizer = CountingSummarizer()
+    CountingSummarizer.calls = 0
+    cache = SummaryCache(revalidate_after=0)
+    url = 'https://example.com/post'
+
+    first = cache.get_or_compute(url, 150, scraper.scrape, summarizer.generate_summary)
+    assert first['cache_status'] == 'miss' and scraper.calls[-1] is None
+
+    scraper.not_modified = True
+    second = cache.get_or_compute(url, 150, scraper.scrape, summarizer.generate_summary)
+    assert second['cache_status'] == 'revalidated'
+    assert scraper.calls[-1]['etag'] == '"v1"'
+
+    scraper.not_modified = False
+    third = cache.get_or_compute(url, 150, scraper.scrape, summarizer.generate_summary)
+    assert third['cache_status'] == 'unchanged'
+    assert third['summary'] == first['summary']
+
+    scraper.content = CONTENT + " A new paragraph was added to the article today."
+    fourth = cache.get_or_compute(url, 150, scraper.scrape, summarizer.generate_summary)
+    assert fourth['cache_status'] == 'miss'
+    assert CountingSummarizer.calls == 2
+
+    stats = cache.stats()
+    assert stats['miss'] == 2 and stats['revalidated'] == 1 and stats['unchanged'] == 1
+
+
+def test_fresh_entries_are_served_without_fetching():
+    scraper = FakeScraper()
+    cache = SummaryCache(revalidate_after=60)
+    url = 'https://example.com/post'
+    cache.get_or_compute(url, 150, scraper.scrape, AISummarizer().generate_summary)
+
+    start = time.perf_counter()
+    result = cache.get_or_compute(url, 150, scraper.scrape, AISummarizer().generate_summary)
+    assert result['cache_status'] == 'hit'
+    assert len(scraper.calls) == 1
+    assert time.perf_counter() - start < 0.05
@@ -0,0 +1,94 @@
+"""
+Tests for compressed page fetches, compressed API responses and NDJSON encoding
+"""
+
+import json
+import zlib
+
+import pytest
+
+import app as app_module
+import batch
+from app import BlogScraper, app
+from benchmarks.fixture_server import FixtureServer
+from compression import RESPONSE_ENCODINGS, compress_stream, decode_body, decode_chunks
+from metrics import registry as metrics
+
+
+@pytest.fixture(scope="module")
+def fixtures():
+    with FixtureServer(sizes=['small', 'medium']) as server:
+        yield server
+
+
+@pytest.mark.parametrize("encoding", RESPONSE_ENCODINGS)
+@pytest.mark.parametrize("streaming", [False, True])
+def test_scraper_decodes_negotiated_encodings(fixtures, encoding, streaming):
+    scraper = BlogScraper(streaming=streaming)
+    expected = scraper.scrape_blog_content(fixtures.url('/page/medium'))
+
+    scraper.session.headers['Accept-Encoding'] = encoding
+    metrics.reset()
+    result = scraper.scrape_blog_content(fixtures.url('/encoded/medium'))
+    counters = metrics.counters()
+
+    assert result['success'] and result['content'] == expected['content']
+    assert counters['wire_bytes'] < counters['bytes_downloaded'] / 2
+    assert counters['compression_saved_bytes'] == counters['bytes_downloaded'] - counters['wire_bytes']
+
+
+@pytest.mark.parametrize("encoding", RESPONSE_ENCODINGS)
+def test_stream_compression_round_trips_line_by_line(encoding):
+    lines = [json.dumps({'index': i, 'summary': 'word ' * i}) + '\n' for i in range(50)]
+    sizes = []
+    chunks = list(compress_stream(iter(lines), encoding, lambda raw, sent: sizes.append((raw, sent))))
+
+    if encoding == 'gzip':
+        decompress = zlib.decompressobj(31).decompress
+        decoded = [decompress(chunk) for chunk in chunks]
+    else:
+        decoded = list(decode_chunks(chunks, encoding))
+    # Every line is decodable as soon as its chunk arrives
+    assert decoded[:len(lines)] == [line.encode() for line in lines]
+    assert b''.join(decoded) == ''.join(lines).encode()
+    assert sizes[0][0] == len(''.join(lines)) and sizes[0][1] < sizes[0][0]
+
+
+def test_api_responses_follow_accept_encoding():
+    client = app.test_client()
+    plain = client.get('/')
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    for encoding in RESPONSE_ENCODINGS:
+        response = client.get('/', headers={'Accept-Encoding': f'{encoding}, identity;q=0.5'})
+        assert response.headers['Content-Encoding'] == encoding
+        body = response.get_data()
+        if encoding == 'gzip':
+            body = zlib.decompress(body, 31)
+        else:
+            body = decode_body(body, encoding)
+        assert body == plain.get_data()
+
+    small = client.get('/api/cache/stats', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_batch_ndjson_stream_is_compressed(monkeypatch):
+    results = [{'success': True, 'index': i, 'summary': 'Résumé ' * 40} for i in range(20)]
+    monkeypatch.setattr(app_module.batch_summarizer, 'iter_results', lambda *args: iter(results))
+
+    response = app.test_client().post('/api/summarize/batch', json={'urls': ['https://a.example/']},
+                                      headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    lines = zlib.decompress(response.get_data(), 31).decode('utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == results
+
+
+def test_ndjson_line_matches_json_with_and_without_orjson(monkeypatch):
+    result = {'success': True, 'summary': 'Résumé – “quoted”', 'keywords': ['a', 'b'], 'ratio': 12.5}
+    fast = batch.ndjson_line(result)
+    monkeypatch.setattr(batch, 'orjson', None)
+    slow = batch.ndjson_line(result)
+    assert fast.endswith(b'\n') and slow.endswith(b'\n')
+    assert json.loads(fast) == json.loads(slow) == result
@@ -0,0 +1,141 @@
+"""
+Tests for URL canonicalization and near-duplicate detection
+"""
+
+import os
+
+from app import AISummarizer, BlogScraper
+from cache import SummaryCache, normalize_url
+from dedupe import DuplicateIndex, find_canonical, hamming_distance, simhash
+from normalize import clean_text
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+with open(os.path.join(ROOT, 'README.md'), encoding='utf-8') as f:
+    ARTICLE = clean_text(f.read())
+with open(os.path.join(ROOT, 'demo-content.md'), encoding='utf-8') as f:
+    OTHER_ARTICLE = clean_text(f.read())
+
+
+def syndicated(text):
+    """A syndicated copy: extra boilerplate around the same article."""
+    return "Originally published on our partner blog. " + text + " Share this post."
+
+
+def test_tracking_and_amp_variants_normalize_together():
+    base = normalize_url('https://blog.example/post?id=7')
+    assert normalize_url('https://blog.example/post?utm_source=x&id=7&utm_medium=y&fbclid=z') == base
+    assert normalize_url('https://blog.example/post?id=7&amp=1') == base
+    assert normalize_url('https://blog.example/post?outputType=AMP&id=7') == base
+    assert normalize_url('https://blog.example/post/amp') == normalize_url('https://blog.example/post')
+    assert normalize_url('https://blog.example/post/amp/') == normalize_url('https://blog.example/post/')
+
+
+def test_pages_that_only_look_like_amp_keep_their_key():
+    # outputType selects other renderings too
+    assert normalize_url('https://blog.example/post?outputType=json') != \
+        normalize_url('https://blog.example/post?outputType=print')
+    assert 'outputType=json' in normalize_url('https://blog.example/post?outputType=json')
+    # The "amp" tag or topic is a page of its own, not an AMP rendering
+    for listing in ('https://blog.example/tags/amp', 'https://blog.example/topics/amp/'):
+        assert normalize_url(listing) == listing
+    assert normalize_url('https://blog.example/amp') == 'https://blog.example/amp'
+
+
+def test_find_canonical():
+    html = (b"<html><head><link rel='stylesheet' href='/a.css'>"
+            b"<LINK href=\"/post?utm_source=feed\" REL=\"canonical\"></head><body></body></html>")
+    assert find_canonical(html, 'https://mirror.example/copy') == 'https://mirror.example/post?utm_source=feed'
+    assert find_canonical("<link rel=canonical href=https://origin.example/p>", 'https://x.example/') == \
+        'https://origin.example/p'
+    assert find_canonical(b"<html><head></head></html>", 'https://x.example/') is None
+
+
+def test_simhash_separates_copies_from_other_articles():
+    assert hamming_distance(simhash(ARTICLE), simhash(syndicated(ARTICLE))) <= 5
+    assert hamming_distance(simhash(ARTICLE), simhash(OTHER_ARTICLE)) > 16
+    assert simhash('') == 0
+
+
+def test_duplicate_index_clusters_and_evicts():
+    index = DuplicateIndex(max_clusters=2)
+    original = simhash(ARTICLE)
+    assert index.add('https://origin.example/post', original) == 'https://origin.example/post'
+    assert index.find(simhash(syndicated(ARTICLE))) == 'https://origin.example/post'
+    index.add('https://copy.example/post', simhash(syndicated(ARTICLE)), saved=True)
+
+    cluster = index.cluster_of('https://copy.example/post')
+    assert cluster['size'] == 2 and cluster['summaries_saved'] == 1
+    assert index.cluster_of('https://unknown.example/') is None
+    assert index.clusters()['summaries_saved'] == 1
+
+    index.add('https://other.example/a', simhash(OTHER_ARTICLE))
+    index.add('https://third.example/b', simhash("entirely different words here " * 20))
+    assert index.find(original) is None
+
+
+class PageScraper:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = 0
+
+    def scrape(self, url, validators=None):
+        self.calls += 1
+        content, canonical = self.pages[url]
+        result = {'success': True, 'url': url, 'title': 'Post', 'content': content,
+                  'word_count': len(content.split()), 'char_count': len(content)}
+        if canonical:
+            result['canonical_url'] = canonical
+        return result
+
+
+class CountingSummarizer(AISummarizer):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def generate_summary(self, title, content, target_length=150):
+        self.calls += 1
+        return super().generate_summary(title, content, target_length)
+
+
+def test_cache_reuses_summaries_for_duplicates():
+    scraper = PageScraper({
+        'https://origin.example/post': (ARTICLE, None),
+        'https://mirror.example/copy': (syndicated(ARTICLE), None),
+        'https://amp.example/post': (ARTICLE + " AMP footer.", 'https://origin.example/post?utm_source=amp'),
+        'https://other.example/post': (OTHER_ARTICLE, None),
+    })
+    summarizer = CountingSummarizer()
+    cache = SummaryCache(duplicates=DuplicateIndex())
+
+    first = cache.get_or_compute('https://origin.example/post', 150, scraper.scrape, summarizer.generate_summary)
+    assert first['cache_status'] == 'miss'
+
+    copy = cache.get_or_compute('https://mirror.example/copy', 150, scraper.scrape, summarizer.generate_summary)
+    assert copy['cache_status'] == 'duplicate'
+    assert copy['duplicate_of'] == 'https://origin.example/post'
+    assert copy['summary'] == first['summary']
+    assert copy['duplicate_cluster']['size'] == 2
+
+    amp = cache.get_or_compute('https://amp.example/post', 150, scraper.scrape, summarizer.generate_summary)
+    assert amp['cache_status'] == 'duplicate'
+    assert amp['duplicate_cluster']['summaries_saved'] == 2
+
+    other = cache.get_or_compute('https://other.example/post', 150, scraper.scrape, summarizer.generate_summary)
+    assert other['cache_status'] == 'miss' and 'duplicate_cluster' not in other
+
+    # Tracking-parameter variants are the same cache entry
+    tracked = cache.get_or_compute('https://origin.example/post?utm_campaign=x', 150,
+                                   scraper.scrape, summarizer.generate_summary)
+    assert tracked['cache_status'] == 'hit'
+    assert summarizer.calls == 2
+    assert cache.stats()['duplicate'] == 2
+
+
+def test_scraper_reports_canonical_url():
+    html = (b"<html><head><title>T</title><link rel='canonical' href='/original'></head>"
+            b"<body><article><p>Some article text that is long enough.</p></article></body></html>")
+    result = BlogScraper().parse_html('https://mirror.example/copy', html)
+    assert result['canonical_url'] == 'https://mirror.example/original'
+    assert 'canonical_url' not in BlogScraper().parse_html('https://x.example/', b"<p>No head here</p>")
@@ -0,0 +1,51 @@
+"""
+Tests that the compact document structures match the list and Counter paths
+"""
+
+import pickle
+import random
+from collections import Counter
+
+from benchmarks.text_throughput import generate_corpus
+from document import SentenceSpans, KeywordCounts
+from normalize import split_sentences
+from text_analysis import keyword_counts, top_key_points
+
+SAMPLES = [
+    "",
+    "short. bits! only?",
+    "   Leading space sentence here.   Trailing space sentence too.  ",
+    "Don't stop... Really?! Yes. short. (Parenthetical remark, here); done: ok",
+    "Ends without punctuation but is long enough",
+]
+
+
+def test_sentence_spans_match_split_sentences():
+    for text in SAMPLES + [generate_corpus(0.05)]:
+        spans = SentenceSpans(text)
+        expected = split_sentences(text)
+        assert list(spans) == expected
+        assert len(spans) == len(expected)
+        assert [spans[i] for i in range(-len(spans), len(spans))] == expected[-len(expected):] + expected
+        assert spans[1:4] == expected[1:4]
+        assert top_key_points(spans, 5) == top_key_points(expected, 5)
+
+
+def test_keyword_counts_match_counter():
+    rng = random.Random(5)
+    words = "cache index latency the parser feed them summary crawler".split()
+    for _ in range(30):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 200)))
+        counts = keyword_counts(text)
+        compact = KeywordCounts.from_text(text)
+        assert list(compact.items()) == list(counts.items())
+        assert compact.most_common() == counts.most_common()
+        assert compact.most_common(3) == counts.most_common(3)
+
+
+def test_compact_structures_pickle():
+    text = generate_corpus(0.01)
+    spans = pickle.loads(pickle.dumps(SentenceSpans(text)))
+    assert list(spans) == split_sentences(text)
+    counts = pickle.loads(pickle.dumps(KeywordCounts(Counter(a=2, b=1))))
+    assert counts.most_common() == [('a', 2), ('b', 1)]
@@ -0,0 +1,129 @@
+"""
+Tests for per-domain extraction profiles learned from text and link density
+"""
+
+import pytest
+
+import app as app_module
+from app import BlogScraper, app
+from extraction_profiles import ExtractionProfiles
+from extractor import ContentExtractor, extract
+
+ARTICLE = " ".join(f"Sentence {i} of the article explains the topic in plain words." for i in range(30))
+SIDEBAR = "".join(f'<li><a href="/tag/{i}">Related post number {i}</a></li>' for i in range(40))
+
+# '.content' (tried before '.post-body') wraps a link-heavy sidebar as well as the article
+WRAPPED = f"""<html><head><title>Wrapped</title></head><body>
+<div class="content"><ul class="sidebar">{SIDEBAR}</ul>
+<div class="post-body"><p>{ARTICLE}</p><p>See <a href="/more">more</a>.</p></div></div>
+</body></html>"""
+
+REDESIGNED = f"""<html><head><title>Redesigned</title></head><body>
+<article><p>{ARTICLE}</p></article></body></html>"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("engine", ["lxml", "html.parser"])
+def test_ranking_prefers_dense_low_link_container(engine):
+    _, fixed = extract(WRAPPED, engine)
+    assert "Related post" in fixed
+
+    target = ContentExtractor(rank=True)
+    _, ranked = extract(WRAPPED, engine, target=target)
+    assert target.selector == '.post-body'
+    assert "Related post" not in ranked and ARTICLE in ranked
+
+    scores = {candidate['selector']: candidate for candidate in target.ranking}
+    assert scores['.content']['link_density'] > scores['.post-body']['link_density']
+    assert scores['.post-body']['score'] > scores['.content']['score'] > 0
+
+
+@pytest.mark.parametrize("engine", ["lxml", "soup"])
+def test_scraper_learns_then_reuses_profile(engine):
+    profiles = ExtractionProfiles()
+    scraper = BlogScraper(engine, profiles=profiles)
+
+    first = scraper.parse_html("https://blog.example/a", WRAPPED.encode())
+    assert "Related post" not in first['content']
+    assert profiles.profiles()['blog.example']['selector'] == '.post-body'
+    assert profiles.plan('blog.example') == ('.post-body', False)
+
+    second = scraper.parse_html("https://blog.example/b", WRAPPED.encode())
+    assert second['content'] == first['content']
+    assert profiles.stats()['hits'] == 1
+
+
+def test_miss_marks_profile_stale_and_relearns():
+    profiles = ExtractionProfiles()
+    scraper = BlogScraper('html.parser', profiles=profiles)
+    scraper.parse_html("https://blog.example/a", WRAPPED.encode())
+
+    # The remembered container is gone: fall back to the fixed order, then re-rank
+    result = scraper.parse_html("https://blog.example/b", REDESIGNED.encode())
+    assert ARTICLE in result['content']
+    assert profiles.stats()['misses'] == 1
+    assert profiles.plan('blog.example') == ('.post-body', True)
+
+    scraper.parse_html("https://blog.example/c", REDESIGNED.encode())
+    profile = profiles.profiles()['blog.example']
+    assert profile['selector'] == 'article' and not profile['stale']
+    assert profiles.stats()['relearned'] == 1
+
+
+def test_profiles_revalidate_periodically():
+    clock = FakeClock()
+    profiles = ExtractionProfiles(revalidate_every=3, revalidate_after=60, clock=clock)
+    ranking = [{'selector': 'article', 'chars': 900, 'link_density': 0.0, 'text_density': 90.0,
+                'score': 900.0}]
+    profiles.learn('a.example', 'article', ranking)
+    for _ in range(3):
+        assert profiles.plan('a.example') == ('article', False)
+        profiles.record('a.example', 'article', 'article')
+    assert profiles.plan('a.example') == ('article', True)
+
+    profiles.learn('a.example', 'article', ranking)
+    assert profiles.plan('a.example') == ('article', False)
+    clock.now += 61
+    assert profiles.plan('a.example') == ('article', True)
+
+
+def test_profiles_persist_across_restarts(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    profiles = ExtractionProfiles(path, save_interval=3600)
+    BlogScraper('lxml', profiles=profiles).parse_html("https://blog.example/a", WRAPPED.encode())
+    profiles.close()
+
+    reloaded = ExtractionProfiles(path)
+    assert reloaded.plan('blog.example') == ('.post-body', False)
+    assert reloaded.forget('blog.example') and not reloaded.forget('blog.example')
+    reloaded.close()
+    assert ExtractionProfiles(path).profiles() == {}
+
+
+def test_admin_endpoint_lists_and_forgets_profiles(monkeypatch):
+    profiles = ExtractionProfiles()
+    BlogScraper('lxml', profiles=profiles).parse_html("https://blog.example/a", WRAPPED.encode())
+    monkeypatch.setattr(app_module, 'extraction_profiles', profiles)
+    client = app.test_client()
+
+    listing = client.get('/api/admin/extraction-profiles').get_json()
+    assert listing['enabled'] and listing['stats']['hosts'] == 1
+    assert listing['profiles']['blog.example']['selector'] == '.post-body'
+    assert client.get('/api/admin/extraction-profiles?host=other.example').get_json()['profiles'] == {}
+
+    # Forgetting needs the admin token, and is refused outright without one configured
+    assert client.delete('/api/admin/extraction-profiles/blog.example').status_code == 403
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', 's3cret')
+    assert client.delete('/api/admin/extraction-profiles/blog.example').status_code == 401
+    assert client.delete('/api/admin/extraction-profiles/blog.example',
+                         headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    admin = {'Authorization': 'Bearer s3cret'}
+    assert client.delete('/api/admin/extraction-profiles/blog.example', headers=admin).status_code == 200
+    assert client.delete('/api/admin/extraction-profiles/blog.example', headers=admin).status_code == 404
@@ -0,0 +1,65 @@
+"""
+Golden-corpus tests: the single-pass extractor must match the BeautifulSoup path
+"""
+
+import pytest
+
+from app import BlogScraper
+from extractor import DEFAULT_ENGINE
+
+PARAGRAPH = "<p>Streaming extraction keeps <a href='/x'>memory</a> flat &amp; fast.</p>\n"
+
+# Well-formed pages as real blogs serve them
+CORPUS = {
+    'article': b"<html><head><title> Hello &amp; World </title></head><body><header><h1>Site</h1>"
+               b"</header><nav>menu</nav><article><h1>Post</h1><p>First para.</p>\n<p>Second "
+               b"<b>bold</b> para.</p><script>var x='</div>';</script></article><footer>foot"
+               b"</footer></body></html>",
+    'class_priority': b"<html><body><div class='sidebar content'>side<aside><div class='post-content'>"
+                      b"hidden</div></aside></div><div class='x post-content y'>real text</div>"
+                      b"</body></html>",
+    'main_fallback': b"<html><body><div class='hero'>Intro</div><main><p>Main body.</p></main></body></html>",
+    'body_fallback': b"<html><head><style>p{}</style></head><body><h2>Plain</h2><p>Nothing special."
+                     b"</p></body></html>",
+    'h1_title': b"<body><h1>Heading here</h1><p>Body text only.</p></body>",
+    'h1_in_header': b"<html><body><header><h1>Brand</h1></header><p>Text</p></body></html>",
+    'empty': b"",
+    'utf8': "<html><head><meta charset='utf-8'><title>Café — news</title></head><body><article>"
+            "Naïve résumé “quotes” &#8217; &nbsp;x</article></body></html>".encode('utf-8'),
+    'latin1': "<html><head><meta charset='iso-8859-1'><title>Olé</title></head><body>"
+              "<div class='entry-content'>Señor</div></body></html>".encode('latin-1'),
+    'comments': b"<html><body><!-- hidden --><main>visible<!-- also --> text</main></body></html>",
+    'empty_match': b"<html><body><img class='content' src=x><article>art</article></body></html>",
+    'self_closing': b"<html><body><div class='content'/><p>after</p></body></html>",
+    'large': ("<html><head><title>Big</title></head><body><div class='wrap'><aside>"
+              + PARAGRAPH * 50 + "</aside><article>" + PARAGRAPH * 5000
+              + "</article></div></body></html>").encode('utf-8'),
+}
+
+# Malformed markup where only the stdlib tokenizer reproduces html.parser's tree
+# (libxml2 synthesizes <body> and repairs nesting differently)
+MALFORMED = {
+    'no_body': b"<title>T</title><p>no body at all</p>",
+    'unclosed': b"<html><body><main><p>one<p>two<div class=post-body>three</main>after</body></html>",
+    'cdata': b"<html><body><main>text<![CDATA[cdata]]></main></body></html>",
+    'stray_end': b"<html><body></div><article>a</span>b</article></body></html>",
+    'text_before_body': b"stray text<html><body><p>x</p></body></html>",
+    'entities': b"<html><body><p>a &amp b &ampx; &lt c &copy d &#147;q&#148; &#x2014; &#0;</p></body></html>",
+}
+
+
+def legacy(html):
+    return BlogScraper(extraction_engine='soup').parse_html('https://example.com/', html)
+
+
+@pytest.mark.parametrize('engine', ['lxml', 'html.parser'])
+@pytest.mark.parametrize('name', sorted(CORPUS))
+def test_matches_soup_on_golden_corpus(name, engine):
+    html = CORPUS[name]
+    assert BlogScraper(extraction_engine=engine).parse_html('https://example.com/', html) == legacy(html)
+
+
+@pytest.mark.parametrize('name', sorted(MALFORMED))
+def test_default_engine_matches_soup_on_malformed_markup(name):
+    html = MALFORMED[name]
+    assert BlogScraper(extraction_engine=DEFAULT_ENGINE).parse_html('https://example.com/', html) == legacy(html)
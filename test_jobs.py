@@ -0,0 +1,140 @@
+"""
+Tests for the background job queue, job stores and job API
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from jobs import (JobQueue, MemoryJobStore, SQLiteJobStore, QueueFull, new_job, DONE, FAILED, QUEUED,
+                  RUNNING)
+
+
+def echo_handler(payload):
+    return {'success': payload['url'] != 'bad', 'url': payload['url'], 'error': None}
+
+
+@pytest.mark.parametrize('make_store', [
+    lambda tmp_path: MemoryJobStore(),
+    lambda tmp_path: SQLiteJobStore(str(tmp_path / 'jobs.db')),
+])
+def test_jobs_run_to_completion(tmp_path, make_store):
+    jobs = JobQueue(echo_handler, store=make_store(tmp_path), workers=2).start()
+    try:
+        ok = jobs.submit({'url': 'good'})
+        bad = jobs.submit({'url': 'bad'})
+        assert jobs.wait(ok['id'], 5)['status'] == DONE
+        assert jobs.wait(bad['id'], 5)['status'] == FAILED
+        assert jobs.get(ok['id'])['result']['url'] == 'good'
+    finally:
+        jobs.shutdown()
+
+
+def test_bounded_queue_pushes_back():
+    release = threading.Event()
+    jobs = JobQueue(lambda payload: release.wait(5) and {'success': True},
+                    workers=1, max_pending=1).start()
+    try:
+        first = jobs.submit({'url': 'a'})
+        jobs.wait(first['id'], 1, updated_after=first['updated_at'])
+        jobs.submit({'url': 'b'})
+        with pytest.raises(QueueFull):
+            jobs.submit({'url': 'c'})
+    finally:
+        release.set()
+        jobs.shutdown()
+
+
+def test_sqlite_store_recovers_unfinished_jobs(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    stopped = JobQueue(echo_handler, store=SQLiteJobStore(path))
+    job = stopped.submit({'url': 'good'})
+    assert stopped.get(job['id'])['status'] == QUEUED
+
+    restarted = JobQueue(echo_handler, store=SQLiteJobStore(path)).start()
+    try:
+        assert restarted.wait(job['id'], 5)['status'] == DONE
+    finally:
+        restarted.shutdown()
+
+
+def test_jobs_of_exited_processes_are_taken_over(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                            capture_output=True, text=True).stdout.strip()
+    store = SQLiteJobStore(path)
+    orphaned = dict(new_job({'url': 'good'}, owner=int(exited)), status=RUNNING)
+    # Owned by a process that is still running (this one's parent)
+    busy = new_job({'url': 'good'}, owner=os.getppid())
+    for job in (orphaned, busy):
+        store.create(job)
+
+    # Only one of several processes racing for an orphan gets it
+    assert store.take_over(orphaned['id'], int(exited), 1)
+    assert not store.take_over(orphaned['id'], int(exited), 2)
+    store.update(orphaned['id'], owner=int(exited))
+
+    jobs = JobQueue(echo_handler, store=SQLiteJobStore(path), recover_interval=0.1).start()
+    try:
+        assert jobs.wait(orphaned['id'], 5)['status'] == DONE
+        late = new_job({'url': 'good'}, owner=int(exited))
+        store.create(late)
+        # Picked up by the periodic sweep, not only on start
+        assert jobs.wait(late['id'], 5)['status'] == DONE
+        assert jobs.get(busy['id'])['status'] == QUEUED
+    finally:
+        jobs.shutdown()
+
+
+@pytest.mark.parametrize('make_store', [
+    lambda tmp_path, **limits: MemoryJobStore(**limits),
+    lambda tmp_path, **limits: SQLiteJobStore(str(tmp_path / 'jobs.db'), **limits),
+])
+def test_stores_evict_finished_jobs(tmp_path, make_store):
+    jobs = JobQueue(echo_handler, store=make_store(tmp_path, ttl=0.5, max_finished=2),
+                    workers=1).start()
+    try:
+        done = [jobs.submit({'url': f'good-{i}'}) for i in range(3)]
+        for job in done:
+            jobs.wait(job['id'], 5)
+        jobs.store.prune()
+        # Only the newest max_finished finished jobs are kept
+        assert [jobs.get(job['id']) is not None for job in done] == [False, True, True]
+
+        release = threading.Event()
+        jobs.handler = lambda payload: release.wait(5) and echo_handler(payload)
+        running = jobs.submit({'url': 'slow'})
+        time.sleep(0.6)
+        jobs.store.prune()
+        # Expired finished jobs go; unfinished ones stay however old they are
+        assert all(jobs.get(job['id']) is None for job in done)
+        assert jobs.get(running['id'])['status'] != DONE
+        release.set()
+        assert jobs.wait(running['id'], 5)['status'] == DONE
+    finally:
+        jobs.shutdown()
+
+
+def test_job_api(monkeypatch):
+    monkeypatch.setattr(app_module.batch_summarizer, 'summarize_url',
+                        lambda url, target_length, engine=None: {'success': True, 'url': url, 'summary': 'ok'})
+    client = app_module.app.test_client()
+
+    response = client.post('/api/jobs', json={'url': 'https://example.com/post'})
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+
+    job = client.get(f'/api/jobs/{job_id}?wait=5').get_json()['job']
+    assert job['status'] == DONE and job['result']['summary'] == 'ok'
+
+    events = client.get(f'/api/jobs/{job_id}/events').get_data(as_text=True)
+    assert events.startswith('event: status') and '"done"' in events
+
+    assert client.get('/api/jobs/missing').status_code == 404
+    assert client.get(f'/api/jobs/{job_id}?wait=abc').status_code == 400
+    assert client.post('/api/jobs', json={}).status_code == 400
@@ -0,0 +1,93 @@
+"""
+Tests for language detection and the per-language pipeline
+"""
+
+import pytest
+
+from ai_summarizer import AISummarizer
+from batch import format_result
+from blog_scraper import BlogScraper
+from incremental import DocumentAnalysis
+from languages import get_language, detect_language, detect_language_of_pieces
+from longdoc import reduce_chunks
+from normalize import clean_text, split_sentences
+from text_analysis import top_keywords
+
+URDU = ("پاکستان میں انٹرنیٹ کا استعمال تیزی سے بڑھ رہا ہے اور لوگ اپنے کاروبار کے لیے نئی "
+        "ایپلیکیشنز استعمال کر رہے ہیں۔ حکومت نے تعلیم اور صحت کے شعبوں میں انٹرنیٹ کی بہتری کے "
+        "لیے کئی منصوبے شروع کیے ہیں، جن سے طلبہ کو فائدہ ہوگا۔ کیا دیہات میں بھی انٹرنیٹ کی سہولت "
+        "جلد پہنچ جائے گی؟ ماہرین کے مطابق آنے والے برسوں میں انٹرنیٹ کا استعمال دوگنا ہو جائے گا۔")
+
+ENGLISH = ("The café’s new search index is “fast” — queries return in milliseconds. "
+           "Caching the parsed pages keeps the server responsive under load! "
+           "Does the crawler respect robots rules? It does, and it backs off on errors.")
+
+
+def test_detects_english_urdu_and_mixed_text():
+    assert detect_language("Plain ASCII text about servers.") == 'en'
+    assert detect_language(ENGLISH) == 'en'
+    assert detect_language(URDU) == 'ur'
+    # Mostly Urdu with English terms, and English quoting a line of Urdu
+    assert detect_language("پاکستان میں Python اور machine learning کا استعمال تیزی سے بڑھ رہا ہے۔") == 'ur'
+    assert detect_language(f"The poet wrote: دل ہی تو ہے. {ENGLISH}") == 'en'
+    # Arabic shares Urdu's script but is not supported, so it gets the default
+    assert detect_language("تعمل الحكومة على تحسين خدمات الإنترنت في المدن والقرى، ويتوقع الخبراء "
+                           "أن يتضاعف عدد المستخدمين خلال السنوات القادمة.") == 'en'
+    assert detect_language("") == 'en'
+
+    language, pieces = detect_language_of_pieces(iter(URDU[i:i + 50] for i in range(0, len(URDU), 50)))
+    assert language == 'ur' and ''.join(pieces) == URDU
+
+    with pytest.raises(ValueError):
+        get_language('xx')
+
+
+def test_english_resources_match_the_original_pipeline():
+    english = get_language('en')
+    assert get_language('en') is english
+    assert english.clean(ENGLISH) == clean_text(ENGLISH)
+    assert list(english.sentences(ENGLISH)) == split_sentences(ENGLISH)
+    assert english.top_keywords(ENGLISH, 10) == top_keywords(ENGLISH, 10)
+
+
+def test_urdu_keeps_punctuation_sentences_and_keywords():
+    urdu = get_language('ur')
+    cleaned = BlogScraper()._clean_text(f"  {URDU}\n\n  ")
+    assert cleaned == urdu.clean(URDU) == URDU
+    # The English cleaner drops the Urdu full stop, and with it every sentence boundary
+    assert '۔' not in clean_text(URDU)
+
+    sentences = list(urdu.sentences(URDU))
+    assert len(sentences) == 4
+    assert sentences[2] == "کیا دیہات میں بھی انٹرنیٹ کی سہولت جلد پہنچ جائے گی"
+    keywords = urdu.top_keywords(URDU, 5)
+    assert keywords[0] == 'انٹرنیٹ' and 'میں' not in keywords and 'کے' not in keywords
+
+
+def test_summarizes_urdu_content_in_urdu():
+    summarizer = AISummarizer(urdu_summary=True)
+    result = summarizer.generate_summary("انٹرنیٹ", URDU)
+    assert result['success'] and result['language'] == 'ur'
+    assert result['summary'].startswith("'انٹرنیٹ' کے عنوان سے یہ مضمون انٹرنیٹ، ")
+    assert result['summary_urdu'] == result['summary']
+
+    textrank = summarizer.generate_summary("انٹرنیٹ", URDU, engine='textrank')
+    assert textrank['summary'].endswith('۔')
+
+    # Incremental and long-document paths use the detected language too
+    assert summarizer.summarize_analysis("انٹرنیٹ", DocumentAnalysis(URDU)) == result
+    reduced = reduce_chunks(URDU * 40, processes=1, chunk_chars=512, language='ur')
+    assert reduced.top_keywords(3) == get_language('ur').top_keywords(URDU * 40, 3)
+    long = AISummarizer(long_document_chars=1000, long_document_processes=1).generate_summary("", URDU * 40)
+    assert long['language'] == 'ur' and long['keywords'] == reduced.top_keywords(10)
+
+
+def test_english_summary_gets_an_offline_urdu_translation():
+    result = AISummarizer(urdu_summary=True).generate_summary("Kestrel", ENGLISH)
+    assert result['language'] == 'en'
+    assert result['summary_urdu'].startswith("یہ مضمون بعنوان 'Kestrel' زیر بحث لاتا ہے")
+    assert 'summary_urdu' not in AISummarizer().generate_summary("Kestrel", ENGLISH)
+
+    scrape = {'url': 'https://blog.example/', 'title': 'Search', 'word_count': 30, 'char_count': 200}
+    response = format_result(scrape, result)
+    assert response['summary_urdu'] == result['summary_urdu'] and response['analysis']['language'] == 'en'
@@ -0,0 +1,107 @@
+"""
+Tests that the chunked map-reduce path matches whole-document summarization
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import batch
+import longdoc
+from app import AISummarizer
+from batch import _init_summary_worker
+from longdoc import iter_chunks, reduce_chunks, shared_pool
+from normalize import clean_text
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+with open(os.path.join(ROOT, 'README.md'), encoding='utf-8') as f:
+    ARTICLE = clean_text(f.read())
+
+VOCABULARY = "model data learning patient system image drug risk the of it they".split()
+
+
+def random_text(sentences, seed=3):
+    rng = random.Random(seed)
+    return clean_text(" ".join(
+        " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 40))) + rng.choice(".!?")
+        for _ in range(sentences)
+    ))
+
+
+def pieces(text, size):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def test_chunks_rejoin_to_the_cleaned_text():
+    text = ARTICLE * 5
+    chunks = list(iter_chunks(pieces(text, 777), chunk_chars=2000))
+    assert len(chunks) > 10
+    assert all(len(chunk) <= 4000 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_boundary_free_runs_are_cut_at_twice_the_chunk_size():
+    words = " ".join(["word"] * 300)  # 1499 characters, no sentence boundary
+    chunks = list(iter_chunks(pieces(words + ". Done.", 100), chunk_chars=500))
+    assert "".join(chunks) == words + ". Done."
+    # Cut at whitespace: the sentence is split, its words are not; the
+    # next chunk reaches the sentence boundary again
+    assert chunks[0] == "word " * 101
+    assert chunks[1].endswith("word. ")
+
+    letters = "x" * 1500
+    assert list(iter_chunks(letters, chunk_chars=500)) == ["x" * 1000, "x" * 500]
+
+
+def test_long_summary_matches_generate_summary():
+    whole = AISummarizer(long_document_chars=None)
+    chunked = AISummarizer(chunk_chars=500)
+    for text in (ARTICLE, random_text(400), random_text(12, seed=5), random_text(3, seed=9)):
+        expected = whole.generate_summary("Title", text)
+        assert chunked.generate_long_summary("Title", pieces(text, 123)) == expected
+
+
+def test_long_summary_in_process_pool():
+    text = random_text(300)
+    expected = AISummarizer(long_document_chars=None).generate_summary("Title", text)
+    summarizer = AISummarizer(long_document_processes=2, chunk_chars=1000)
+    assert summarizer.generate_long_summary("Title", pieces(text, 4096)) == expected
+    # Later documents reuse the same pool
+    pool = shared_pool(2)
+    assert summarizer.generate_long_summary("Title", pieces(text, 4096)) == expected
+    assert shared_pool(2) is pool
+
+
+def summarize_long_in_worker(text):
+    """Runs in a batch pool worker: summarize, and report whether a nested pool was started."""
+    summary = batch._worker_summarizer.generate_summary("Title", text)
+    return summary, longdoc._pool is None
+
+
+def test_pool_workers_score_long_documents_in_process():
+    text = random_text(300)
+    summarizer = AISummarizer(long_document_chars=1000, long_document_processes=2, chunk_chars=1000)
+    expected = summarizer.generate_summary("Title", text)
+    with ProcessPoolExecutor(1, initializer=_init_summary_worker, initargs=(summarizer,)) as pool:
+        summary, no_nested_pool = pool.submit(summarize_long_in_worker, text).result()
+    assert summary == expected and no_nested_pool
+
+
+def test_generate_summary_switches_to_chunks_for_long_content():
+    text = ARTICLE * 3
+    summarizer = AISummarizer(long_document_chars=len(ARTICLE), long_document_processes=1,
+                              chunk_chars=4096)
+    result = summarizer.generate_summary("Title", text, engine='textrank')
+    assert result['success'] and result['engine'] == 'textrank'
+    assert result['original_length'] == len(text.split())
+    assert 0 < result['summary_length'] <= 150
+    assert set(result) == set(AISummarizer().generate_summary("Title", ARTICLE))
+
+
+def test_extract_candidates_stay_bounded():
+    reduced = reduce_chunks(pieces(random_text(20000), 8192), extract_length=50,
+                            processes=1, chunk_chars=2048)
+    assert reduced.sentences > 10000
+    assert len(reduced.extract_sentences()) <= 2000
@@ -0,0 +1,86 @@
+"""
+Tests for per-stage pipeline metrics and the Prometheus endpoint
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app import AISummarizer, BlogScraper, app
+from batch import BatchSummarizer
+from metrics import MetricsRegistry, MultiprocessExporter, registry
+
+PAGE = b"<html><head><title>Metrics</title></head><body><article>" + \
+       b"<p>Every stage of the pipeline is timed separately.</p>" * 50 + b"</article></body></html>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_histogram_and_prometheus_format():
+    metrics = MetricsRegistry()
+    metrics.observe('parse', 0.003, 'a.example')
+    metrics.observe('parse', 0.2, 'b.example')
+    metrics.increment('bytes_downloaded', 512, 'a.example')
+
+    text = metrics.render_prometheus()
+    assert 'blog_summarizer_stage_seconds_count{stage="parse",host="all"} 2' in text
+    assert 'blog_summarizer_stage_seconds_bucket{stage="parse",host="a.example",le="0.005"} 1' in text
+    assert 'blog_summarizer_bytes_downloaded_total{host="a.example"} 512' in text
+    assert metrics.stage_summary()['parse']['max'] == 0.2
+
+
+def test_host_labels_are_bounded():
+    metrics = MetricsRegistry(max_hosts=1)
+    metrics.observe('scrape', 0.1, 'a.example')
+    metrics.observe('scrape', 0.1, 'b.example')
+    assert 'host="other"' in metrics.render_prometheus()
+
+
+def test_exporter_sums_the_processes_sharing_a_directory(tmp_path):
+    # Two workers' registries; the second has exited since its last snapshot
+    worker, exited = MetricsRegistry(), MetricsRegistry()
+    worker.observe('parse', 0.003, 'a.example')
+    exited.observe('parse', 0.2, 'a.example')
+    exited.increment('bytes_downloaded', 512)
+    MultiprocessExporter(str(tmp_path), exited).start()
+    exporter = MultiprocessExporter(str(tmp_path), worker).start()
+    worker.increment('bytes_downloaded', 100)
+
+    text = exporter.render_prometheus()
+    assert 'blog_summarizer_stage_seconds_count{stage="parse",host="a.example"} 2' in text
+    assert 'blog_summarizer_stage_seconds_bucket{stage="parse",host="all",le="0.005"} 1' in text
+    # The renderer's latest counts, not only its last periodic snapshot
+    assert 'blog_summarizer_bytes_downloaded_total{host="all"} 612' in text
+    assert exporter.aggregate().stage_summary()['parse']['max'] == 0.2
+
+
+def test_scrape_and_summarize_record_stages():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    registry.reset()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/post"
+        batch = BatchSummarizer(BlogScraper(), AISummarizer(), summary_processes=1)
+        try:
+            assert batch.summarize_url(url)['success']
+        finally:
+            batch.shutdown()
+    finally:
+        server.shutdown()
+
+    stages = registry.stage_summary()
+    for stage in ('scrape', 'headers', 'download', 'parse', 'clean', 'summarize', 'keywords'):
+        assert stages[stage]['count'] == 1, stage
+    assert registry.counters()['bytes_downloaded'] == len(PAGE)
+
+    body = app.test_client().get('/metrics').get_data(as_text=True)
+    assert 'stage="summarize",host="all"' in body
@@ -0,0 +1,40 @@
+"""
+Tests that the precompiled normalizers match the original regex pipeline
+"""
+
+import normalize
+from benchmarks.text_throughput import generate_corpus, legacy_clean, legacy_sentences
+from normalize import clean_text, count_words, iter_sentences, split_sentences
+
+SAMPLES = [
+    "",
+    "   ",
+    "• Bullet point\n\n\twith  tabs — and “quotes”!",
+    "Don't stop... Really?! Yes. short. (Parenthetical remark, here); done: ok",
+    "• leading symbol and trailing symbol •",
+    "Ends without punctuation but is long enough",
+]
+
+
+def test_clean_text_matches_legacy():
+    for text in SAMPLES + [generate_corpus(0.05)]:
+        assert clean_text(text) == legacy_clean(text)
+
+
+def test_sentences_match_legacy():
+    for text in SAMPLES + [generate_corpus(0.05)]:
+        assert split_sentences(text) == legacy_sentences(text)
+
+
+def test_iter_sentences_is_lazy():
+    sentences = iter_sentences("The first sentence is here. " * 1000)
+    assert next(sentences) == "The first sentence is here"
+
+
+def test_windowed_passes_match_whole_text(monkeypatch):
+    # Tiny windows put a boundary inside almost every run of words and symbols
+    monkeypatch.setattr(normalize, 'WINDOW_CHARS', 7)
+    for text in SAMPLES + [generate_corpus(0.05)]:
+        assert ''.join(normalize.iter_windows(text)) == text
+        assert clean_text(text) == legacy_clean(text)
+        assert count_words(text) == len(text.split())
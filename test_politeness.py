@@ -0,0 +1,156 @@
+"""
+Tests for per-host rate limits, retries and circuit breaking
+"""
+
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from app import AISummarizer, BlogScraper
+from batch import BatchSummarizer
+from politeness import CircuitOpenError, HostPoliteness, RobotsCache, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def polite(clock, **options):
+    return HostPoliteness(clock=clock, sleep=clock.sleep, **options)
+
+
+def test_token_bucket_spaces_requests_per_host():
+    clock = FakeClock()
+    policy = polite(clock, rate=2, burst=2)
+    for _ in range(4):
+        policy.acquire("https://a.example/post")
+    policy.acquire("https://b.example/post")
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_robots_crawl_delay_is_fetched_once_per_host():
+    fetched = []
+
+    def fetch(robots_url):
+        fetched.append(robots_url)
+        return 200, "User-agent: *\nCrawl-delay: 3\n"
+
+    clock = FakeClock()
+    policy = polite(clock, rate=10, burst=5, robots=RobotsCache(fetch))
+    for i in range(3):
+        policy.acquire(f"https://slow.example/post/{i}")
+    assert fetched == ["https://slow.example/robots.txt"]
+    assert clock.sleeps == [3, 3]
+    assert policy.host_stats()["https://slow.example"]['crawl_delay'] == 3
+
+
+def test_retries_honor_retry_after():
+    clock = FakeClock()
+    policy = polite(clock)
+    responses = [FakeResponse(503, {'Retry-After': '7'}), FakeResponse(500), FakeResponse(200)]
+    response = policy.request("https://a.example/", lambda: responses.pop(0))
+    assert response.status_code == 200
+    assert clock.sleeps[0] == 7
+    assert 0.5 <= clock.sleeps[1] <= 1.0  # second retry: jittered backoff
+
+
+def test_long_retry_after_pauses_the_host():
+    clock = FakeClock()
+    policy = polite(clock, max_retry_after=30)
+    first = FakeResponse(429, {'Retry-After': formatdate(time.time() + 120, usegmt=True)})
+    response = policy.request("https://a.example/1", lambda: first)
+    assert response.status_code == 429 and not clock.sleeps
+    assert policy.ready_in("https://a.example/2") > 100
+
+
+def test_circuit_breaker_fails_fast_then_probes():
+    clock = FakeClock()
+    policy = polite(clock, max_retries=0, failure_threshold=3, cooldown=30)
+    url = "https://down.example/"
+    for _ in range(3):
+        assert policy.request(url, lambda: FakeResponse(502)).status_code == 502
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        policy.request(url, lambda: calls.append(1))
+    assert not calls
+
+    clock.now += 31
+    assert policy.request(url, lambda: FakeResponse(200)).status_code == 200
+    assert policy.host_stats()["https://down.example"]['circuit'] == 'closed'
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(formatdate(1000, usegmt=True), now=990) == 10
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_polite_scraper_retries_and_reports_open_circuits():
+    scraper = BlogScraper(polite=True)
+    scraper.politeness = HostPoliteness(max_retries=1, failure_threshold=2, backoff=0.001)
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append(url)
+        return FakeResponse(503)
+
+    scraper.session.get = get
+    result = scraper.scrape_blog_content("https://down.example/post")
+    assert not result['success'] and len(calls) == 2
+
+    result = scraper.scrape_blog_content("https://down.example/other")
+    assert not result['success'] and 'failing' in result['error'] and len(calls) == 2
+
+
+class RecordingScraper:
+    """Offline scraper that records when each host was fetched."""
+
+    def __init__(self, politeness):
+        self.politeness = politeness
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def scrape_blog_content(self, url):
+        self.politeness.acquire(url)
+        with self.lock:
+            self.fetched.append((url.split('/')[2], time.monotonic()))
+        return {'success': False, 'error': 'offline'}
+
+
+def test_batch_dispatches_on_each_hosts_schedule():
+    scraper = RecordingScraper(HostPoliteness(rate=20, burst=1))
+    urls = [f"https://{host}.example/{i}" for i in range(5) for host in ('a', 'b', 'c')]
+    batch = BatchSummarizer(scraper, AISummarizer(), max_workers=4, per_host_limit=4,
+                            use_processes=False)
+    started = time.monotonic()
+    assert len(list(batch.iter_results(urls))) == len(urls)
+
+    # Hosts are paced independently: 5 requests per host at 20/s take ~0.2s, not 0.75s
+    assert time.monotonic() - started < 0.6
+    for host in ('a.example', 'b.example', 'c.example'):
+        times = [t for h, t in scraper.fetched if h == host]
+        # k-th request no earlier than k slots after the first (minus thread wake-up jitter)
+        assert all(t - times[0] >= k * 0.05 - 0.01 for k, t in enumerate(times))
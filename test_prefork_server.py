@@ -0,0 +1,63 @@
+"""
+Tests for the pre-fork production server mode (gunicorn.conf.py)
+"""
+
+import time
+
+import pytest
+import requests
+
+pytest.importorskip("gunicorn")
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.server_load import ProductionServer
+
+
+@pytest.fixture(scope="module")
+def fixtures():
+    with FixtureServer(sizes=['small']) as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def server():
+    with ProductionServer(workers=2, threads=2) as server:
+        yield server
+
+
+def test_workers_share_the_cache_tier(server, fixtures):
+    url = fixtures.url('/page/small/1')
+    first = requests.post(server.url('/api/summarize'), json={'url': url}).json()
+    assert first['success'] and first['cache_status'] == 'miss'
+
+    # Whichever worker answers, the entry comes from the shared SQLite tier
+    statuses = {requests.post(server.url('/api/summarize'), json={'url': url}).json()['cache_status']
+                for _ in range(8)}
+    assert statuses == {'hit'}
+
+
+def test_jobs_run_in_forked_workers(server, fixtures):
+    created = requests.post(server.url('/api/jobs'), json={'url': fixtures.url('/page/small/2')}).json()
+    job = requests.get(server.url(f"/api/jobs/{created['job_id']}?wait=20")).json()['job']
+    assert job['status'] == 'done' and job['result']['success']
+
+
+def test_metrics_sum_all_workers(server):
+    for _ in range(20):
+        assert requests.get(server.url('/api/search?q=prefork')).status_code == 200
+    # Requests were spread over both workers; whichever one renders reports all
+    # of them once every worker has written its next snapshot
+    expected = 'blog_summarizer_stage_seconds_count{stage="search",host="all"} 20'
+    deadline = time.monotonic() + 15
+    while expected not in requests.get(server.url('/metrics')).text:
+        assert time.monotonic() < deadline
+        time.sleep(0.5)
+
+
+def test_graceful_reload_keeps_serving(server):
+    server.reload()
+    # Old workers finish in-flight requests while new ones are forked from the master
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        assert requests.get(server.url('/api/cache/stats')).status_code == 200
+    assert server.process.poll() is None
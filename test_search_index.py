@@ -0,0 +1,122 @@
+"""
+Tests for the keyword inverted index and search API
+"""
+
+import threading
+
+import app as app_module
+import search_index
+from search_index import SearchIndex, query_terms
+
+
+def test_ranking_and_incremental_updates():
+    index = SearchIndex()
+    index.add("https://blog.example/python", "Python", "python python python flask web")
+    index.add("https://blog.example/rust", "Rust", "python rust rust rust")
+    index.add("https://blog.example/food", "Food", "cooking recipes")
+
+    assert [r['title'] for r in index.search("python")] == ["Python", "Rust"]
+    assert [r['title'] for r in index.search("rust python")] == ["Rust", "Python"]
+    assert index.search("the unknown") == []
+    assert len(index.search("python", k=1)) == 1
+
+    # Re-indexing a URL replaces its postings
+    index.add("https://blog.example/python", "Cooking now", "cooking cooking")
+    assert [r['title'] for r in index.search("python")] == ["Rust"]
+    assert index.search("cooking")[0]['title'] == "Cooking now"
+    assert len(index) == 3
+
+
+def test_segment_persists_and_masks_reindexed_docs(tmp_path):
+    path = str(tmp_path / "search.idx")
+    index = SearchIndex(path, compact_every=2)
+    index.add("https://a.example/1", "One", "python python python")
+    index.add("https://a.example/2", "Two", "python rust")
+    index.wait_for_compaction()
+    assert index.segment is not None and index.segment.n_docs == 2
+
+    index.add("https://a.example/1", "One v2", "rust rust")
+    assert [r['title'] for r in index.search("python")] == ["Two"]
+    assert [r['title'] for r in index.search("rust")] == ["One v2", "Two"]
+    index.close()
+
+    reopened = SearchIndex(path)
+    assert len(reopened) == 2
+    assert [r['title'] for r in reopened.search("rust")] == ["One v2", "Two"]
+    assert [r['url'] for r in reopened.search("python")] == ["https://a.example/2"]
+    reopened.close()
+
+
+def test_background_compaction_keeps_concurrent_changes(tmp_path, monkeypatch):
+    writing, release = threading.Event(), threading.Event()
+    write_segment = search_index.write_segment
+
+    def slow_write(*args):
+        writing.set()
+        release.wait(5)
+        write_segment(*args)
+
+    monkeypatch.setattr(search_index, 'write_segment', slow_write)
+    index = SearchIndex(str(tmp_path / "search.idx"), compact_every=2)
+    index.add("https://a.example/1", "One", "python python")
+    index.add("https://a.example/2", "Two", "python rust")
+    assert writing.wait(5)
+
+    # Searches and adds go on while the segment is being written
+    index.add("https://a.example/1", "One v2", "rust rust rust")
+    index.add("https://a.example/3", "Three", "python cooking")
+    assert [r['title'] for r in index.search("python")] == ["Two", "Three"]
+    release.set()
+    index.wait_for_compaction()
+
+    assert index.segment.n_docs == 2 and len(index) == 3
+    assert [r['title'] for r in index.search("python")] == ["Two", "Three"]
+    assert [r['title'] for r in index.search("rust")] == ["One v2", "Two"]
+    index.close()
+
+
+def test_processes_sharing_a_segment_keep_each_others_documents(tmp_path):
+    path = str(tmp_path / "search.idx")
+    # Two workers' indexes over one file, both opened before either wrote it
+    first, second = SearchIndex(path), SearchIndex(path)
+    first.add("https://a.example/1", "One", "python python")
+    second.add("https://b.example/2", "Two", "python rust")
+    first.compact()
+    second.add("https://a.example/1", "One v2", "rust rust rust")
+    second.compact()
+
+    # The second compaction merged into the file the first one wrote
+    assert [r['title'] for r in second.search("rust")] == ["One v2", "Two"]
+    assert [r['title'] for r in second.search("python")] == ["Two"]
+    first.refresh()
+    assert [r['title'] for r in first.search("rust")] == ["One v2", "Two"]
+    first.close()
+    second.close()
+    assert len(SearchIndex(path)) == 2
+
+
+def test_query_terms_match_indexing():
+    assert query_terms("The Python, python and RUST!") == ['python', 'rust']
+    assert query_terms("انٹرنیٹ کا استعمال") == ['انٹرنیٹ', 'استعمال']
+
+
+def test_indexes_urdu_documents():
+    index = SearchIndex()
+    index.add("https://blog.example/ur", "انٹرنیٹ",
+              "پاکستان میں انٹرنیٹ کا استعمال تیزی سے بڑھ رہا ہے اور لوگ انٹرنیٹ پر کاروبار کر رہے ہیں۔")
+    index.add("https://blog.example/en", "Python", "python flask python")
+    assert [r['url'] for r in index.search("انٹرنیٹ")] == ["https://blog.example/ur"]
+    assert [r['url'] for r in index.search("python")] == ["https://blog.example/en"]
+
+
+def test_search_endpoint(monkeypatch):
+    index = SearchIndex()
+    index.add("https://blog.example/python", "Python", "python flask")
+    monkeypatch.setattr(app_module, 'search_index', index)
+    client = app_module.app.test_client()
+
+    data = client.get('/api/search?q=flask').get_json()
+    assert data['success'] and data['results'][0]['url'] == "https://blog.example/python"
+    assert data['total_documents'] == 1
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search?q=flask&k=x').status_code == 400
@@ -0,0 +1,126 @@
+"""
+Tests for the blog_summaries storage layer and batched writer
+"""
+
+import threading
+
+from app import AISummarizer
+from cache import SummaryCache
+from storage import (SQLiteSummaryStore, SummaryWriter, create_summary_store, summary_row,
+                     MAX_COMPRESSION_RATIO)
+
+CONTENT = ("Persisting summaries means a restarted server does not scrape again. "
+           "Batched upserts keep the database round trips per request low.")
+
+
+class CountingStore(SQLiteSummaryStore):
+    """SQLite store that records the size of every upsert batch."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.batches = []
+
+    def upsert_many(self, rows):
+        self.batches.append(len(rows))
+        super().upsert_many(rows)
+
+
+def scrape(url, validators=None):
+    scrape.calls += 1
+    return {'success': True, 'url': url, 'title': 'Post', 'content': CONTENT,
+            'word_count': len(CONTENT.split()), 'char_count': len(CONTENT)}
+
+
+def test_upsert_batches_and_coalesces(tmp_path):
+    store = CountingStore(str(tmp_path / "summaries.db"))
+    writer = SummaryWriter(store, batch_size=1000, flush_interval=60)
+    summary = AISummarizer().generate_summary('Post', CONTENT)
+    response = {'title': 'Post', 'summary': summary['summary'], 'keywords': summary['keywords'],
+                'key_points': summary['key_points'], 'content_stats': {'word_count': 20},
+                'analysis': summary}
+
+    for i in range(50):
+        writer.add(f"https://example.com/{i}", response)
+    writer.add("https://example.com/0", dict(response, title='Updated'))
+    assert writer.pending() == 50
+    assert writer.lookup("https://EXAMPLE.com/0")['title'] == 'Updated'
+
+    writer.close()
+    assert store.batches == [50]
+    rows = store.fetch(["https://example.com/0", "https://example.com/49"])
+    assert rows["https://example.com/0"]['title'] == 'Updated'
+    assert rows["https://example.com/49"]['keywords'] == summary['keywords']
+
+    # Re-upserting an existing URL updates it in place
+    store.upsert_many([dict(rows["https://example.com/0"], title='Again')])
+    assert store.fetch(["https://example.com/0"])["https://example.com/0"]['title'] == 'Again'
+
+
+def test_batch_size_triggers_flush(tmp_path):
+    store = CountingStore(str(tmp_path / "summaries.db"))
+    writer = SummaryWriter(store, batch_size=5, flush_interval=60)
+    flushed = threading.Event()
+    original = store.upsert_many
+    store.upsert_many = lambda rows: (original(rows), flushed.set())
+    response = {'title': 'Post', 'summary': 'S', 'keywords': [], 'key_points': [],
+                'content_stats': {'word_count': 1},
+                'analysis': {'summary_length': 1, 'compression_ratio': 1.0}}
+    for i in range(5):
+        writer.add(f"https://example.com/{i}", response)
+    assert flushed.wait(5)
+    writer.close()
+    assert store.batches == [5]
+
+
+def test_stored_summary_skips_scraping(tmp_path):
+    path = str(tmp_path / "summaries.db")
+    scrape.calls = 0
+
+    writer = SummaryWriter(create_summary_store(f"sqlite:///{path}"), flush_interval=60)
+    first = SummaryCache(store=writer).get_or_compute(
+        "https://example.com/post", 150, scrape, AISummarizer().generate_summary)
+    assert first['cache_status'] == 'miss'
+    writer.close()
+
+    # A fresh process: empty cache, same table
+    writer = SummaryWriter(create_summary_store(path), flush_interval=60)
+    cache = SummaryCache(store=writer)
+    second = cache.get_or_compute("https://example.com/post", 150, scrape, AISummarizer().generate_summary)
+    assert second['cache_status'] == 'stored'
+    # The stored row rebuilds the whole response, engine and language included
+    assert dict(second, cache_status=None) == dict(first, cache_status=None)
+    assert scrape.calls == 1
+    assert cache.get_or_compute("https://example.com/post", 150, scrape,
+                                AISummarizer().generate_summary)['cache_status'] == 'hit'
+
+    # Other lengths are not stored, so they scrape
+    other = cache.get_or_compute("https://example.com/post", 60, scrape, AISummarizer().generate_summary)
+    assert other['cache_status'] == 'miss'
+    assert scrape.calls == 2
+    writer.close()
+    assert writer.pending() == 0
+
+
+def test_failing_rows_are_dropped_after_max_attempts(tmp_path):
+    store = CountingStore(str(tmp_path / "summaries.db"))
+    writer = SummaryWriter(store, flush_interval=60, max_attempts=3)
+    store.upsert_many = lambda rows: 1 / 0
+    response = {'title': 'Post', 'summary': 'S', 'keywords': [], 'key_points': [],
+                'content_stats': {'word_count': 1},
+                'analysis': {'summary_length': 1, 'compression_ratio': 1.0}}
+    writer.add("https://example.com/a", response)
+    assert writer.flush() == 0 and writer.flush() == 0
+    writer.add("https://example.com/b", response)
+    assert writer.flush() == 0
+    # 'a' has failed three times and is gone; 'b' is retried
+    assert writer.pending() == 1 and writer.lookup("https://example.com/b") is not None
+    writer.close()
+    assert writer.pending() == 0
+
+
+def test_compression_ratio_fits_the_column():
+    response = {'title': 'Post', 'summary': 'S', 'keywords': [], 'key_points': [],
+                'content_stats': {'word_count': 1}, 'analysis': {'summary_length': 5}}
+    for ratio, stored in ((1234.567, MAX_COMPRESSION_RATIO), (-1.0, 0.0), (float('nan'), 0.0), (12.346, 12.35)):
+        response['analysis']['compression_ratio'] = ratio
+        assert summary_row("https://example.com/", response)['compression_ratio'] == stored
@@ -0,0 +1,159 @@
+"""
+Tests for the streaming, size-capped fetch mode against a local HTTP server
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app import BlogScraper
+from extractor import StreamingExtraction, extract
+
+ARTICLE = ("<html><head><meta charset='utf-8'><title>Streamed Café</title></head><body>"
+           "<nav>menu</nav><article>" + "<p>Streaming keeps memory flat.</p>\n" * 2000
+           + "</article></body></html>").encode('utf-8')
+
+UTF16_ARTICLE = ("<html><head><title>Wide Café</title></head><body><article>"
+                 + "<p>UTF-16 pages are full of NUL bytes.</p>\n" * 20
+                 + "</article></body></html>")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/pdf':
+            self._send(b'%PDF-1.7 binary', 'application/pdf')
+        elif self.path == '/untyped-binary':
+            self._send(b'\x89PNG\r\n\x1a\n' + b'\x00' * 64, None)
+        elif self.path == '/slow':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(ARTICLE)))
+            self.end_headers()
+            for start in range(0, len(ARTICLE), 512):
+                self.wfile.write(ARTICLE[start:start + 512])
+                self.wfile.flush()
+                time.sleep(0.05)
+        elif self.path == '/stall':
+            # Part of the body, then nothing until long after any test deadline
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(ARTICLE)))
+            self.end_headers()
+            self.wfile.write(ARTICLE[:2048])
+            self.wfile.flush()
+            time.sleep(3)
+        elif self.path == '/utf-16':
+            self._send(UTF16_ARTICLE.encode('utf-16'), 'text/html')
+        elif self.path == '/utf-16le':
+            self._send(UTF16_ARTICLE.encode('utf-16-le'), 'text/html; charset=utf-16le')
+        else:
+            self._send(ARTICLE, 'text/html; charset=utf-8')
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_streaming_matches_buffered_result():
+    server, base = serve()
+    try:
+        buffered = BlogScraper().scrape_blog_content(base + '/post')
+        streamed = BlogScraper(streaming=True).scrape_blog_content(base + '/post')
+    finally:
+        server.shutdown()
+
+    download = streamed.pop('download')
+    assert streamed == buffered
+    assert download == {'bytes': len(ARTICLE), 'truncated': False, 'abort_reason': None}
+
+
+def test_byte_budget_truncates_and_reports():
+    server, base = serve()
+    try:
+        result = BlogScraper(streaming=True, max_bytes=10000).scrape_blog_content(base + '/post')
+    finally:
+        server.shutdown()
+
+    assert result['success'] and result['title'] == 'Streamed Café'
+    assert result['download'] == {'bytes': 10000, 'truncated': True, 'abort_reason': 'max_bytes'}
+
+
+def test_deadline_aborts_slow_transfer():
+    server, base = serve()
+    try:
+        started = time.monotonic()
+        result = BlogScraper(streaming=True, deadline=0.3).scrape_blog_content(base + '/slow')
+        elapsed = time.monotonic() - started
+    finally:
+        server.shutdown()
+
+    assert result['download']['abort_reason'] == 'deadline'
+    assert elapsed < 2
+
+
+def test_deadline_caps_a_stalled_read():
+    server, base = serve()
+    try:
+        started = time.monotonic()
+        result = BlogScraper(streaming=True, deadline=0.5).scrape_blog_content(base + '/stall')
+        elapsed = time.monotonic() - started
+    finally:
+        server.shutdown()
+
+    assert result['download'] == {'bytes': 2048, 'truncated': True, 'abort_reason': 'deadline'}
+    # The read is cut off at the deadline, not after the server's 3 s stall
+    assert elapsed < 1.5
+
+
+def test_utf16_html_is_not_mistaken_for_binary():
+    server, base = serve()
+    scraper = BlogScraper(streaming=True)
+    try:
+        with_bom = scraper.scrape_blog_content(base + '/utf-16')
+        declared = scraper.scrape_blog_content(base + '/utf-16le')
+    finally:
+        server.shutdown()
+
+    for result in (with_bom, declared):
+        assert result['success'] and result['title'] == 'Wide Café'
+        assert 'full of NUL bytes' in result['content']
+
+
+def test_non_html_rejected_before_download():
+    server, base = serve()
+    scraper = BlogScraper(streaming=True)
+    try:
+        pdf = scraper.scrape_blog_content(base + '/pdf')
+        untyped = scraper.scrape_blog_content(base + '/untyped-binary')
+    finally:
+        server.shutdown()
+
+    assert pdf == {'success': False, 'error': 'Unsupported content type: application/pdf'}
+    assert untyped['success'] is False
+
+
+def test_incremental_extraction_matches_whole_document():
+    for engine in ('lxml', 'html.parser'):
+        extraction = StreamingExtraction(engine)
+        for start in range(0, len(ARTICLE), 1000):
+            extraction.feed(ARTICLE[start:start + 1000])
+        assert extraction.close() == extract(ARTICLE, engine)
@@ -0,0 +1,71 @@
+"""
+Tests that the top-k keyword and key-point paths match the original full sorts
+"""
+
+import random
+import re
+
+import pytest
+
+import normalize
+import text_analysis
+from text_analysis import STOP_WORDS, top_keywords, top_key_points, batch_top_keywords
+
+VOCABULARY = "ai data model learning the of system health patient image drug it they risk".split()
+
+
+def reference_keywords(text):
+    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
+    word_freq = {}
+    for word in words:
+        if word not in STOP_WORDS:
+            word_freq[word] = word_freq.get(word, 0) + 1
+    return [word for word, freq in sorted(word_freq.items(), key=lambda x: x[1], reverse=True)]
+
+
+def reference_key_points(sentences):
+    scored = []
+    for i, sentence in enumerate(sentences):
+        score = 2 if i < len(sentences) * 0.3 else 0
+        if 10 <= len(sentence.split()) <= 30:
+            score += 1
+        scored.append((sentence, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [sentence for sentence, score in scored[:5]]
+
+
+def random_documents(count, seed=7):
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        sentences = [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 40)))
+                     for _ in range(rng.randint(0, 60))]
+        documents.append(sentences)
+    return documents
+
+
+def test_top_keywords_matches_full_sort():
+    for sentences in random_documents(50):
+        text = ". ".join(sentences)
+        assert top_keywords(text, 10) == reference_keywords(text)[:10]
+        assert top_keywords(text) == reference_keywords(text)
+
+
+def test_windowed_keyword_counts_match_full_sort(monkeypatch):
+    monkeypatch.setattr(normalize, 'WINDOW_CHARS', 11)
+    monkeypatch.setattr(text_analysis, 'WINDOW_CHARS', 11)
+    for sentences in random_documents(20):
+        text = ". ".join(sentences)
+        assert top_keywords(text) == reference_keywords(text)
+
+
+def test_top_key_points_matches_full_sort():
+    for sentences in random_documents(50):
+        assert top_key_points(sentences, 5) == reference_key_points(sentences)
+
+
+def test_batch_keywords_match_single_documents():
+    pytest.importorskip('numpy')
+    texts = [". ".join(sentences) for sentences in random_documents(30)] + ["", "the and it"]
+    assert batch_top_keywords(texts, 10) == [top_keywords(text, 10) for text in texts]
+    assert batch_top_keywords([]) == []
@@ -0,0 +1,28 @@
+"""
+Tests for the offline English to Urdu phrase-table translation
+"""
+
+from translation import phrase_table, translate_to_urdu
+
+
+def test_longest_phrase_wins_and_unknown_words_are_kept():
+    table, longest = phrase_table()
+    assert table['the'] == '' and longest >= 4
+
+    assert translate_to_urdu("The main insight is: the team made the server faster.") == \
+        "اہم نکتہ یہ ہے: ٹیم بنایا سرور تیز تر۔"
+    assert translate_to_urdu("This content covers Kubernetes, data, security?") == \
+        "یہ مواد احاطہ کرتا ہے Kubernetes، ڈیٹا، سلامتی؟"
+    # A quoted title is kept as it is, apostrophes and all
+    assert translate_to_urdu("This content covers 'Caching in Python', don't wait.").startswith(
+        "یہ مواد احاطہ کرتا ہے 'Caching in Python'، ")
+    assert "'Don't panic'" in translate_to_urdu("This content covers 'Don't panic'.")
+
+
+def test_phrases_do_not_span_punctuation(tmp_path):
+    path = tmp_path / "table.tsv"
+    path.write_text("# comment\nmachine learning\tمشین لرننگ\nmachine\tمشین\nlearning\tسیکھنا\n",
+                    encoding='utf-8')
+    assert translate_to_urdu("Machine  learning", str(path)) == "مشین لرننگ"
+    assert translate_to_urdu("machine. Learning", str(path)) == "مشین۔ سیکھنا"
+    assert translate_to_urdu("", str(path)) == ""
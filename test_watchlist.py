@@ -0,0 +1,207 @@
+"""
+Tests for watched URLs, incremental re-summarization and the change feed
+"""
+
+import json
+import random
+
+import pytest
+
+import app as app_module
+from ai_summarizer import AISummarizer
+from batch import format_result
+from incremental import DocumentAnalysis
+from normalize import split_sentences
+from text_analysis import top_keywords
+from watchlist import WatchList, MemoryWatchStore, SQLiteWatchStore, watch_id
+
+WORDS = ("search index cache latency python server summary keyword crawler parser "
+         "feed update change sentence document article release benchmark").split()
+
+
+def paragraph(rng, sentences):
+    return ' '.join(
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))).capitalize() + rng.choice('.!?')
+        for _ in range(sentences)
+    )
+
+
+def edit(rng, content):
+    """Replace, insert and delete a few sentences."""
+    sentences = split_sentences(content)
+    for _ in range(3):
+        i = rng.randrange(len(sentences))
+        action = rng.choice(('replace', 'insert', 'delete'))
+        if action == 'replace':
+            sentences[i] = paragraph(rng, 1)
+        elif action == 'insert':
+            sentences.insert(i, paragraph(rng, 1))
+        elif len(sentences) > 2:
+            del sentences[i]
+    return ' '.join(sentences)
+
+
+class VersionedScraper:
+    """Offline scraper serving the current version of each page, with ETags."""
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+
+    def scrape_blog_content(self, url, validators=None):
+        self.requests.append((url, validators))
+        content = self.pages.get(url)
+        if content is None:
+            return {'success': False, 'error': 'Failed to fetch URL: 404'}
+        etag = f'"{hash(content)}"'
+        if validators and validators.get('etag') == etag:
+            return {'success': True, 'url': url, 'not_modified': True, 'etag': etag}
+        return {
+            'success': True, 'url': url, 'title': 'Release notes', 'content': content,
+            'word_count': len(content.split()), 'char_count': len(content), 'etag': etag
+        }
+
+
+def test_incremental_analysis_matches_full_recompute():
+    rng = random.Random(7)
+    content = paragraph(rng, 60)
+    analysis = DocumentAnalysis(content)
+    for _ in range(20):
+        content = edit(rng, content)
+        diff = analysis.update(content)
+        assert diff['rescored'] <= 6
+        assert list(analysis.sentences) == split_sentences(content)
+        assert analysis.top_keywords(10) == top_keywords(content, 10)
+
+
+def test_check_publishes_initial_and_changed_events():
+    rng = random.Random(3)
+    url = "https://blog.example/notes"
+    scraper = VersionedScraper()
+    scraper.pages[url] = paragraph(rng, 30)
+    summarizer = AISummarizer()
+    watches = WatchList(scraper, summarizer)
+    watch, created = watches.add(url, interval=600)
+    assert created
+
+    first = watches.check(watch['id'])
+    assert first['type'] == 'initial' and first['diff'] is None
+    assert first['result'] == format_result(scraper.scrape_blog_content(url),
+                                            summarizer.generate_summary('Release notes', scraper.pages[url]))
+
+    # Same ETag: a 304 reschedules without publishing anything
+    assert watches.check(watch['id']) is None
+    assert scraper.requests[-1][1]['etag'] is not None
+
+    old = scraper.pages[url]
+    scraper.pages[url] = old + " Version two adds a brand new streaming parser for feeds."
+    changed = watches.check(watch['id'])
+    assert changed['type'] == 'changed' and changed['sequence'] == first['sequence'] + 1
+    assert changed['diff']['added'] == ["Version two adds a brand new streaming parser for feeds"]
+    assert changed['diff']['removed'] == [] and changed['diff']['rescored'] <= 2
+    assert changed['previous_summary'] == first['result']['summary']
+    assert changed['result']['keywords'] == summarizer.generate_summary(
+        'Release notes', scraper.pages[url])['keywords']
+
+    stored = watches.get(watch['id'])
+    assert stored['checks'] == 3 and stored['changes'] == 2
+    assert [event['sequence'] for event in watches.events(first['sequence'])] == [changed['sequence']]
+
+
+def test_failed_checks_back_off():
+    now = [1000.0]
+    watches = WatchList(VersionedScraper(), AISummarizer(), clock=lambda: now[0])
+    watch, _ = watches.add("https://blog.example/missing", interval=100)
+
+    watches.check(watch['id'])
+    assert watches.get(watch['id'])['next_check'] == 1200.0
+    watches.check(watch['id'])
+    assert watches.get(watch['id'])['next_check'] == 1400.0
+    assert watches.get(watch['id'])['errors'] == 2
+
+    with pytest.raises(ValueError):
+        watches.add("https://blog.example/fast", interval=1)
+    with pytest.raises(ValueError):
+        watches.add("not a url")
+    for interval in (float('nan'), float('inf')):
+        with pytest.raises(ValueError):
+            watches.add("https://blog.example/never", interval=interval)
+
+
+def test_scheduler_polls_due_watches():
+    url = "https://blog.example/live"
+    scraper = VersionedScraper()
+    scraper.pages[url] = paragraph(random.Random(1), 10)
+    watches = WatchList(scraper, AISummarizer(), poll_interval=0.02, min_interval=0.05).start()
+    try:
+        watches.add(url, interval=0.05)
+        assert [event['type'] for event in watches.wait_events(0, 5)] == ['initial']
+
+        scraper.pages[url] += " A late correction was added."
+        events = watches.wait_events(1, 5)
+        assert events[0]['type'] == 'changed'
+        assert events[0]['diff']['added'] == ["A late correction was added"]
+    finally:
+        watches.shutdown()
+
+
+def test_processes_share_the_store_and_elect_one_scheduler(tmp_path):
+    path = str(tmp_path / "watch.sqlite3")
+    url = "https://blog.example/shared"
+    scraper = VersionedScraper()
+    scraper.pages[url] = paragraph(random.Random(2), 10)
+    first = WatchList(scraper, AISummarizer(), SQLiteWatchStore(path), lock_path=path + ".lock")
+    second = WatchList(scraper, AISummarizer(), SQLiteWatchStore(path), lock_path=path + ".lock")
+    try:
+        assert first._hold_scheduler_lock()
+        assert not second._hold_scheduler_lock()
+
+        first.add(url, interval=600)
+        assert second.stats()['watches'] == second.store.count() == 1
+        event = second.check(watch_id(url))
+        assert first.events(0) == [event]
+
+        # The first process rebuilds its analysis from the stored content
+        scraper.pages[url] += " Appended sentence for the shared store."
+        changed = first.check(watch_id(url))
+        assert changed['diff']['added'] == ["Appended sentence for the shared store"]
+        assert second.last_sequence() == changed['sequence'] == 2
+    finally:
+        first.shutdown()
+        second.shutdown()
+        first.store.close()
+        second.store.close()
+
+
+def test_watch_api_and_feed(monkeypatch):
+    url = "https://blog.example/api"
+    scraper = VersionedScraper()
+    scraper.pages[url] = paragraph(random.Random(4), 10)
+    watches = WatchList(scraper, AISummarizer(), MemoryWatchStore())
+    monkeypatch.setattr(app_module, 'watch_list', watches)
+    client = app_module.app.test_client()
+
+    response = client.post('/api/watch', json={'url': url, 'interval': 300})
+    created = response.get_json()
+    assert response.status_code == 201
+    assert created['success'] and created['watch']['interval'] == 300
+    assert client.post('/api/watch', json={'url': url, 'interval': 5}).status_code == 400
+    assert client.post('/api/watch', json={'url': url, 'interval': 'nan'}).status_code == 400
+    # Posting a watched URL again updates it in place
+    updated = client.post('/api/watch', json={'url': url, 'interval': 300})
+    assert updated.status_code == 200 and updated.get_json()['watch']['id'] == created['watch']['id']
+    watches.check(created['watch']['id'])
+
+    lines = client.get('/api/watch/feed').get_data(as_text=True).splitlines()
+    assert [json.loads(line)['type'] for line in lines] == ['initial']
+
+    response = client.get('/api/watch/feed', headers={'Accept': 'text/event-stream'})
+    assert response.mimetype == 'text/event-stream'
+    assert response.get_data(as_text=True).startswith("id: 1\nevent: change\ndata: ")
+    assert client.get('/api/watch/feed', headers={'Last-Event-ID': '1'}).get_data() == b''
+
+    listed = client.get('/api/watch').get_json()
+    assert listed['stats']['watches'] == watches.store.count() == 1
+    assert listed['watches'][0]['summary']['success'] and 'content' not in listed['watches'][0]
+    assert client.delete(f"/api/watch/{created['watch']['id']}").get_json()['success']
+    assert client.get(f"/api/watch/{created['watch']['id']}").status_code == 404
@@ -0,0 +1,130 @@
+"""
+Text Analysis
+Keyword and key-point scoring for AISummarizer using Counter/heap top-k
+selection, plus a NumPy-backed batch path for scoring many documents at once.
+"""
+
+import re
+from collections import Counter
+
+from normalize import WINDOW_CHARS, iter_windows
+
+# Common stop words to exclude from keywords
+STOP_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have',
+    'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
+    'this', 'that', 'these', 'those', 'it', 'they', 'them', 'their'
+])
+
+KEYWORD_PATTERN = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# Key point scoring (see top_key_points)
+LEAD_FRACTION = 0.3
+MIN_POINT_WORDS = 10
+MAX_POINT_WORDS = 30
+
+
+def keyword_counts(text, pattern=KEYWORD_PATTERN, stop_words=STOP_WORDS):
+    """
+    Count candidate keywords, in order of first occurrence.
+
+    Long texts are lowercased and matched a window at a time (see
+    normalize.iter_windows), so the list of matched words stays small.
+    Other languages pass their own token ``pattern`` and ``stop_words``
+    (see languages).
+    """
+    if len(text) <= WINDOW_CHARS:
+        counts = Counter(pattern.findall(text.lower()))
+    else:
+        counts = Counter()
+        for window in iter_windows(text):
+            counts.update(pattern.findall(window.lower()))
+    for word in stop_words.intersection(counts):
+        del counts[word]
+    return counts
+
+
+def top_keywords(text, k=None):
+    """
+    Return the most frequent non-stop-words.
+
+    Ties keep first-occurrence order, exactly like a stable sort of the whole
+    vocabulary, but only the top ``k`` are selected (heap, O(n log k)).
+
+    Args:
+        text (str): Document text
+        k (int): Number of keywords to return, or None for all
+    """
+    return [word for word, count in keyword_counts(text).most_common(k)]
+
+
+def top_key_points(sentences, k=5):
+    """
+    Pick the top ``k`` sentences by position and length score.
+
+    Sentences in the leading 30% score 2, sentences of 10-30 words score 1
+    more; ties keep document order. Scores only take four values, so
+    sentences are bucketed instead of sorted, and the scan stops as soon as
+    the remaining sentences can no longer make the cut.
+    """
+    buckets = ([], [], [], [])
+    lead = len(sentences) * LEAD_FRACTION
+
+    for i, sentence in enumerate(sentences):
+        in_lead = i < lead
+        if in_lead:
+            if len(buckets[3]) >= k:
+                break
+        elif len(buckets[3]) + len(buckets[2]) + len(buckets[1]) >= k:
+            break
+
+        score = 2 if in_lead else 0
+        if MIN_POINT_WORDS <= len(sentence.split()) <= MAX_POINT_WORDS:
+            score += 1
+        if len(buckets[score]) < k:
+            buckets[score].append(sentence)
+
+    return (buckets[3] + buckets[2] + buckets[1] + buckets[0])[:k]
+
+
+def batch_top_keywords(texts, k=10):
+    """
+    Score many documents' term frequencies at once with NumPy.
+
+    Terms are counted per document in C (Counter) and laid out as one flat,
+    CSR-style term-frequency table for the whole batch; every document's
+    terms are then ranked with a single stable lexsort. Results are identical
+    to calling top_keywords on each document. Requires numpy.
+
+    Args:
+        texts (list): Document texts
+        k (int): Keywords per document
+
+    Returns:
+        list: One keyword list per input document
+    """
+    import numpy as np
+
+    words = []
+    counts = []
+    doc_sizes = []
+    for text in texts:
+        doc_counts = keyword_counts(text)
+        words.extend(doc_counts)
+        counts.extend(doc_counts.values())
+        doc_sizes.append(len(doc_counts))
+
+    sizes = np.array(doc_sizes, dtype=np.int64)
+    docs = np.repeat(np.arange(len(texts), dtype=np.int64), sizes)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1])) if len(texts) else sizes
+
+    # Stable sort: by document, then highest count; ties keep first occurrence
+    order = np.lexsort((-np.array(counts, dtype=np.int64), docs))
+    ranked_docs = docs[order]
+    keep = order[np.arange(len(order)) - starts[ranked_docs] < k]
+
+    results = [[] for _ in texts]
+    for doc, index in zip(docs[keep].tolist(), keep.tolist()):
+        results[doc].append(words[index])
+    return results
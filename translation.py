@@ -0,0 +1,97 @@
+"""
+Offline Translation
+English to Urdu translation of summaries for the summary_urdu column, with
+no network service: a phrase table (data/en_ur.tsv) replaces the longest
+known phrase at each position, unknown words (names) and quoted spans
+(titles) are kept as they are and punctuation is mapped to its Urdu form. Word order stays
+English, so the output is a gloss rather than a fluent translation.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+PHRASE_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'en_ur.tsv')
+
+_WORD = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+
+# A single-quoted span such as the title in "This article titled '...'";
+# quotes next to a letter are apostrophes, not quotes
+_QUOTED = re.compile(r"(?<![A-Za-z])'.+?'(?![A-Za-z])")
+
+_PUNCTUATION = str.maketrans({'.': '۔', ',': '،', '?': '؟', ';': '؛'})
+
+
+@lru_cache(maxsize=None)
+def phrase_table(path=PHRASE_TABLE_PATH):
+    """
+    Load a phrase table, once per path.
+
+    Returns:
+        tuple: ({lowercased English phrase: Urdu text}, words in the longest phrase)
+    """
+    table = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            english, _, urdu = line.partition('\t')
+            table[' '.join(english.lower().split())] = urdu.strip()
+    longest = max((phrase.count(' ') + 1 for phrase in table), default=1)
+    return table, longest
+
+
+def translate_to_urdu(text, path=PHRASE_TABLE_PATH):
+    """
+    Translate English text to Urdu with the phrase table.
+
+    Phrases only match words separated by whitespace, so a comma or a
+    full stop always ends a phrase. Single-quoted spans (titles) are
+    copied unchanged.
+
+    Args:
+        text (str): English text (e.g. a summary)
+        path (str): Phrase table to use
+
+    Returns:
+        str: The Urdu text, whitespace collapsed to single spaces
+    """
+    table, longest = phrase_table(path)
+    parts = []
+    position = 0
+    for quoted in _QUOTED.finditer(text):
+        parts.append(_translate_span(text[position:quoted.start()], table, longest))
+        parts.append(quoted.group())
+        position = quoted.end()
+    parts.append(_translate_span(text[position:], table, longest))
+    # Dropped words leave double spaces behind
+    return ' '.join(''.join(parts).split())
+
+
+def _translate_span(text, table, longest):
+    """Translate text that has no quoted span, whitespace kept as it is."""
+    words = list(_WORD.finditer(text))
+    parts = []
+    position = 0
+    i = 0
+    while i < len(words):
+        # Longest run of words from here that could form a phrase
+        span = 1
+        while (span < longest and i + span < len(words)
+               and text[words[i + span - 1].end():words[i + span].start()].isspace()):
+            span += 1
+
+        for size in range(span, 0, -1):
+            urdu = table.get(' '.join(match.group().lower() for match in words[i:i + size]))
+            if urdu is not None:
+                break
+        else:
+            size, urdu = 1, words[i].group()
+
+        parts.append(text[position:words[i].start()].translate(_PUNCTUATION))
+        parts.append(urdu)
+        position = words[i + size - 1].end()
+        i += size
+    parts.append(text[position:].translate(_PUNCTUATION))
+    return ''.join(parts)
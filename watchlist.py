@@ -0,0 +1,537 @@
+"""
+Watch List
+Re-polls watched URLs on a schedule with conditional GETs. A page that
+changed is diffed against its previous version sentence by sentence (see
+incremental.DocumentAnalysis), re-summarized from the updated keyword counts
+and published to a change feed that clients follow as NDJSON or
+server-sent events.
+"""
+
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from metrics import registry as metrics, host_of
+from cache import content_hash, normalize_url
+from batch import format_result
+from incremental import DocumentAnalysis
+
+DEFAULT_INTERVAL = 60 * 60
+MIN_INTERVAL = 60
+MAX_BACKOFF = 24 * 60 * 60
+DEFAULT_CHECK_WORKERS = 4
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_FEED_SIZE = 10000
+DEFAULT_ANALYSIS_CACHE = 512
+MAX_FEED_BATCH = 500
+LOCK_RETRY_INTERVAL = 5.0
+
+
+def watch_id(url):
+    """Stable id of a watched URL; equivalent spellings share one watch."""
+    return content_hash(normalize_url(url))[:16]
+
+
+def new_watch(url, interval, target_length, engine, now):
+    """Create a watch record, due for its first check immediately."""
+    return {
+        'id': watch_id(url),
+        'url': url,
+        'interval': interval,
+        'target_length': target_length,
+        'engine': engine,
+        'title': None,
+        'etag': None,
+        'last_modified': None,
+        'content_hash': None,
+        'content': None,
+        'summary': None,
+        'next_check': now,
+        'last_checked': None,
+        'last_changed': None,
+        'checks': 0,
+        'changes': 0,
+        'errors': 0,
+        'last_error': None,
+        'created_at': now
+    }
+
+
+class MemoryWatchStore:
+    """Keeps watches and the change feed in memory; lost when the process exits."""
+
+    def __init__(self, feed_size=DEFAULT_FEED_SIZE):
+        self._watches = {}
+        self._events = deque(maxlen=feed_size)
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def add(self, watch):
+        with self._lock:
+            self._watches[watch['id']] = dict(watch)
+
+    def remove(self, watch_id):
+        with self._lock:
+            return self._watches.pop(watch_id, None) is not None
+
+    def get(self, watch_id):
+        with self._lock:
+            watch = self._watches.get(watch_id)
+            return dict(watch) if watch else None
+
+    def list(self):
+        with self._lock:
+            return sorted((dict(watch) for watch in self._watches.values()),
+                          key=lambda watch: watch['created_at'])
+
+    def count(self):
+        with self._lock:
+            return len(self._watches)
+
+    def update(self, watch_id, **fields):
+        with self._lock:
+            watch = self._watches.get(watch_id)
+            if watch is None:
+                return None
+            watch.update(fields)
+            return dict(watch)
+
+    def due(self, now, limit):
+        with self._lock:
+            due = [watch for watch in self._watches.values() if watch['next_check'] <= now]
+            due.sort(key=lambda watch: watch['next_check'])
+            return [dict(watch) for watch in due[:limit]]
+
+    def append_event(self, event):
+        with self._lock:
+            self._sequence += 1
+            event = dict(event, sequence=self._sequence)
+            self._events.append(event)
+            return event
+
+    def events(self, since, limit):
+        with self._lock:
+            return [dict(event) for event in self._events if event['sequence'] > since][:limit]
+
+    def last_sequence(self):
+        with self._lock:
+            return self._sequence
+
+    def close(self):
+        pass
+
+
+class SQLiteWatchStore:
+    """
+    Keeps watches and the change feed in SQLite, shared by processes.
+
+    Each watch is one JSON document plus an indexed next_check column for
+    the scheduler; the feed keeps the newest feed_size events.
+    """
+
+    def __init__(self, path, feed_size=DEFAULT_FEED_SIZE):
+        self.path = path
+        self.feed_size = feed_size
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS watches ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, next_check REAL NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS watches_next_check ON watches (next_check)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS watch_events ("
+                "sequence INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, watch):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO watches (id, data, next_check, created_at) VALUES (?, ?, ?, ?)",
+                (watch['id'], json.dumps(watch), watch['next_check'], watch['created_at'])
+            )
+
+    def remove(self, watch_id):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM watches WHERE id = ?", (watch_id,)).rowcount > 0
+
+    def get(self, watch_id):
+        row = self._connect().execute("SELECT data FROM watches WHERE id = ?", (watch_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self):
+        rows = self._connect().execute("SELECT data FROM watches ORDER BY created_at").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM watches").fetchone()[0]
+
+    def update(self, watch_id, **fields):
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM watches WHERE id = ?", (watch_id,)).fetchone()
+            if row is None:
+                return None
+            watch = json.loads(row[0])
+            watch.update(fields)
+            conn.execute("UPDATE watches SET data = ?, next_check = ? WHERE id = ?",
+                         (json.dumps(watch), watch['next_check'], watch_id))
+            return watch
+
+    def due(self, now, limit):
+        rows = self._connect().execute(
+            "SELECT data FROM watches WHERE next_check <= ? ORDER BY next_check LIMIT ?", (now, limit)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def append_event(self, event):
+        with self._connect() as conn:
+            sequence = conn.execute("INSERT INTO watch_events (data) VALUES (?)",
+                                    (json.dumps(event),)).lastrowid
+            conn.execute("DELETE FROM watch_events WHERE sequence <= ?", (sequence - self.feed_size,))
+        return dict(event, sequence=sequence)
+
+    def events(self, since, limit):
+        rows = self._connect().execute(
+            "SELECT sequence, data FROM watch_events WHERE sequence > ? ORDER BY sequence LIMIT ?",
+            (since, limit)
+        ).fetchall()
+        return [dict(json.loads(data), sequence=sequence) for sequence, data in rows]
+
+    def last_sequence(self):
+        row = self._connect().execute("SELECT MAX(sequence) FROM watch_events").fetchone()
+        return row[0] or 0
+
+    def close(self):
+        """Close this thread's connection; the next call opens a new one."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class WatchList:
+    """
+    Watched URLs, the scheduler that re-polls them and their change feed.
+
+    Every check is a conditional GET with the validators of the previous
+    fetch, so unchanged pages usually cost a 304 and no parsing at all. A
+    changed page is summarized from its DocumentAnalysis, which re-tokenizes
+    only the sentences that differ from the previous version; analyses of
+    recently changed pages are kept in a bounded LRU and rebuilt from the
+    stored content after a restart.
+
+    When several processes share one SQLiteWatchStore, pass the same
+    lock_path to all of them: only the process holding the lock schedules
+    checks, and another takes over if it exits.
+    """
+
+    def __init__(self, scraper, summarizer, store=None, workers=DEFAULT_CHECK_WORKERS,
+                 poll_interval=DEFAULT_POLL_INTERVAL, min_interval=MIN_INTERVAL,
+                 analysis_cache=DEFAULT_ANALYSIS_CACHE, lock_path=None, clock=time.time):
+        """
+        Args:
+            scraper: BlogScraper used for the conditional fetches
+            summarizer (AISummarizer): Summarizes changed pages
+            store: Watch store (MemoryWatchStore by default)
+            workers (int): Checks run concurrently
+            poll_interval (float): Seconds between scheduler passes
+            min_interval (float): Shortest re-poll interval a watch may ask for
+            analysis_cache (int): Document analyses kept in memory
+            lock_path (str): Lock file electing one scheduler among processes
+            clock (callable): Time source, for tests
+        """
+        self.scraper = scraper
+        self.summarizer = summarizer
+        self.store = store or MemoryWatchStore()
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.min_interval = min_interval
+        self.analysis_cache = analysis_cache
+        self.lock_path = lock_path
+        self.clock = clock
+        self._analyses = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._changed = threading.Condition()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._lock_file = None
+        self._executor = None
+        self._thread = None
+
+    def add(self, url, interval=DEFAULT_INTERVAL, target_length=150, engine=None):
+        """
+        Watch a URL, or update the settings of an existing watch.
+
+        Returns:
+            tuple: (watch record, True if the watch was created rather than updated)
+
+        Raises:
+            ValueError: For a URL that is not absolute, or an interval that
+                is not finite or is shorter than min_interval
+        """
+        parts = urlparse(url)
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            raise ValueError("Invalid URL format")
+        if not math.isfinite(interval):
+            raise ValueError("Interval must be a finite number of seconds")
+        if interval < self.min_interval:
+            raise ValueError(f"Interval must be at least {self.min_interval} seconds")
+        watch = self.store.get(watch_id(url))
+        if watch is not None:
+            return self.store.update(watch['id'], interval=interval, target_length=target_length,
+                                     engine=engine), False
+        watch = new_watch(url, interval, target_length, engine, self.clock())
+        self.store.add(watch)
+        self._wake.set()
+        return watch, True
+
+    def remove(self, watch_id):
+        with self._lock:
+            self._analyses.pop(watch_id, None)
+        return self.store.remove(watch_id)
+
+    def get(self, watch_id):
+        return self.store.get(watch_id)
+
+    def list(self):
+        return self.store.list()
+
+    def events(self, since=0, limit=MAX_FEED_BATCH):
+        """Change events with a sequence number above ``since``, oldest first."""
+        return self.store.events(since, limit)
+
+    def last_sequence(self):
+        return self.store.last_sequence()
+
+    def wait_events(self, since, timeout, limit=MAX_FEED_BATCH):
+        """
+        Block until events newer than ``since`` exist or the timeout expires.
+
+        The store is polled as well, since another process sharing it may
+        be the one running the checks.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self.store.events(since, limit)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return events
+            with self._changed:
+                self._changed.wait(min(remaining, self.poll_interval))
+
+    def check(self, watch_id):
+        """
+        Re-poll one watched URL now.
+
+        Returns:
+            dict: The published change event, or None when the page is
+                unchanged, the check failed or it is already being checked
+        """
+        if not self._claim(watch_id):
+            return None
+        return self._run_claimed(watch_id)
+
+    def _claim(self, watch_id):
+        with self._lock:
+            if watch_id in self._in_flight:
+                return False
+            self._in_flight.add(watch_id)
+            return True
+
+    def _run_claimed(self, watch_id):
+        try:
+            return self._check(watch_id)
+        except Exception as e:
+            logging.error(f"Watch check failed for {watch_id}: {str(e)}")
+            return None
+        finally:
+            with self._lock:
+                self._in_flight.discard(watch_id)
+            self._wake.set()
+
+    def _check(self, watch_id):
+        watch = self.store.get(watch_id)
+        if watch is None:
+            return None
+        url = watch['url']
+        host = host_of(url)
+        scrape = self.scraper.scrape_blog_content(
+            url, {'etag': watch['etag'], 'last_modified': watch['last_modified']}
+        )
+        now = self.clock()
+        fields = {'last_checked': now, 'checks': watch['checks'] + 1}
+        metrics.increment('watch_checks', 1, host)
+
+        if not scrape['success']:
+            self._failed(watch, fields, scrape['error'], now)
+            return None
+
+        fields.update(errors=0, last_error=None, next_check=now + watch['interval'],
+                      etag=scrape.get('etag') or watch['etag'],
+                      last_modified=scrape.get('last_modified') or watch['last_modified'])
+        if scrape.get('not_modified'):
+            metrics.increment('watch_not_modified', 1, host)
+            self.store.update(watch_id, **fields)
+            return None
+
+        digest = content_hash(scrape['content'])
+        if digest == watch['content_hash']:
+            metrics.increment('watch_unchanged', 1, host)
+            self.store.update(watch_id, **fields)
+            return None
+
+        analysis, diff = self._analyze(watch, scrape['content'])
+        summary = self.summarizer.summarize_analysis(scrape['title'], analysis,
+                                                     watch['target_length'], watch['engine'])
+        if not summary['success']:
+            # Rebuilt from the stored content on the next attempt
+            with self._lock:
+                self._analyses.pop(watch_id, None)
+            self._failed(watch, fields, summary['error'], now)
+            return None
+
+        result = format_result(scrape, summary)
+        fields.update(title=scrape['title'], content=scrape['content'], content_hash=digest,
+                      summary=result, last_changed=now, changes=watch['changes'] + 1)
+        if self.store.update(watch_id, **fields) is None:
+            return None  # removed while it was being checked
+
+        event = self.store.append_event({
+            'type': 'changed' if diff is not None else 'initial',
+            'watch_id': watch_id,
+            'url': url,
+            'changed_at': now,
+            'result': result,
+            'previous_summary': watch['summary']['summary'] if watch['summary'] else None,
+            'diff': diff
+        })
+        metrics.increment('watch_changes', 1, host)
+        with self._changed:
+            self._changed.notify_all()
+        return event
+
+    def _failed(self, watch, fields, error, now):
+        """Record a failed check and back off exponentially."""
+        errors = watch['errors'] + 1
+        backoff = min(watch['interval'] * 2 ** min(errors, 16), MAX_BACKOFF)
+        fields.update(errors=errors, last_error=error, next_check=now + max(backoff, watch['interval']))
+        self.store.update(watch['id'], **fields)
+        metrics.increment('watch_errors', 1, host_of(watch['url']))
+
+    def _analyze(self, watch, content):
+        """
+        Move the watch's analysis to the new content.
+
+        Returns:
+            tuple: (DocumentAnalysis, sentence diff or None for a first version)
+        """
+        with self._lock:
+            analysis = self._analyses.pop(watch['id'], None)
+        # Another process may have checked the page since this analysis was cached
+        if analysis is None or analysis.content != watch['content']:
+            analysis = DocumentAnalysis(watch['content']) if watch['content'] is not None else None
+
+        diff = None
+        if analysis is None:
+            analysis = DocumentAnalysis(content)
+        else:
+            diff = analysis.update(content)
+
+        with self._lock:
+            self._analyses[watch['id']] = analysis
+            while len(self._analyses) > self.analysis_cache:
+                self._analyses.popitem(last=False)
+        return analysis, diff
+
+    def start(self):
+        """Start the scheduler thread."""
+        if self._thread is not None:
+            return self
+        self._stopped.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='watch-check')
+        self._thread = threading.Thread(target=self._schedule, name='watch-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self, wait=True):
+        """Stop scheduling; checks already running finish when wait is set."""
+        if self._thread is not None:
+            self._stopped.set()
+            self._wake.set()
+            if wait:
+                self._thread.join()
+            self._executor.shutdown(wait=wait)
+            self._thread = None
+            self._executor = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _hold_scheduler_lock(self):
+        """Take (or keep) the scheduler lock; True when this process may schedule."""
+        if self.lock_path is None or self._lock_file is not None:
+            return True
+        import fcntl
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _schedule(self):
+        while not self._stopped.is_set():
+            if not self._hold_scheduler_lock():
+                self._stopped.wait(LOCK_RETRY_INTERVAL)
+                continue
+            try:
+                self._dispatch_due()
+            except Exception as e:
+                logging.error(f"Watch scheduler error: {str(e)}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _dispatch_due(self):
+        with self._lock:
+            checking = len(self._in_flight)
+        free = self.workers - checking
+        if free <= 0:
+            return
+        # Due watches still being checked stay due until their check finishes
+        for watch in self.store.due(self.clock(), free + checking):
+            if not self._claim(watch['id']):
+                continue
+            self._executor.submit(self._run_claimed, watch['id'])
+            free -= 1
+            if free == 0:
+                break
+
+    def stats(self):
+        with self._lock:
+            checking, cached = len(self._in_flight), len(self._analyses)
+        return {
+            'watches': self.store.count(),
+            'checking': checking,
+            'cached_analyses': cached,
+            'last_sequence': self.store.last_sequence(),
+            'scheduling': self._thread is not None and (self.lock_path is None or self._lock_file is not None)
+        }